@@ -0,0 +1,209 @@
+import json
+import re
+import threading
+from typing import Protocol
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from draft.engine import apply_turn_event, engines, turn_payload
+from draft.events import POOL_EVENTS, RESULT_EVENTS, TURN_EVENTS, events_since, releasing_connection
+from draft.models import Draft
+from ranking.standings import get_standings
+
+# Límite de topics por conexión
+MAX_TOPICS = 16
+
+TOPIC_RE = re.compile(r'^(draft):(\d+):(players|turn)$|^(league):(\d+):(fixtures|standings)$')
+
+
+def parse_topics(raw):
+    """
+    Topics pedidos en ?topics=, separados por comas. Lanza ValueError si
+    alguno no es válido.
+    """
+    topics = list(dict.fromkeys(name.strip() for name in (raw or '').split(',') if name.strip()))
+    if not topics:
+        raise ValueError('Indica al menos un topic')
+    if len(topics) > MAX_TOPICS:
+        raise ValueError(f'Máximo {MAX_TOPICS} topics por conexión')
+    for name in topics:
+        if not TOPIC_RE.match(name):
+            raise ValueError(f'Topic no válido: {name}')
+    return topics
+
+
+def parse_cursors(raw):
+    """
+    Cursores por topic codificados en el id SSE: "topic=seq;topic=seq".
+    Lo que no se entienda se ignora y ese topic empieza de cero.
+    """
+    cursors = {}
+    for part in (raw or '').split(';'):
+        name, _, seq = part.partition('=')
+        try:
+            cursors[name] = int(seq)
+        except ValueError:
+            continue
+    return cursors
+
+
+def format_cursors(streams):
+    return ';'.join(f'{stream.name}={stream.cursor}' for stream in streams)
+
+
+def build_streams(topics) -> list["TopicStream"]:
+    """Crea un stream por topic resolviendo cada liga a su draft (una consulta por liga)."""
+    league_drafts = {}
+    streams = []
+    for name in topics:
+        scope, object_id, kind = [group for group in TOPIC_RE.match(name).groups() if group]
+        object_id = int(object_id)
+        if scope == 'league':
+            if object_id not in league_drafts:
+                league_drafts[object_id] = Draft.objects.filter(league=object_id).values_list('id', flat=True).first()
+            if league_drafts[object_id] is None:
+                raise Draft.DoesNotExist
+            draft_id = league_drafts[object_id]
+        else:
+            draft_id = object_id
+        streams.append(STREAMS[kind](name, draft_id))
+    return streams
+
+
+class TopicStream(Protocol):
+    """Lo que la conexión multiplexada espera de cada topic de STREAMS."""
+    name: str
+    draft_id: int
+    cursor: int
+
+    def prepare(self, cursor):
+        """Mensajes iniciales (se ejecuta en un hilo, puede consultar la BD)."""
+
+    async def handle(self, event):
+        """Mensajes para un evento nuevo del draft (cursor ya actualizado)."""
+
+
+class Stream:
+    """
+    Estado común de un topic dentro de la conexión multiplexada. Lleva su
+    propio cursor (último seq del draft que ha visto) para reanudar tras reconectar.
+    """
+
+    def __init__(self, name, draft_id):
+        self.name = name
+        self.draft_id = draft_id
+        self.cursor = 0
+
+    def message(self, event_type, data):
+        return event_type, json.dumps({'topic': self.name, 'seq': self.cursor, **data}, cls=DjangoJSONEncoder)
+
+
+class PlayersStream(Stream):
+    def prepare(self, cursor):
+        snapshot_seq, players = engines.get(self.draft_id).snapshot()
+        missed = None
+        if cursor is not None and cursor <= snapshot_seq:
+            missed = events_since(self.draft_id, cursor, POOL_EVENTS)
+
+        if missed is None:
+            self.cursor = snapshot_seq
+            payload = f'{{"topic": {json.dumps(self.name)}, "seq": {snapshot_seq}, "players": {players}}}'
+            return [('snapshot', payload)]
+
+        self.cursor = cursor
+        messages = []
+        for event in missed:
+            self.cursor = event['seq']
+            messages.append(self.message(event['type'], event['data']))
+        return messages
+
+    async def handle(self, event):
+        if event['type'] not in POOL_EVENTS:
+            return []
+        return [self.message(event['type'], event['data'])]
+
+
+class TurnStream(Stream):
+    def prepare(self, cursor):
+        # El estado de turno es pequeño: siempre mandamos el actual
+        self.state = engines.get(self.draft_id).turn_state()
+        self.cursor = self.state['seq']
+        return [self.message('state', turn_payload(self.state))]
+
+    async def handle(self, event):
+        self.state = apply_turn_event(self.state, event)
+        if event['type'] not in TURN_EVENTS:
+            return []
+        return [self.message('state', turn_payload(self.state))]
+
+
+class FixturesStream(Stream):
+    def prepare(self, cursor):
+        current = Draft.objects.values_list('event_seq', flat=True).get(id=self.draft_id)
+        missed = None
+        if cursor is not None and cursor <= current:
+            missed = events_since(self.draft_id, cursor, RESULT_EVENTS)
+
+        if missed is None:
+            # Sin cursor (o demasiado antiguo) el cliente recarga los partidos por REST
+            self.cursor = current
+            return [self.message('subscribed', {})]
+
+        self.cursor = cursor
+        messages = []
+        for event in missed:
+            self.cursor = event['seq']
+            messages.append(self.message(event['type'], event['data']))
+        return messages
+
+    async def handle(self, event):
+        if event['type'] not in RESULT_EVENTS:
+            return []
+        return [self.message(event['type'], event['data'])]
+
+
+class StandingsCache:
+    """
+    Última clasificación calculada por draft y el seq en que se leyó: con
+    muchas conexiones abiertas se consulta una vez por resultado, no una por cliente.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, draft_id, seq):
+        with self._lock:
+            entry = self._entries.get(draft_id)
+        if entry is not None and entry[0] >= seq:
+            return entry[1]
+        standings = get_standings(draft_id)
+        with self._lock:
+            if draft_id not in self._entries or self._entries[draft_id][0] < seq:
+                self._entries[draft_id] = (seq, standings)
+        return standings
+
+
+standings_cache = StandingsCache()
+
+
+class StandingsStream(Stream):
+    def prepare(self, cursor):
+        # La clasificación es una tabla pequeña: al conectar siempre va entera
+        self.cursor = Draft.objects.values_list('event_seq', flat=True).get(id=self.draft_id)
+        return [self.message('standings', {'teams': get_standings(self.draft_id)})]
+
+    async def handle(self, event):
+        if event['type'] not in RESULT_EVENTS:
+            return []
+        standings = await sync_to_async(releasing_connection(standings_cache.get))(self.draft_id, event['seq'])
+        return [self.message('standings', {'teams': standings})]
+
+
+STREAMS: dict[str, type[TopicStream]] = {
+    'players': PlayersStream,
+    'turn': TurnStream,
+    'fixtures': FixturesStream,
+    'standings': StandingsStream,
+}
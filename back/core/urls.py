@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
+from core.views import events_stream
 
 @ensure_csrf_cookie
 def csrf_view(_request):
@@ -31,5 +32,7 @@ urlpatterns = [
     path('api/team/', include('team.urls')),
     path('api/ranking/', include('ranking.urls')),
     path('api/games/', include('games.urls')),
+    path('api/market/', include('market.urls')),
     path("api/auth/csrf", csrf_view),
+    path('api/events', events_stream, name='events_stream'),
 ]
@@ -0,0 +1,95 @@
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
+
+from core.topics import build_streams, format_cursors, parse_cursors, parse_topics
+from draft.broadcast import broadcaster, draft_topic
+from draft.events import catch_up, releasing_connection
+from draft.models import Draft
+
+# Cada cuánto mandamos un comentario SSE para que los proxies no corten la conexión
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _prepare(streams, cursors):
+    messages = []
+    for stream in streams:
+        messages.extend(stream.prepare(cursors.get(stream.name)))
+    return messages
+
+
+async def events_stream(request: HttpRequest):
+    """
+    Una sola conexión SSE para varios topics (?topics=draft:1:players,league:1:standings,...).
+    Cada mensaje lleva su topic y su seq, y el id SSE guarda el cursor de
+    todos los topics para que al reconectar cada uno reanude donde iba.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    try:
+        topics = parse_topics(request.GET.get('topics'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    cursors = parse_cursors(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+
+    try:
+        streams = await sync_to_async(releasing_connection(build_streams))(topics)
+    except Draft.DoesNotExist:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+    by_topic = defaultdict(list)
+    for stream in streams:
+        by_topic[draft_topic(stream.draft_id)].append(stream)
+
+    # Una única cola para todos los drafts; suscribimos antes de leer el
+    # estado inicial y lo que llegue mientras tanto se filtra por cursor.
+    subscription = broadcaster.subscribe_many(by_topic)
+    try:
+        initial = await sync_to_async(releasing_connection(_prepare))(streams, cursors)
+    except Draft.DoesNotExist:
+        subscription.close()
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    except Exception:
+        subscription.close()
+        raise
+
+    def format_message(event_type, payload, with_id=True):
+        event_id = f'id: {format_cursors(streams)}\n' if with_id else ''
+        return f'{event_id}event: {event_type}\ndata: {payload}\n\n'
+
+    async def event_stream():
+        with subscription:
+            # Los cursores del arranque solo valen cuando ha llegado todo: el id
+            # va en el último mensaje, y si se corta antes se reenvía desde el anterior
+            for i, (event_type, payload) in enumerate(initial):
+                yield format_message(event_type, payload, with_id=i == len(initial) - 1)
+
+            while True:
+                try:
+                    topic, event = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                topic_streams = by_topic[topic]
+                pending = await catch_up(
+                    topic_streams[0].draft_id, min(stream.cursor for stream in topic_streams), event,
+                )
+                if pending is None:
+                    # Hueco mayor que REPLAY_LIMIT: estos topics vuelven a empezar con su estado actual
+                    for event_type, payload in await sync_to_async(releasing_connection(_prepare))(topic_streams, {}):
+                        yield format_message(event_type, payload)
+                    continue
+                for event in pending:
+                    for stream in topic_streams:
+                        if event['seq'] <= stream.cursor:
+                            continue
+                        stream.cursor = event['seq']
+                        for event_type, payload in await stream.handle(event):
+                            yield format_message(event_type, payload)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class Subscription:
+    """
+    Suscripción de un cliente a un topic del broadcaster.
+    Guarda el event loop del cliente para poder entregarle mensajes
+    desde cualquier hilo (las vistas síncronas corren fuera del loop).
+    """
+
+    def __init__(self, broadcaster, topic):
+        self.broadcaster = broadcaster
+        self.topic = topic
+        self.topics = (topic,)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, topic, message):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+
+    async def get(self, timeout=None):
+        if timeout is None:
+            return await self.queue.get()
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MultiSubscription(Subscription):
+    """
+    Una sola cola para varios topics, para multiplexar en una conexión.
+    get devuelve tuplas (topic, mensaje).
+    """
+
+    def __init__(self, broadcaster, topics):
+        super().__init__(broadcaster, None)
+        self.topics = tuple(topics)
+
+    def deliver(self, topic, message):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (topic, message))
+
+
+class Broadcaster:
+    """
+    Pub/sub en memoria por topic. Un único productor publica cada cambio
+    una sola vez y el broadcaster lo reparte a todos los suscriptores,
+    en lugar de que cada cliente consulte la BD por su cuenta.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, topic):
+        """Debe llamarse desde dentro de un event loop (vista async)."""
+        return self._add(Subscription(self, topic))
+
+    def subscribe_many(self, topics):
+        """Como subscribe, pero con una sola cola para todos los topics."""
+        return self._add(MultiSubscription(self, topics))
+
+    def _add(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def has_subscribers(self, topic):
+        with self._lock:
+            return bool(self._subscribers.get(topic))
+
+    def publish(self, topic, message):
+        """Thread-safe: se puede llamar tanto desde vistas síncronas como async."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+
+        for subscription in subscribers:
+            try:
+                subscription.deliver(topic, message)
+            except RuntimeError:
+                # El loop del cliente ya se ha cerrado
+                self.unsubscribe(subscription)
+
+        return len(subscribers)
+
+
+broadcaster = Broadcaster()
+
+
+def draft_topic(draft_id):
+    return f'draft:{draft_id}'
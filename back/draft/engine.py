@@ -0,0 +1,228 @@
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from draft.models import Draft, DraftPick
+from draft.notify import listener
+from draft.types import DraftEventType, DraftStatus
+from players.models import DraftPlayer
+from team.models import Team
+
+
+def apply_turn_event(state, event):
+    """Devuelve el estado de turno resultante de aplicar un evento (sin tocar la BD)."""
+    data = event['data']
+    state = {**state, 'seq': event['seq']}
+
+    if event['type'] == DraftEventType.DRAFT_STARTED:
+        state['status'] = DraftStatus.IN_PROGRESS
+    elif event['type'] == DraftEventType.DRAFT_FINISHED:
+        state['status'] = DraftStatus.FINISHED
+        state['current_draft_user_id'] = None
+        state['current_user'] = None
+    elif event['type'] == DraftEventType.TURN_CHANGED:
+        state['current_draft_user_id'] = data.get('draft_user_id')
+        state['current_user'] = data.get('username')
+        state['current_pick'] = data.get('current_pick', state['current_pick'])
+
+    return state
+
+
+def turn_payload(state):
+    """Campos del estado de turno que se mandan al cliente."""
+    return {
+        'id': state['id'],
+        'name': state['name'],
+        'current_user': state['current_user'],
+        'current_draft_user_id': state['current_draft_user_id'],
+        'current_pick': state['current_pick'],
+        'status': state['status'],
+    }
+
+
+def _serialize(draft_player):
+    player = draft_player.player
+    return {
+        'id': draft_player.id,
+        'player_id': draft_player.player_id,
+        'team_id': draft_player.team_id,
+        'name': draft_player.name,
+        'draft_id': draft_player.draft_id,
+        'release_clause': draft_player.release_clause,
+        'position': player.position,
+        'element': player.element,
+        'sprite': player.sprite.url if player.sprite else None,
+        'value': player.value,
+    }
+
+
+class DraftEngine:
+    """
+    Estado vivo de un draft en memoria del proceso: pool de jugadores como un
+    array de disponibilidad indexado por DraftPlayer, calendario de picks y
+    pick actual. Las escrituras van primero a la BD (write-through) y el
+    motor se actualiza aplicando los eventos que estas emiten.
+    """
+
+    def __init__(self, draft, draft_players, schedule, teams):
+        self.lock = threading.Lock()
+        self.turn = {
+            'id': draft.id,
+            'name': draft.name,
+            'status': draft.status,
+            'current_draft_user_id': draft.current_draft_user_id,
+            'current_user': draft.current_draft_user.user.username if draft.current_draft_user else None,
+            'current_pick': draft.current_pick,
+            'seq': draft.event_seq,
+        }
+
+        # Pool: filas serializadas (estáticas) + 1 byte de disponibilidad por jugador
+        self.rows = [_serialize(dp) for dp in draft_players]
+        self.available = bytearray(1 if row['team_id'] is None else 0 for row in self.rows)
+        self.index = {row['id']: i for i, row in enumerate(self.rows)}
+        self.by_player = {row['player_id']: row['id'] for row in self.rows}
+
+        # Calendario: pick_number -> draft_user_id
+        self.schedule = schedule
+        # user_id -> (draft_user_id, team_id, username)
+        self.teams = teams
+        self.usernames = {draft_user_id: username for draft_user_id, _, username in teams.values()}
+
+        self._pool_json = None
+
+    @classmethod
+    def load(cls, draft_id):
+        """Reconstruye el motor desde la BD. Lanza Draft.DoesNotExist si no existe."""
+        draft = Draft.objects.select_related('current_draft_user__user').get(id=draft_id)
+        draft_players = (
+            DraftPlayer.objects
+            .filter(draft=draft_id)
+            .select_related('player')
+            .order_by('id')
+        )
+        schedule = list(
+            DraftPick.objects.filter(draft=draft_id).order_by('pick_number').values_list('draft_user_id', flat=True)
+        )
+        teams = {
+            user_id: (draft_user_id, team_id, username)
+            for team_id, draft_user_id, user_id, username in Team.objects.filter(draft=draft_id).values_list(
+                'id', 'draft_user_id', 'draft_user__user_id', 'draft_user__user__username',
+            )
+        }
+        return cls(draft, draft_players, schedule, teams)
+
+    @property
+    def seq(self):
+        return self.turn['seq']
+
+    def turn_state(self):
+        with self.lock:
+            return dict(self.turn)
+
+    def pool_json(self):
+        """JSON del pool libre; se regenera solo cuando un pick lo cambia."""
+        with self.lock:
+            return self._pool_snapshot()[1]
+
+    def snapshot(self):
+        """(seq, JSON del pool) leídos de forma consistente."""
+        with self.lock:
+            return self._pool_snapshot()
+
+    def _pool_snapshot(self):
+        if self._pool_json is None:
+            self._pool_json = json.dumps(
+                [row for row, free in zip(self.rows, self.available) if free],
+                cls=DjangoJSONEncoder,
+            )
+        return self.turn['seq'], self._pool_json
+
+    def team_for(self, user_id):
+        """(draft_user_id, team_id) del usuario en este draft, o None."""
+        entry = self.teams.get(user_id)
+        return entry[:2] if entry else None
+
+    def draft_player_id(self, player_id):
+        return self.by_player.get(player_id)
+
+    def is_available(self, draft_player_id):
+        i = self.index.get(draft_player_id)
+        return i is not None and bool(self.available[i])
+
+    def user_for_pick(self, pick_number):
+        """(draft_user_id, username) del pick indicado, o None si el calendario se acabó."""
+        if pick_number >= len(self.schedule):
+            return None
+        draft_user_id = self.schedule[pick_number]
+        return draft_user_id, self.usernames.get(draft_user_id)
+
+    def apply(self, event):
+        """
+        Aplica un evento ya confirmado en la BD. Devuelve False si hay un hueco
+        en la secuencia y el motor debe reconstruirse.
+        """
+        with self.lock:
+            if event['seq'] <= self.turn['seq']:
+                return True
+            if event['seq'] != self.turn['seq'] + 1:
+                return False
+
+            if event['type'] == DraftEventType.PLAYER_TAKEN:
+                i = self.index.get(event['data']['draft_player_id'])
+                if i is not None:
+                    self.available[i] = 0
+                    self.rows[i] = {**self.rows[i], 'team_id': event['data']['team_id']}
+                    self._pool_json = None
+            elif event['type'] == DraftEventType.DRAFT_STARTED:
+                # El calendario y el orden cambian: se recarga entero al confirmar el inicio
+                return False
+
+            self.turn = apply_turn_event(self.turn, event)
+            return True
+
+
+class DraftEngineRegistry:
+    """Motores de los drafts activos en este proceso, cargados bajo demanda."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self._last_seen = {}
+
+    def get(self, draft_id):
+        """Lanza Draft.DoesNotExist si el draft no existe."""
+        with self._lock:
+            engine = self._engines.get(draft_id)
+        if engine is not None:
+            return engine
+        return self.load(draft_id)
+
+    def load(self, draft_id):
+        # Escuchamos el canal del draft antes de leer la BD para no perder
+        # los picks que otros workers hagan mientras tanto
+        listener.listen(draft_id)
+        engine = DraftEngine.load(draft_id)
+        with self._lock:
+            # Si mientras cargábamos se ha despachado un evento más nuevo, no
+            # lo guardamos: el siguiente get volverá a leer de la BD.
+            if self._last_seen.get(draft_id, 0) <= engine.seq:
+                self._engines[draft_id] = engine
+        return engine
+
+    def apply(self, draft_id, event):
+        with self._lock:
+            self._last_seen[draft_id] = max(self._last_seen.get(draft_id, 0), event['seq'])
+            engine = self._engines.get(draft_id)
+        if engine is not None and not engine.apply(event):
+            # Nos hemos saltado algún evento: mejor reconstruir que servir algo incorrecto
+            self.forget(draft_id, keep_last_seen=True)
+
+    def forget(self, draft_id, keep_last_seen=False):
+        with self._lock:
+            self._engines.pop(draft_id, None)
+            if not keep_last_seen:
+                self._last_seen.pop(draft_id, None)
+
+
+engines = DraftEngineRegistry()
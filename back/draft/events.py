@@ -0,0 +1,142 @@
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+
+from draft.broadcast import broadcaster, draft_topic
+from draft.models import Draft, DraftEvent
+from draft.notify import notify
+from draft.engine import engines
+from draft.types import DraftEventType
+
+# Máximo de eventos que reenviamos al reconectar; si faltan más, mandamos snapshot
+REPLAY_LIMIT = 500
+
+# Eventos que modifican el pool de jugadores disponibles
+POOL_EVENTS = [DraftEventType.PLAYER_TAKEN, DraftEventType.DRAFT_FINISHED]
+# Eventos que cambian el estado de turno
+TURN_EVENTS = [DraftEventType.DRAFT_STARTED, DraftEventType.TURN_CHANGED, DraftEventType.DRAFT_FINISHED]
+# Eventos que cambian partidos y clasificación
+RESULT_EVENTS = [DraftEventType.RESULT_APPROVED]
+
+
+def next_seq(draft_id):
+    """Reserva el siguiente número de secuencia del draft de forma atómica."""
+    Draft.objects.filter(id=draft_id).update(event_seq=F('event_seq') + 1)
+    return Draft.objects.filter(id=draft_id).values_list('event_seq', flat=True).get()
+
+
+def emit(draft_id, event_type, data):
+    """
+    Añade un evento al log del draft y lo reparte a los suscriptores
+    cuando la transacción actual se confirma.
+    """
+    with transaction.atomic():
+        seq = next_seq(draft_id)
+        DraftEvent.objects.create(draft_id=draft_id, seq=seq, type=event_type, data=data)
+        event = {'seq': seq, 'type': event_type, 'data': data}
+        # Para los demás workers; este proceso lo reparte directamente al confirmar
+        notify(draft_id, [event])
+
+    transaction.on_commit(lambda: dispatch(draft_id, event))
+    return event
+
+
+def emit_locked(draft, events):
+    """
+    Variante de emit para un draft ya bloqueado con select_for_update: numera
+    los eventos a partir de draft.event_seq sin consultas extra y los inserta
+    de una vez. El llamador debe guardar draft.event_seq en la misma transacción.
+    """
+    created = []
+    for event_type, data in events:
+        draft.event_seq += 1
+        created.append({'seq': draft.event_seq, 'type': event_type, 'data': data})
+
+    DraftEvent.objects.bulk_create([DraftEvent(draft_id=draft.id, **event) for event in created])
+    notify(draft.id, created)
+    for event in created:
+        transaction.on_commit(lambda event=event: dispatch(draft.id, event))
+    return created
+
+
+def events_since(draft_id, seq, types=None):
+    """
+    Eventos posteriores a `seq`, en orden. Devuelve None si hay demasiados
+    para reenviarlos y compensa mandar un snapshot.
+    """
+    qs = DraftEvent.objects.filter(draft_id=draft_id, seq__gt=seq)
+    if types is not None:
+        qs = qs.filter(type__in=types)
+    events = list(qs.order_by('seq').values('seq', 'type', 'data')[:REPLAY_LIMIT + 1])
+    if len(events) > REPLAY_LIMIT:
+        return None
+    return events
+
+
+async def catch_up(draft_id, cursor, event):
+    """
+    Eventos a aplicar, en orden, al recibir `event` con el cursor en `cursor`.
+    Cada evento se publica desde el on_commit de su transacción, así que dos
+    commits del mismo draft pueden llegar al revés (el 8 antes que el 7). Se
+    confirman en orden de seq (el draft queda bloqueado al numerar), así que
+    ante un hueco lo que falta ya está en el log y se lee de ahí en vez de
+    saltarlo. Devuelve None si el hueco es mayor que REPLAY_LIMIT.
+    """
+    if event['seq'] <= cursor:
+        return []
+    if event['seq'] == cursor + 1:
+        return [event]
+    return await sync_to_async(releasing_connection(events_since))(draft_id, cursor)
+
+
+def last_event_id(request):
+    """Seq desde el que reanudar: cabecera Last-Event-ID o ?last_event_id=."""
+    raw = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def dispatch(draft_id, event):
+    engines.apply(draft_id, event)
+    broadcaster.publish(draft_topic(draft_id), event)
+
+
+def releasing_connection(func):
+    """
+    Para el trabajo con BD que hacen los streams SSE (vía sync_to_async):
+    al acabar cierra la conexión del hilo. Si no, cada stream abierto retiene
+    una conexión de Postgres toda su vida y con unos cientos de clientes se
+    agota max_connections.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+    return wrapper
+
+
+def format_sse(event_type, data, seq=None):
+    return format_sse_raw(event_type, json.dumps(data, cls=DjangoJSONEncoder), seq=seq)
+
+
+def format_sse_raw(event_type, payload, seq=None):
+    """Igual que format_sse pero con el JSON ya serializado (p.ej. desde caché)."""
+    lines = []
+    if seq is not None:
+        lines.append(f'id: {seq}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {payload}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def format_event(event):
+    return format_sse(event['type'], {'seq': event['seq'], **event['data']}, seq=event['seq'])
@@ -0,0 +1,171 @@
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+
+from draft.engine import engines
+from draft.models import Draft, DraftPick
+from draft.schedule import build_schedule
+from draft.types import DraftStatus
+from league.models import League
+from players.models import DraftPlayer, Player
+from team.models import Team
+from users.models import DraftUser, User
+
+PREFIX = 'bench_picks_'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de acquire_player con contención: lanza cientos de picks en paralelo "
+        "(usuarios y jugadores al azar) y mide picks por segundo, latencias y que ningún "
+        "jugador se asigne dos veces."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--managers", type=int, default=8, help="Usuarios que participan en el draft.")
+        parser.add_argument("--players", type=int, default=300, help="Jugadores en el pool.")
+        parser.add_argument("--attempts", type=int, default=2000, help="Peticiones de pick que se lanzan.")
+        parser.add_argument("--workers", type=int, default=32, help="Peticiones simultáneas.")
+        parser.add_argument("--keep", action="store_true", help="No borra los datos de prueba al acabar.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not connection.features.has_select_for_update:
+            raise CommandError("La BD no soporta SELECT ... FOR UPDATE: no hay contención que medir.")
+
+        rng = random.Random(options["seed"])
+        setup = self._setup(options)
+        try:
+            attempts = [
+                (rng.choice(setup["sessions"]), rng.choice(setup["player_ids"]))
+                for _ in range(options["attempts"])
+            ]
+            # Cargamos el motor del draft antes de medir, como en un servidor ya caliente
+            engines.get(setup["draft_id"])
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                results = list(pool.map(lambda attempt: self._pick(setup["draft_id"], *attempt), attempts))
+            elapsed = time.perf_counter() - started
+
+            report = self._check(setup["draft_id"], results)
+            report["elapsed"] = elapsed
+        finally:
+            if not options["keep"]:
+                self._cleanup()
+
+        self._print_report(report, options)
+
+    # ------------------------------------------------------------------ datos
+
+    def _setup(self, options):
+        self._cleanup()
+        league = League.objects.create(name=f"{PREFIX}league")
+        draft = Draft.objects.create(league=league, name=f"{PREFIX}draft", status=DraftStatus.IN_PROGRESS)
+
+        draft_users, sessions = [], []
+        for i in range(options["managers"]):
+            user = User.objects.create_user(username=f"{PREFIX}manager{i}", password=None)
+            draft_user = DraftUser.objects.create(user=user, draft=draft, order=i)
+            Team.objects.create(name=f"{PREFIX}team{i}", draft=draft, draft_user=draft_user, budget=Decimal("0"))
+            draft_users.append(draft_user)
+            sessions.append(self._session_for(user))
+
+        players = Player.objects.bulk_create([
+            Player(name=f"{PREFIX}player{i}", gender="M", position="FW", element="fire")
+            for i in range(options["players"])
+        ])
+        DraftPlayer.objects.bulk_create([
+            DraftPlayer(player=player, name=player.name, draft=draft) for player in players
+        ])
+
+        DraftPick.objects.bulk_create([
+            DraftPick(draft=draft, pick_number=pick_number, round=round_number, draft_user=draft_user)
+            for pick_number, round_number, draft_user in build_schedule(
+                draft_users, options["players"] // options["managers"],
+            )
+        ])
+        draft.current_draft_user = draft_users[0]
+        draft.save(update_fields=["current_draft_user"])
+        engines.forget(draft.id)
+
+        return {"draft_id": draft.id, "sessions": sessions, "player_ids": [player.id for player in players]}
+
+    def _session_for(self, user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    def _cleanup(self):
+        League.objects.filter(name__startswith=PREFIX).delete()
+        Player.objects.filter(name__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    # -------------------------------------------------------------- benchmark
+
+    def _pick(self, draft_id, session, player_id):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session
+        try:
+            started = time.perf_counter()
+            response = client.put(
+                f"/api/draft/{draft_id}/player", {"draft_player_id": player_id}, content_type="application/json",
+            )
+            return player_id, response.status_code, time.perf_counter() - started
+        finally:
+            # Cada hilo del pool abre su conexión; no las dejamos abiertas
+            connections.close_all()
+
+    def _check(self, draft_id, results):
+        """Cruza las respuestas con la BD: ningún jugador dos veces y un avance de turno por pick."""
+        won = [player_id for player_id, status, _ in results if status == 200]
+        taken = set(
+            DraftPlayer.objects.filter(draft_id=draft_id, team__isnull=False).values_list("player_id", flat=True)
+        )
+        current_pick = Draft.objects.values_list("current_pick", flat=True).get(id=draft_id)
+        return {
+            "statuses": Counter(status for _, status, _ in results),
+            "latencies": [latency for _, _, latency in results],
+            "picks": len(won),
+            "double_assigned": len(won) - len(set(won)),
+            "db_matches": taken == set(won),
+            "turn_matches": current_pick == len(won),
+        }
+
+    # ------------------------------------------------------------------ informe
+
+    def _print_report(self, report, options):
+        values = sorted(report["latencies"])
+        pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000
+        statuses = " ".join(f"{status}={count}" for status, count in sorted(report["statuses"].items()))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{options['attempts']} picks con {options['workers']} peticiones simultáneas"
+        ))
+        self.stdout.write(f"  Duración:                       {report['elapsed']:.2f}s")
+        self.stdout.write(f"  Peticiones/s:                   {options['attempts'] / report['elapsed']:.1f}")
+        self.stdout.write(f"  Picks aceptados/s:              {report['picks'] / report['elapsed']:.1f}")
+        self.stdout.write(f"  Respuestas:                     {statuses}")
+        self.stdout.write(
+            f"  Latencia por petición:          p50={pick(50):.1f}ms p90={pick(90):.1f}ms "
+            f"p99={pick(99):.1f}ms max={values[-1] * 1000:.1f}ms media={statistics.fmean(values) * 1000:.1f}ms"
+        )
+        self.stdout.write(f"  Jugadores asignados dos veces:  {report['double_assigned']}")
+
+        unexpected = set(report["statuses"]) - {200, 409}
+        if report["double_assigned"] or not report["db_matches"] or not report["turn_matches"] or unexpected:
+            raise CommandError("Picks inconsistentes: la BD no coincide con las respuestas.")
+        self.stdout.write(self.style.SUCCESS("Benchmark completado."))
@@ -0,0 +1,410 @@
+import asyncio
+import json
+import random
+import socket
+import statistics
+import threading
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from draft.engine import engines
+from draft.models import Draft, DraftPick
+from draft.schedule import build_schedule
+from draft.types import DraftStatus
+from league.models import League
+from players.models import DraftPlayer, Player
+from team.models import Team
+from users.models import DraftUser, User
+
+PREFIX = 'bench_'
+
+# Cada cuánto mide el monitor el retraso del event loop del servidor
+LAG_INTERVAL = 0.05
+
+
+class QueryCounter:
+    """Cuenta las consultas de todas las conexiones de Django del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de los streams SSE del draft: arranca la app ASGI en el propio proceso, "
+        "abre N clientes, juega un draft por acquire_player y mide latencias, consultas, "
+        "memoria por conexión y retraso del event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200, help="Clientes SSE simultáneos.")
+        parser.add_argument("--managers", type=int, default=8, help="Usuarios que participan en el draft.")
+        parser.add_argument("--players", type=int, default=300, help="Jugadores en el pool.")
+        parser.add_argument("--picks", type=int, default=80, help="Picks que se juegan durante la prueba.")
+        parser.add_argument("--interval", type=float, default=0.1, help="Segundos entre picks.")
+        parser.add_argument(
+            "--endpoint", choices=["players", "turn", "events"], default="players",
+            help="Stream a medir: pool del draft, turno o el endpoint multiplexado /api/events.",
+        )
+        parser.add_argument("--keep", action="store_true", help="No borra los datos de prueba al acabar.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options["picks"] > options["players"]:
+            raise CommandError("No puede haber más picks que jugadores.")
+
+        self.rng = random.Random(options["seed"])
+        counter = QueryCounter()
+        connection_created.connect(counter.install)
+        for conn in connections.all():
+            counter.install(None, conn)
+
+        setup = self._setup(options)
+        try:
+            report = asyncio.run(self._bench(setup, options, counter))
+        finally:
+            connection_created.disconnect(counter.install)
+            if not options["keep"]:
+                self._cleanup()
+
+        self._print_report(report, options)
+
+    # ------------------------------------------------------------------ datos
+
+    def _setup(self, options):
+        self._cleanup()
+        league = League.objects.create(name=f"{PREFIX}league")
+        draft = Draft.objects.create(league=league, name=f"{PREFIX}draft", status=DraftStatus.IN_PROGRESS)
+
+        managers = []
+        for i in range(options["managers"]):
+            user = User.objects.create_user(username=f"{PREFIX}manager{i}", password=None)
+            draft_user = DraftUser.objects.create(user=user, draft=draft, order=i)
+            Team.objects.create(name=f"{PREFIX}team{i}", draft=draft, draft_user=draft_user, budget=Decimal("0"))
+            managers.append((draft_user, self._session_for(user)))
+
+        players = Player.objects.bulk_create([
+            Player(name=f"{PREFIX}player{i}", gender="M", position="FW", element="fire")
+            for i in range(options["players"])
+        ])
+        DraftPlayer.objects.bulk_create([
+            DraftPlayer(player=player, name=player.name, draft=draft) for player in players
+        ])
+
+        rounds = -(-options["picks"] // options["managers"])
+        schedule = build_schedule([draft_user for draft_user, _ in managers], rounds)
+        DraftPick.objects.bulk_create([
+            DraftPick(draft=draft, pick_number=pick_number, round=round_number, draft_user=draft_user)
+            for pick_number, round_number, draft_user in schedule
+        ])
+        draft.current_draft_user = managers[0][0]
+        draft.save(update_fields=["current_draft_user"])
+        engines.forget(draft.id)
+
+        sessions = {draft_user.id: session for draft_user, session in managers}
+        return {
+            "draft_id": draft.id,
+            "league_id": league.id,
+            "pick_order": [sessions[draft_user.id] for _, _, draft_user in schedule[:options["picks"]]],
+            "draft_players": dict(
+                DraftPlayer.objects.filter(draft=draft).values_list("player_id", "id")
+            ),
+        }
+
+    def _session_for(self, user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    def _cleanup(self):
+        League.objects.filter(name__startswith=PREFIX).delete()
+        Player.objects.filter(name__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def _db_stats(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+            )
+            return cursor.fetchone()[0]
+
+    # ----------------------------------------------------------------- servidor
+
+    def _start_server(self):
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+
+        from core.asgi import application
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        config = Config()
+        config.bind = [f"127.0.0.1:{port}"]
+        config.accesslog = None
+        config.errorlog = None
+        config.backlog = 4096
+
+        server = {"port": port, "lag": [], "ready": threading.Event()}
+
+        async def monitor_lag():
+            # Retraso entre cuando debería despertar el loop y cuando lo hace
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(LAG_INTERVAL)
+                server["lag"].append(time.perf_counter() - start - LAG_INTERVAL)
+
+        async def run():
+            server["loop"] = asyncio.get_running_loop()
+            server["stop"] = asyncio.Event()
+            monitor = asyncio.create_task(monitor_lag())
+            server["ready"].set()
+            await serve(application, config, shutdown_trigger=server["stop"].wait)
+            monitor.cancel()
+
+        server["thread"] = threading.Thread(target=asyncio.run, args=(run(),), name="bench-asgi", daemon=True)
+        server["thread"].start()
+        server["ready"].wait()
+
+        # Esperamos a que el socket acepte conexiones
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError("El servidor ASGI no ha arrancado.")
+                time.sleep(0.05)
+        return server
+
+    def _stop_server(self, server):
+        server["loop"].call_soon_threadsafe(server["stop"].set)
+        server["thread"].join(timeout=10)
+
+    # ------------------------------------------------------------------ clientes
+
+    def _stream_path(self, setup, endpoint):
+        draft_id = setup["draft_id"]
+        if endpoint == "events":
+            return f"/api/events?topics=draft:{draft_id}:players,draft:{draft_id}:turn"
+        if endpoint == "turn":
+            return f"/api/draft/{draft_id}/stream"
+        return f"/api/draft/{draft_id}/players/stream"
+
+    async def _client(self, port, path, connected, received, stop, errors):
+        """Cliente SSE mínimo sobre HTTP/1.0 (respuesta delimitada por cierre)."""
+        try:
+            await self._read_stream(port, path, connected, received, stop)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Lo recoge _bench; liberamos para que no se quede esperando
+            errors.append(e)
+            connected.release()
+
+    async def _read_stream(self, port, path, connected, received, stop):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET {path} HTTP/1.0\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await writer.drain()
+        try:
+            status = await reader.readline()
+            if b" 200 " not in status:
+                raise CommandError(f"El stream respondió {status.decode().strip()}")
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+
+            first = True
+            event_type, data = None, []
+            while not stop.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.rstrip(b"\r\n")
+                if line.startswith(b"event:"):
+                    event_type = line[6:].strip().decode()
+                elif line.startswith(b"data:"):
+                    data.append(line[5:].strip())
+                elif not line and event_type:
+                    now = time.perf_counter()
+                    if first:
+                        connected.release()
+                        first = False
+                    payload = json.loads(b"\n".join(data))
+                    if event_type == "player_taken":
+                        received[payload["draft_player_id"]].append(now)
+                    elif event_type == "state" and payload.get("current_pick"):
+                        received[("pick", payload["current_pick"])].append(now)
+                    event_type, data = None, []
+        finally:
+            writer.close()
+
+    async def _request(self, port, method, path, session=None, data=None):
+        """Petición HTTP/1.0 sencilla; devuelve el código de estado."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(data).encode() if data is not None else b""
+        headers = [f"{method} {path} HTTP/1.0", "Host: 127.0.0.1", f"Content-Length: {len(body)}"]
+        if session:
+            headers.append(f"Cookie: {settings.SESSION_COOKIE_NAME}={session}")
+        if data is not None:
+            headers.append("Content-Type: application/json")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+        status = await reader.readline()
+        await reader.read()
+        writer.close()
+        return int(status.split()[1])
+
+    # -------------------------------------------------------------- benchmark
+
+    async def _bench(self, setup, options, counter):
+        from asgiref.sync import sync_to_async
+
+        server = self._start_server()
+        port = server["port"]
+        path = self._stream_path(setup, options["endpoint"])
+        clients = options["clients"]
+
+        received = {}
+        player_ids = list(setup["draft_players"])
+        self.rng.shuffle(player_ids)
+        picks = player_ids[:options["picks"]]
+        for number, player_id in enumerate(picks, start=1):
+            # El pool avisa por DraftPlayer y el turno por número de pick
+            received[setup["draft_players"][player_id]] = []
+            received[("pick", number)] = []
+
+        stop = asyncio.Event()
+        connected = asyncio.Semaphore(0)
+        errors = []
+
+        # Cargamos el motor del draft antes de medir, como en un servidor ya caliente
+        await self._request(port, "GET", f"/api/draft/{setup['draft_id']}")
+
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        connect_start = time.perf_counter()
+        tasks = []
+        for _ in range(clients):
+            tasks.append(asyncio.create_task(self._client(port, path, connected, received, stop, errors)))
+            # Abrimos en tandas para no desbordar el backlog del socket
+            if len(tasks) % 50 == 0:
+                await asyncio.sleep(0)
+        for _ in range(clients):
+            await asyncio.wait_for(connected.acquire(), timeout=60)
+        if errors:
+            stop.set()
+            for task in tasks:
+                task.cancel()
+            self._stop_server(server)
+            raise CommandError(f"{len(errors)} clientes no pudieron conectar: {errors[0]}")
+        connect_time = time.perf_counter() - connect_start
+        memory_per_client = (tracemalloc.get_traced_memory()[0] - memory_before) / clients
+        tracemalloc.stop()
+
+        lag_start = len(server["lag"])
+        queries_before = counter.count
+        xacts_before = await sync_to_async(self._db_stats)()
+        drive_start = time.perf_counter()
+
+        sent = []
+        statuses = []
+        for number, player_id in enumerate(picks):
+            started = time.perf_counter()
+            statuses.append(await self._request(
+                port, "PUT", f"/api/draft/{setup['draft_id']}/player",
+                session=setup["pick_order"][number], data={"draft_player_id": player_id},
+            ))
+            sent.append(started)
+            await asyncio.sleep(max(0, options["interval"] - (time.perf_counter() - started)))
+
+        # Damos margen para que lleguen los últimos eventos
+        await asyncio.sleep(1)
+        drive_time = time.perf_counter() - drive_start
+        queries = counter.count - queries_before
+        xacts = await sync_to_async(self._db_stats)() - xacts_before
+        lag = server["lag"][lag_start:]
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._stop_server(server)
+
+        latencies = []
+        delivered = 0
+        for number, player_id in enumerate(picks):
+            if options["endpoint"] == "turn":
+                times = received[("pick", number + 1)]
+            else:
+                times = received[setup["draft_players"][player_id]]
+            delivered += len(times)
+            latencies.extend(t - sent[number] for t in times)
+
+        return {
+            "connect_time": connect_time,
+            "memory_per_client": memory_per_client,
+            "drive_time": drive_time,
+            "queries": queries,
+            "xacts": xacts,
+            "lag": lag,
+            "latencies": latencies,
+            "expected": clients * len(picks),
+            "delivered": delivered,
+            "picks_ok": sum(1 for status in statuses if status == 200),
+            "picks": len(picks),
+        }
+
+    # ------------------------------------------------------------------ informe
+
+    def _print_report(self, report, options):
+        def percentiles(values):
+            if not values:
+                return "sin datos"
+            values = sorted(values)
+            pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000
+            return (
+                f"p50={pick(50):.1f}ms p90={pick(90):.1f}ms p99={pick(99):.1f}ms "
+                f"max={values[-1] * 1000:.1f}ms media={statistics.fmean(values) * 1000:.1f}ms"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Stream '{options['endpoint']}' con {options['clients']} clientes"
+        ))
+        self.stdout.write(f"  Conexión de todos los clientes: {report['connect_time']:.2f}s")
+        self.stdout.write(f"  Memoria por conexión (aprox.):  {report['memory_per_client'] / 1024:.1f} KiB")
+        self.stdout.write(f"  Picks aceptados:                {report['picks_ok']}/{report['picks']}")
+        self.stdout.write(f"  Eventos entregados:             {report['delivered']}/{report['expected']}")
+        self.stdout.write(f"  Latencia pick -> cliente:       {percentiles(report['latencies'])}")
+        self.stdout.write(f"  Consultas/s (Django):           {report['queries'] / report['drive_time']:.1f}")
+        self.stdout.write(f"  Transacciones/s (Postgres):     {report['xacts'] / report['drive_time']:.1f}")
+        self.stdout.write(f"  Retraso del event loop:         {percentiles(report['lag'])}")
+
+        if report["delivered"] < report["expected"] or report["picks_ok"] < report["picks"]:
+            self.stdout.write(self.style.WARNING("Hubo picks rechazados o eventos que no llegaron."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Benchmark completado."))
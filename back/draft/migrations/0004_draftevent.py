@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0003_draft_event_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('type', models.CharField(choices=[('draft_started', 'Draft iniciado'), ('turn_changed', 'Cambio de turno'), ('player_taken', 'Jugador escogido'), ('draft_finished', 'Draft finalizado')], max_length=30)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='draft.draft')),
+            ],
+            options={
+                'ordering': ['draft', 'seq'],
+                'constraints': [models.UniqueConstraint(fields=('draft', 'seq'), name='unique_draft_event_seq')],
+            },
+        ),
+    ]
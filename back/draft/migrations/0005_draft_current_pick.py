@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0004_draftevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='draft',
+            name='current_pick',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
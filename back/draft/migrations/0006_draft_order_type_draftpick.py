@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0005_draft_current_pick'),
+        ('users', '0003_alter_draftuser_draft_alter_draftuser_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='draft',
+            name='order_type',
+            field=models.CharField(choices=[('linear', 'Lineal'), ('snake', 'Serpiente')], default='linear', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='DraftPick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pick_number', models.PositiveIntegerField()),
+                ('round', models.PositiveIntegerField()),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='picks', to='draft.draft')),
+                ('draft_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='picks', to='users.draftuser')),
+            ],
+            options={
+                'ordering': ['draft', 'pick_number'],
+                'constraints': [models.UniqueConstraint(fields=('draft', 'pick_number'), name='unique_draft_pick_number')],
+            },
+        ),
+    ]
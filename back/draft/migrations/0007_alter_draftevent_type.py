@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0006_draft_order_type_draftpick'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='draftevent',
+            name='type',
+            field=models.CharField(choices=[('draft_started', 'Draft iniciado'), ('turn_changed', 'Cambio de turno'), ('player_taken', 'Jugador escogido'), ('draft_finished', 'Draft finalizado'), ('result_approved', 'Resultado aprobado')], max_length=30),
+        ),
+    ]
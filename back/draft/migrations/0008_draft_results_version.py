@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0007_alter_draftevent_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='draft',
+            name='results_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
 from league.models import League
-from draft.types import DraftStatus
+from draft.types import DraftStatus, DraftEventType, DraftOrder
 
 # Create your models here.
 class Draft(models.Model):
@@ -14,6 +14,54 @@ class Draft(models.Model):
         related_name='current_in_draft'
     )
     status = models.CharField(max_length=20, choices=DraftStatus, default=DraftStatus.NEW)
+    order_type = models.CharField(max_length=10, choices=DraftOrder, default=DraftOrder.LINEAR)
+    # Número de picks realizados (índice del pick en juego)
+    current_pick = models.PositiveIntegerField(default=0)
+    # Último número de secuencia emitido en los eventos del draft
+    event_seq = models.PositiveIntegerField(default=0)
+    # Sube con cada resultado aprobado o calendario nuevo: invalida las proyecciones
+    results_version = models.PositiveIntegerField(default=0)
     
     def __str__(self):
         return self.name
+
+
+class DraftPick(models.Model):
+    """
+    Calendario de picks materializado al iniciar el draft: nº de pick -> DraftUser.
+    Resolver el turno es una búsqueda por índice, sin cargar a todos los usuarios.
+    """
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='picks')
+    pick_number = models.PositiveIntegerField()
+    round = models.PositiveIntegerField()
+    draft_user = models.ForeignKey('users.DraftUser', on_delete=models.CASCADE, related_name='picks')
+
+    class Meta:
+        ordering = ['draft', 'pick_number']
+        constraints = [
+            models.UniqueConstraint(fields=['draft', 'pick_number'], name='unique_draft_pick_number'),
+        ]
+
+    def __str__(self):
+        return f'{self.draft} · pick {self.pick_number} · {self.draft_user}'
+
+
+class DraftEvent(models.Model):
+    """
+    Registro append-only de los eventos de un draft (picks, turnos, inicio y fin).
+    Permite a los clientes SSE reanudar desde el último seq recibido.
+    """
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='events')
+    seq = models.PositiveIntegerField()
+    type = models.CharField(max_length=30, choices=DraftEventType)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['draft', 'seq']
+        constraints = [
+            models.UniqueConstraint(fields=['draft', 'seq'], name='unique_draft_event_seq'),
+        ]
+
+    def __str__(self):
+        return f'{self.draft} · #{self.seq} {self.type}'
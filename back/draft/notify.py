@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+# Identifica a este proceso para no procesar dos veces sus propios NOTIFY
+ORIGIN = uuid.uuid4().hex
+
+# Segundos entre reintentos si se cae la conexión de LISTEN
+RECONNECT_DELAY = 2
+# Cuánto esperamos a que el LISTEN de un canal nuevo esté activo
+LISTEN_TIMEOUT = 1
+
+
+def channel_name(draft_id):
+    return f'draft_{draft_id}'
+
+
+def enabled():
+    return connection.vendor == 'postgresql'
+
+
+def notify(draft_id, events):
+    """
+    Publica los eventos en el canal del draft. Va dentro de la transacción
+    actual, así que Postgres solo lo entrega si se confirma.
+    """
+    if not enabled():
+        return
+    payload = json.dumps({'origin': ORIGIN, 'events': events}, cls=DjangoJSONEncoder)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [channel_name(draft_id), payload])
+
+
+class DraftListener:
+    """
+    Una única conexión LISTEN por proceso. Un hilo en segundo plano espera con
+    select() sin bloquear a nadie y reparte cada NOTIFY a los suscriptores y
+    motores locales, así que los workers se enteran de los picks de los demás
+    sin que ningún cliente tenga que consultar la BD.
+    """
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._channels = set()
+        self._pending = set()
+        self._active = set()
+        self._thread = None
+        self._stopping = False
+        self._wakeup_r, self._wakeup_w = os.pipe()
+
+    def listen(self, draft_id):
+        if not enabled():
+            return
+        channel = channel_name(draft_id)
+        with self._lock:
+            if channel in self._channels:
+                return
+            self._channels.add(channel)
+            self._pending.add(channel)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='draft-listener', daemon=True)
+                self._thread.start()
+            os.write(self._wakeup_w, b'\0')
+            # Esperamos a escuchar antes de que el llamador lea el estado de la BD,
+            # para no perder eventos que lleguen justo entre medias
+            self._lock.wait_for(lambda: channel in self._active, timeout=LISTEN_TIMEOUT)
+
+    def stop(self):
+        """Cierra la conexión LISTEN (p. ej. antes de borrar la BD de tests)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping = True
+            self._channels = set()
+            self._active = set()
+            os.write(self._wakeup_w, b'\0')
+        thread.join()
+        self._stopping = False
+
+    def _connect(self):
+        import psycopg2
+
+        params = connections['default'].get_connection_params()
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+        with self._lock:
+            # Tras (re)conectar hay que volver a escuchar todos los canales
+            self._pending = set(self._channels)
+            self._active = set()
+        return conn
+
+    def _run(self):
+        conn = None
+        reconnecting = False
+        while not self._stopping:
+            try:
+                if conn is None:
+                    conn = self._connect()
+                    if reconnecting:
+                        self._resync()
+                    reconnecting = True
+                self._listen_pending(conn)
+                ready, _, _ = select.select([conn, self._wakeup_r], [], [], 60)
+                if self._wakeup_r in ready:
+                    os.read(self._wakeup_r, 1024)
+                if conn in ready:
+                    conn.poll()
+                    while conn.notifies:
+                        self._handle(conn.notifies.pop(0))
+            except Exception:
+                logger.exception('Error en la conexión LISTEN de drafts')
+                try:
+                    if conn is not None:
+                        conn.close()
+                finally:
+                    conn = None
+                time.sleep(RECONNECT_DELAY)
+        if conn is not None:
+            conn.close()
+
+    def _listen_pending(self, conn):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return
+        with conn.cursor() as cursor:
+            for channel in pending:
+                cursor.execute(f'LISTEN "{channel}"')
+        with self._lock:
+            self._active |= pending
+            self._lock.notify_all()
+
+    def _resync(self):
+        # Mientras no escuchábamos se pueden haber perdido eventos: los motores
+        # de estos drafts se reconstruirán desde la BD en el siguiente acceso.
+        from draft.engine import engines
+
+        with self._lock:
+            channels = list(self._channels)
+        for channel in channels:
+            engines.forget(int(channel.split('_', 1)[1]), keep_last_seen=True)
+
+    def _handle(self, notification):
+        from draft.events import dispatch
+
+        try:
+            payload = json.loads(notification.payload)
+            draft_id = int(notification.channel.split('_', 1)[1])
+        except (ValueError, IndexError):
+            logger.warning('NOTIFY de draft inválido en %s', notification.channel)
+            return
+        if payload.get('origin') == ORIGIN:
+            return
+        for event in payload.get('events', []):
+            dispatch(draft_id, event)
+
+
+listener = DraftListener()
@@ -0,0 +1,16 @@
+from draft.types import DraftOrder
+
+
+def build_schedule(users, rounds, order_type=DraftOrder.LINEAR):
+    """
+    Lista de (pick_number, round, user) para todas las rondas del draft.
+    En modo serpiente las rondas impares van en orden inverso.
+    """
+    schedule = []
+    for round_number in range(rounds):
+        round_users = users
+        if order_type == DraftOrder.SNAKE and round_number % 2 == 1:
+            round_users = list(reversed(users))
+        for user in round_users:
+            schedule.append((len(schedule), round_number, user))
+    return schedule
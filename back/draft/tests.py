@@ -1,3 +1,253 @@
-from django.test import TestCase
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from draft.broadcast import broadcaster, draft_topic
+from draft.events import emit
+from draft.models import Draft, DraftEvent, DraftPick
+from draft.schedule import build_schedule
+from draft.engine import engines
+from draft.notify import listener
+from draft.types import DraftEventType, DraftOrder, DraftStatus
+from league.models import League
+from players.models import DraftPlayer, Player
+from team.models import Team
+from users.models import DraftUser, User
+
+
+def tearDownModule():
+    # La conexión LISTEN impediría borrar la BD de tests
+    listener.stop()
+
+
+class PlayersPoolTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        league = League.objects.create(name='Liga')
+        cls.draft = Draft.objects.create(league=league, name='Draft', status=DraftStatus.IN_PROGRESS)
+        cls.draft_players = [
+            DraftPlayer.objects.create(
+                player=Player.objects.create(name=f'Jugador {i}', gender='M', position='FW', element='fire'),
+                name=f'Jugador {i}',
+                draft=cls.draft,
+            )
+            for i in range(30)
+        ]
+        cls.url = f'/api/draft/{cls.draft.id}/players'
+
+    def setUp(self):
+        engines.forget(self.draft.id)
+
+    def test_pool_is_served_from_memory_after_load(self):
+        # Carga del motor: draft, pool (join con Player), calendario y equipos
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 30)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, response.content)
+
+    def test_pick_updates_pool_without_queries(self):
+        self.client.get(self.url)
+
+        taken = self.draft_players[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            emit(self.draft.id, DraftEventType.PLAYER_TAKEN, {'draft_player_id': taken.id, 'team_id': None})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        ids = [p['id'] for p in response.json()]
+        self.assertEqual(len(ids), 29)
+        self.assertNotIn(taken.id, ids)
+
+    def test_engine_rebuilds_from_db(self):
+        self.client.get(self.url)
+        DraftPlayer.objects.filter(id=self.draft_players[1].id).update(draft=None)
+
+        # Tras un reinicio el motor se reconstruye con el estado de la BD
+        engines.forget(self.draft.id)
+        self.assertEqual(len(self.client.get(self.url).json()), 29)
+
+
+    async def test_players_stream_replays_a_gap_instead_of_skipping_it(self):
+        response = await self.async_client.get(f'/api/draft/{self.draft.id}/players/stream')
+        content = response.streaming_content
+        self.assertIn(b'event: snapshot', await anext(content))
+
+        # Un pick, un cambio de turno y otro pick confirmados; el último se publica primero
+        events = []
+        for seq, (event_type, data) in enumerate([
+            (DraftEventType.PLAYER_TAKEN, {'draft_player_id': self.draft_players[0].id, 'team_id': None}),
+            (DraftEventType.TURN_CHANGED, {'draft_user_id': None, 'username': None, 'current_pick': 1}),
+            (DraftEventType.PLAYER_TAKEN, {'draft_player_id': self.draft_players[1].id, 'team_id': None}),
+        ], start=1):
+            events.append({'seq': seq, 'type': event_type, 'data': data})
+            await DraftEvent.objects.acreate(draft_id=self.draft.id, **events[-1])
+        for event in reversed(events):
+            broadcaster.publish(draft_topic(self.draft.id), event)
+
+        taken = [json.loads(chunk.decode().split('data: ')[1])['draft_player_id'] for chunk in [
+            await anext(content), await anext(content),
+        ]]
+        self.assertEqual(taken, [self.draft_players[0].id, self.draft_players[1].id])
+        await content.aclose()
+
+
+class OutOfOrderEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = League.objects.create(name='Liga')
+        cls.draft = Draft.objects.create(league=cls.league, name='Draft', status=DraftStatus.FINISHED)
+
+    async def _log(self, seq, event_type=DraftEventType.RESULT_APPROVED):
+        """Evento ya confirmado en el log pero todavía sin publicar."""
+        event = {'seq': seq, 'type': event_type, 'data': {'game_id': seq}}
+        await DraftEvent.objects.acreate(draft_id=self.draft.id, **event)
+        await Draft.objects.filter(id=self.draft.id).aupdate(event_seq=seq)
+        return event
+
+    async def test_events_stream_replays_a_gap_instead_of_skipping_it(self):
+        response = await self.async_client.get('/api/events', {'topics': f'league:{self.league.id}:fixtures'})
+        content = response.streaming_content
+        self.assertIn(b'event: subscribed', await anext(content))
+
+        # Se publica el 2 sin haber llegado el 1: lo que falta sale del log, en orden
+        first, second, third = [await self._log(seq) for seq in (1, 2, 3)]
+        broadcaster.publish(draft_topic(self.draft.id), second)
+        replayed = [await anext(content) for _ in range(3)]
+        self.assertEqual(
+            [json.loads(chunk.decode().split('data: ')[1])['game_id'] for chunk in replayed], [1, 2, 3],
+        )
+        # Los que llegan tarde ya se han mandado
+        broadcaster.publish(draft_topic(self.draft.id), first)
+        broadcaster.publish(draft_topic(self.draft.id), third)
+        fourth = await self._log(4)
+        broadcaster.publish(draft_topic(self.draft.id), fourth)
+        self.assertIn(b'"game_id": 4', await anext(content))
+        await content.aclose()
+
+
+class PickScheduleTests(TestCase):
+    def test_snake_reverses_every_other_round(self):
+        schedule = build_schedule(['a', 'b', 'c'], 3, DraftOrder.SNAKE)
+        self.assertEqual([user for _, _, user in schedule], list('abccbaabc'))
+        self.assertEqual([pick for pick, _, _ in schedule], list(range(9)))
+        self.assertEqual([round_number for _, round_number, _ in schedule], [0] * 3 + [1] * 3 + [2] * 3)
+
+    def test_start_materializes_the_schedule_and_finish_closes_it(self):
+        league = League.objects.create(name='Liga')
+        draft = Draft.objects.create(league=league, name='Draft')
+        for i in range(4):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            DraftUser.objects.create(user=user, draft=draft)
+        for i in range(8):
+            player = Player.objects.create(name=f'Jugador {i}', gender='M', position='FW', element='fire')
+            DraftPlayer.objects.create(player=player, name=player.name, draft=draft)
+
+        response = self.client.put(
+            f'/api/draft/{draft.id}/start', {'order_type': 'snake'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        draft.refresh_from_db()
+        order = dict(DraftUser.objects.filter(draft=draft).values_list('id', 'order'))
+        picks = [order[draft_user_id] for draft_user_id in draft.picks.values_list('draft_user_id', flat=True)]
+        self.assertEqual(picks, [0, 1, 2, 3, 3, 2, 1, 0])
+        self.assertEqual(draft.order_type, DraftOrder.SNAKE)
+        self.assertEqual(order[draft.current_draft_user_id], 0)
+
+        # Al terminar, estado y evento se guardan juntos y el turno se vacía
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.put(f'/api/draft/{draft.id}/finish').status_code, 200)
+        draft.refresh_from_db()
+        self.assertEqual((draft.status, draft.current_draft_user_id), (DraftStatus.FINISHED, None))
+        last = DraftEvent.objects.filter(draft=draft).order_by('-seq').first()
+        self.assertEqual((last.seq, last.type), (draft.event_seq, DraftEventType.DRAFT_FINISHED))
+        self.assertEqual(engines.get(draft.id).turn_state()['status'], DraftStatus.FINISHED)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class AcquirePlayerConcurrencyTests(TransactionTestCase):
+    USERS = 4
+    PLAYERS = 60
+    ATTEMPTS = 400
+
+    def setUp(self):
+        league = League.objects.create(name='Liga')
+        self.draft = Draft.objects.create(league=league, name='Draft', status=DraftStatus.IN_PROGRESS)
+
+        self.sessions = []
+        draft_users = []
+        for i in range(self.USERS):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=self.draft, order=i)
+            Team.objects.create(name=f'Equipo {i}', draft=self.draft, draft_user=draft_user, budget=Decimal('0'))
+            client = Client()
+            client.force_login(user)
+            self.sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+            draft_users.append(draft_user)
+
+        self.players = [
+            Player.objects.create(name=f'Jugador {i}', gender='M', position='FW', element='fire')
+            for i in range(self.PLAYERS)
+        ]
+        for player in self.players:
+            DraftPlayer.objects.create(player=player, name=player.name, draft=self.draft)
+
+        DraftPick.objects.bulk_create([
+            DraftPick(draft=self.draft, pick_number=pick_number, round=round_number, draft_user=draft_user)
+            for pick_number, round_number, draft_user in build_schedule(draft_users, self.PLAYERS // self.USERS)
+        ])
+        self.draft.current_draft_user = draft_users[0]
+        self.draft.save(update_fields=['current_draft_user'])
+        engines.forget(self.draft.id)
+
+    def _pick(self, attempt):
+        user_index, player = attempt
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = self.sessions[user_index]
+        try:
+            response = client.put(
+                f'/api/draft/{self.draft.id}/player',
+                {'draft_player_id': player.id},
+                content_type='application/json',
+            )
+            return user_index, player.id, response.status_code
+        finally:
+            connections.close_all()
+
+    def test_parallel_picks_never_assign_a_player_twice(self):
+        rng = random.Random(7)
+        attempts = [
+            (rng.randrange(self.USERS), rng.choice(self.players))
+            for _ in range(self.ATTEMPTS)
+        ]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(self._pick, attempts))
+
+        won = [(user_index, player_id) for user_index, player_id, status in results if status == 200]
+        self.assertTrue(won)
+        self.assertTrue(all(status in (200, 409) for _, _, status in results))
+
+        # Ningún jugador se concede dos veces y la BD coincide con las respuestas
+        won_players = [player_id for _, player_id in won]
+        self.assertEqual(len(won_players), len(set(won_players)))
+        taken = DraftPlayer.objects.filter(draft=self.draft, team__isnull=False)
+        self.assertEqual(set(taken.values_list('player_id', flat=True)), set(won_players))
+
+        # El turno avanzó exactamente una vez por pick y siguiendo el orden
+        self.draft.refresh_from_db()
+        self.assertEqual(self.draft.current_pick, len(won))
+        team_order = dict(Team.objects.filter(draft=self.draft).values_list('id', 'draft_user__order'))
+        picks = DraftEvent.objects.filter(draft=self.draft, type=DraftEventType.PLAYER_TAKEN).order_by('seq')
+        self.assertEqual(
+            [team_order[event.data['team_id']] for event in picks],
+            [i % self.USERS for i in range(len(won))],
+        )
@@ -3,4 +3,16 @@ from django.db import models
 class DraftStatus(models.TextChoices):
     NEW = 'new', 'Nuevo'
     IN_PROGRESS = 'in_progress', 'En curso'
-    FINISHED = 'finished', 'Finalizado'
\ No newline at end of file
+    FINISHED = 'finished', 'Finalizado'
+
+class DraftEventType(models.TextChoices):
+    DRAFT_STARTED = 'draft_started', 'Draft iniciado'
+    TURN_CHANGED = 'turn_changed', 'Cambio de turno'
+    PLAYER_TAKEN = 'player_taken', 'Jugador escogido'
+    DRAFT_FINISHED = 'draft_finished', 'Draft finalizado'
+    RESULT_APPROVED = 'result_approved', 'Resultado aprobado'
+
+
+class DraftOrder(models.TextChoices):
+    LINEAR = 'linear', 'Lineal'
+    SNAKE = 'snake', 'Serpiente'
@@ -1,80 +1,88 @@
 from django.shortcuts import render
-from django.http import JsonResponse, HttpRequest, StreamingHttpResponse
-from players.models import DraftPlayer, Player
+from django.http import JsonResponse, HttpRequest, HttpResponse, StreamingHttpResponse
+from players.models import DraftPlayer
 from users.models import DraftUser, User
-from draft.models import Draft
-from draft.types import DraftStatus
+from draft.models import Draft, DraftPick
+from draft.types import DraftStatus, DraftEventType, DraftOrder
+from draft.schedule import build_schedule
 from team.models import Team
 import time
 import random
 import json
 from django.views.decorators.csrf import csrf_exempt
-from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
 from players.models import DraftPlayer
 from team.models import Team
 from asgiref.sync import sync_to_async
+from draft.broadcast import broadcaster, draft_topic
+from draft.events import POOL_EVENTS, TURN_EVENTS, catch_up, emit_locked, events_since, format_event, format_sse, format_sse_raw, last_event_id, releasing_connection
+from draft.engine import apply_turn_event, engines, turn_payload
 import asyncio
 
+# Cada cuánto mandamos un comentario SSE para que los proxies no corten la conexión
+SSE_KEEPALIVE_SECONDS = 15
+
+
 def view_draft(request: HttpRequest, draft_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
-    
-    # try:
-    #     draft = Draft.objects.get(id=draft_id)
-    # except Draft.DoesNotExist:
-    #     return JsonResponse({'error': 'Draft no encontrado'}, status=404)
-    
-    # try:
-    #     user = User.objects.get(id=draft.current_draft_user.id)
-    # except User.DoesNotExist:
-    #     return JsonResponse({'error': 'Usuario no encontrado'}, status=404)
-    
-    # return JsonResponse(
-    #     {
-    #         'id': draft.id,
-    #         'name': draft.name,
-    #         'current_user': user.username,
-    #         'status': draft.status    
-    #     }, 
-    #     safe=False)
+
+    # Se sirve desde el motor en memoria; solo toca la BD al cargarlo
+    try:
+        state = engines.get(draft_id).turn_state()
+    except Draft.DoesNotExist:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+    return JsonResponse(turn_payload(state), safe=False)
 
 async def view_draft_stream(request: HttpRequest, draft_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
-    
-    # async def event_stream():
-    #     last_draft = None
-
-    #     while True:
-    #         try:
-    #             # Recargar el draft cada ciclo
-    #             draft = await sync_to_async(Draft.objects.get)(id=draft_id)
-    #         except Draft.DoesNotExist:
-    #             yield f"data: {json.dumps({'error': 'Draft no encontrado'})}\n\n"
-    #             break
-            
-    #         last_draft_user_id = last_draft.current_draft_user_id if last_draft else None
-
-    #         if draft.current_draft_user_id != last_draft_user_id:
-    #             last_draft = draft
-    #             draft_user = await sync_to_async(DraftUser.objects.get)(id=draft.current_draft_user_id)
-    #             user = await sync_to_async(User.objects.get)(id=draft_user.user_id)
 
-    #             response_data = {
-    #                 'id': draft.id,
-    #                 'name': draft.name,
-    #                 'current_user': user.username,
-    #                 'status': draft.status,
-    #             }
+    subscription = broadcaster.subscribe(draft_topic(draft_id))
+    try:
+        engine = await sync_to_async(releasing_connection(engines.get))(draft_id)
+        state = engine.turn_state()
+    except Draft.DoesNotExist:
+        subscription.close()
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    except Exception:
+        subscription.close()
+        raise
 
-    #             json_data = json.dumps(response_data, cls=DjangoJSONEncoder)
-    #             yield f"data: {json_data}\n\n"
+    async def event_stream():
+        current = state
+        with subscription:
+            # El estado de turno es pequeño: al (re)conectar siempre mandamos el actual
+            yield format_sse('state', turn_payload(current), seq=current['seq'])
+            if current['status'] == DraftStatus.FINISHED:
+                return
 
-    #         await asyncio.sleep(2)
+            # Cada evento se aplica sobre el estado local, sin consultar la BD
+            while True:
+                try:
+                    event = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                pending = await catch_up(draft_id, current['seq'], event)
+                if pending is None:
+                    # Hueco mayor que REPLAY_LIMIT: se manda el estado actual del motor
+                    current = engine.turn_state()
+                    pending = []
+                    yield format_sse('state', turn_payload(current), seq=current['seq'])
+                changed = False
+                for event in pending:
+                    current = apply_turn_event(current, event)
+                    changed = changed or event['type'] in TURN_EVENTS
+                if changed:
+                    yield format_sse('state', turn_payload(current), seq=current['seq'])
+                if current['status'] == DraftStatus.FINISHED:
+                    break
 
-    # response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
-    # response['Cache-Control'] = 'no-cache'
-    # return response
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 def get_players_by_draft(request: HttpRequest, draft_id):
@@ -82,97 +90,149 @@ def get_players_by_draft(request: HttpRequest, draft_id):
         return JsonResponse({'error': 'Método no permitido'}, status=405)
     
     try:
-        draft = Draft.objects.get(id=draft_id)
+        engine = engines.get(draft_id)
     except Draft.DoesNotExist:
         return JsonResponse({'error': 'Draft no encontrado'}, status=404)
     
-    if draft.status != DraftStatus.IN_PROGRESS:
+    if engine.turn_state()['status'] != DraftStatus.IN_PROGRESS:
         return JsonResponse({'error': 'El Draft no ha comenzado'}, status=409)
-        
-    players = DraftPlayer.objects.filter(draft=draft_id, team_id=None)
-    data = list(players.values())
-    
-    players_response = []
-    for player in data:
-        player_instance = Player.objects.get(id=player['player_id'])
-        players_response.append(
-            {**player, 'position': player_instance.position, 'element': player_instance.element, 'sprite': player_instance.sprite.url if player_instance.sprite.url else None, 'value': player_instance.value}
-        )
-    
-    return JsonResponse(players_response, safe=False)
+
+    return HttpResponse(engine.pool_json(), content_type='application/json')
 
 # Funcion SSE
 async def get_players_by_draft_stream(request: HttpRequest, draft_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
 
-    # Obtener el draft de forma asíncrona
+    # Motor del draft en memoria (solo consulta la BD si no está cargado)
     try:
-        draft = await sync_to_async(Draft.objects.get)(id=draft_id)
+        engine = await sync_to_async(releasing_connection(engines.get))(draft_id)
     except Draft.DoesNotExist:
         return JsonResponse({'error': 'Draft no encontrado'}, status=404)
 
-    if draft.status != DraftStatus.IN_PROGRESS:
+    if engine.turn_state()['status'] != DraftStatus.IN_PROGRESS:
         return JsonResponse({'error': 'El Draft no ha comenzado'}, status=409)
 
-    async def event_stream():
-        last_players_data = None
-        while True:
-            # Obtener los jugadores sin equipo de forma asíncrona
-            players_qs = await sync_to_async(list)(
-                DraftPlayer.objects.filter(draft=draft_id, team_id=None).values()
-            )
-
-            if players_qs != last_players_data:
-                last_players_data = players_qs
-
-                players_response = []
-                for player in players_qs:
-                    player_instance = await sync_to_async(Player.objects.get)(id=player['player_id'])
-                    players_response.append({
-                        **player,
-                        'position': player_instance.position,
-                        'element': player_instance.element,
-                        'sprite': player_instance.sprite.url if player_instance.sprite else None,
-                        'value': player_instance.value
-                    })
+    # Nos suscribimos antes de leer nada para no perder ningún evento: lo que
+    # llegue mientras preparamos la respuesta se filtra después por seq.
+    subscription = broadcaster.subscribe(draft_topic(draft_id))
+    try:
+        snapshot_seq, players = engine.snapshot()
+        resume_from = last_event_id(request)
+        missed = None
+        if resume_from is not None and resume_from <= snapshot_seq:
+            # Reconexión: solo los eventos perdidos, con una consulta indexada
+            missed = await sync_to_async(releasing_connection(events_since))(draft_id, resume_from, POOL_EVENTS)
+    except Exception:
+        subscription.close()
+        raise
 
-                json_data = json.dumps(players_response, cls=DjangoJSONEncoder)
-                yield f"data: {json_data}\n\n"
+    async def event_stream():
+        with subscription:
+            if missed is None:
+                cursor = snapshot_seq
+                yield format_sse_raw('snapshot', f'{{"seq": {cursor}, "players": {players}}}', seq=cursor)
+            else:
+                cursor = resume_from
+                for event in missed:
+                    cursor = event['seq']
+                    yield format_event(event)
+                    if event['type'] == DraftEventType.DRAFT_FINISHED:
+                        return
 
-            # Esperar sin bloquear el event loop
-            await asyncio.sleep(2)
+            # A partir de aquí solo mandamos deltas, sin consultar la BD
+            while True:
+                try:
+                    event = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                # El cursor avanza con todos los eventos del draft, no solo los del pool,
+                # para que un hueco en la secuencia se note y se rellene desde el log
+                pending = await catch_up(draft_id, cursor, event)
+                if pending is None:
+                    # Hueco mayor que REPLAY_LIMIT: se vuelve a mandar el pool entero
+                    cursor, players_json = engine.snapshot()
+                    yield format_sse_raw('snapshot', f'{{"seq": {cursor}, "players": {players_json}}}', seq=cursor)
+                    continue
+                for event in pending:
+                    cursor = event['seq']
+                    if event['type'] not in POOL_EVENTS:
+                        continue
+                    yield format_event(event)
+                    if event['type'] == DraftEventType.DRAFT_FINISHED:
+                        return
 
     response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
     response['Cache-Control'] = 'no-cache'
     return response
 
+def _turn_data(draft_user_id, username, current_pick):
+    return {
+        'draft_user_id': draft_user_id,
+        'username': username,
+        'current_pick': current_pick,
+    }
+
+
 @csrf_exempt
 def start_draft(request: HttpRequest, draft_id):
     if request.method != 'PUT':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
-    
+
     try:
-        draft = Draft.objects.get(id=draft_id)
-    except Draft.DoesNotExist:
-        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+        data = json.loads((request.body or b"{}").decode("utf-8")) or {}
+    except Exception:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
 
-    draft.status = DraftStatus.IN_PROGRESS
-    draft.save(update_fields=['status'])
-    
-    users = list(DraftUser.objects.filter(draft=draft_id))
-    
-    if not users:
-        return JsonResponse({'error': 'No hay jugadores en este draft'}, status=404)
-    
-    random.shuffle(users)
-    
-    for i, draft_player in enumerate(users):
-        draft_player.order = i
-        draft_player.save(update_fields=['order'])
-    
-    draft.current_draft_user = users[0]
-    draft.save(update_fields=['current_draft_user'])
+    order_type = data.get('order_type', DraftOrder.LINEAR)
+    if order_type not in DraftOrder.values:
+        return JsonResponse({'error': 'Tipo de orden no válido'}, status=400)
+
+    rounds = data.get('rounds')
+    if rounds is not None and (not isinstance(rounds, int) or rounds < 1):
+        return JsonResponse({'error': 'Número de rondas no válido'}, status=400)
+
+    with transaction.atomic():
+        try:
+            draft = Draft.objects.select_for_update().get(id=draft_id)
+        except Draft.DoesNotExist:
+            return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+        users = list(DraftUser.objects.filter(draft=draft_id).select_related('user'))
+
+        if not users:
+            return JsonResponse({'error': 'No hay jugadores en este draft'}, status=404)
+
+        random.shuffle(users)
+
+        for i, draft_user in enumerate(users):
+            draft_user.order = i
+        DraftUser.objects.bulk_update(users, ['order'])
+
+        # Por defecto, tantas rondas como jugadores le tocan a cada equipo
+        if rounds is None:
+            rounds = max(1, DraftPlayer.objects.filter(draft=draft_id).count() // len(users))
+
+        # Materializamos el calendario completo de picks de una vez
+        DraftPick.objects.filter(draft=draft).delete()
+        DraftPick.objects.bulk_create([
+            DraftPick(draft=draft, pick_number=pick_number, round=round_number, draft_user=draft_user)
+            for pick_number, round_number, draft_user in build_schedule(users, rounds, order_type)
+        ])
+
+        draft.status = DraftStatus.IN_PROGRESS
+        draft.order_type = order_type
+        draft.current_draft_user = users[0]
+        draft.current_pick = 0
+        emit_locked(draft, [
+            (DraftEventType.DRAFT_STARTED, {}),
+            (DraftEventType.TURN_CHANGED, _turn_data(users[0].id, users[0].user.username, 0)),
+        ])
+        draft.save(update_fields=['status', 'order_type', 'current_draft_user', 'current_pick', 'event_seq'])
+
+        # El motor en memoria se carga una vez, con el calendario ya confirmado
+        transaction.on_commit(lambda: engines.load(draft.id))
 
     return JsonResponse({'message': 'Draft actualizado correctamente'})
     
@@ -182,13 +242,20 @@ def finish_draft(request: HttpRequest, draft_id):
     if request.method != 'PUT':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    try:
-        draft = Draft.objects.get(id=draft_id)
-    except Draft.DoesNotExist:
-        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    # Como en start_draft y acquire_player: estado y evento en la misma
+    # transacción, con el draft bloqueado para que ningún pick se cuele entre medias
+    with transaction.atomic():
+        try:
+            draft = Draft.objects.select_for_update().get(id=draft_id)
+        except Draft.DoesNotExist:
+            return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+        draft.status = DraftStatus.FINISHED
+        draft.current_draft_user = None
+        emit_locked(draft, [(DraftEventType.DRAFT_FINISHED, {})])
+        draft.save(update_fields=['status', 'current_draft_user', 'event_seq'])
 
-    draft.status = DraftStatus.FINISHED
-    draft.save(update_fields=['status'])
+        transaction.on_commit(lambda: engines.load(draft.id))
 
     return JsonResponse({'message': 'Draft actualizado correctamente'})
 
@@ -207,47 +274,81 @@ def acquire_player(request: HttpRequest, draft_id):
     if not draft_player_id:
         return JsonResponse({'error': 'Faltan parámetros'}, status=400)
 
-    # Sacamos la instancia de draft
     try:
-        draft = Draft.objects.get(id=draft_id)
+        draft_player_id = int(draft_player_id)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
+
+    try:
+        engine = engines.get(draft_id)
     except Draft.DoesNotExist:
         return JsonResponse({'error': 'Draft no encontrado'}, status=404)
-    
-    # Sacamos el usuario del draft
-    try:
-        draft_user = DraftUser.objects.get(draft=draft, user=request.user)
-    except DraftUser.DoesNotExist:
-        return JsonResponse({'error': 'Usuario no encontrado'}, status=404)
-    
-    if draft.current_draft_user != draft_user:
-        return JsonResponse({'error': 'No es tu turno'}, status=409)
 
-    # Sacamos el jugador de draft
-    try:
-        player = Player.objects.get(id=draft_player_id)
-    except DraftPlayer.DoesNotExist:
-        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
-    
-    try:
-        draft_player = DraftPlayer.objects.get(player=player)
-    except DraftPlayer.DoesNotExist:
-        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
-    
-    # Sacamos el equipo
-    try:
-        team = Team.objects.get(draft=draft, draft_user=draft_user)
-    except Team.DoesNotExist:
+    # Equipo del usuario en este draft: del motor o, si aún no lo conoce, de la BD
+    membership = engine.team_for(request.user.id)
+    if membership is None:
+        membership = (
+            Team.objects
+            .filter(draft_id=draft_id, draft_user__user_id=request.user.id)
+            .values_list('draft_user_id', 'id')
+            .first()
+        )
+    if membership is None:
         return JsonResponse({'error': 'Equipo no encontrado'}, status=404)
+    draft_user_id, team_id = membership
 
-    # Actualizamos
-    draft_player.team = team
-    draft_player.save(update_fields=['team'])
-    
-    users = list(DraftUser.objects.filter(draft=draft_id).order_by('order'))
-    
-    current_user = DraftUser.objects.get(id=draft.current_draft_user.id)
-    
-    draft.current_draft_user = users[(current_user.order + 1) % len(users)]
-    draft.save(update_fields=['current_draft_user'])
+    # Comprobaciones en memoria que no pueden quedarse obsoletas: un jugador
+    # escogido nunca vuelve al pool, así que rechazamos sin tocar la BD.
+    pick_id = engine.draft_player_id(draft_player_id)
+    if pick_id is None:
+        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
+    if not engine.is_available(pick_id):
+        return JsonResponse({'error': 'El jugador ya ha sido escogido'}, status=409)
+
+    # Todo el pick ocurre bajo el bloqueo de la fila del draft: dos peticiones
+    # simultáneas no pueden pasar a la vez la comprobación de turno. La BD manda
+    # porque el motor de otro proceso puede ir un evento por detrás.
+    with transaction.atomic():
+        try:
+            draft = Draft.objects.select_for_update().get(id=draft_id)
+        except Draft.DoesNotExist:
+            return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+        if draft.status != DraftStatus.IN_PROGRESS:
+            return JsonResponse({'error': 'El Draft no ha comenzado'}, status=409)
+
+        if draft.current_draft_user_id != draft_user_id:
+            return JsonResponse({'error': 'No es tu turno'}, status=409)
+
+        # Solo lo reclamamos si sigue libre
+        claimed = DraftPlayer.objects.filter(id=pick_id, draft_id=draft_id, team__isnull=True).update(team_id=team_id)
+        if not claimed:
+            return JsonResponse({'error': 'El jugador ya ha sido escogido'}, status=409)
+
+        # Siguiente turno desde el calendario en memoria si el motor está al día;
+        # si no, búsqueda por índice en el calendario materializado.
+        draft.current_pick += 1
+        if engine.seq == draft.event_seq:
+            next_turn = engine.user_for_pick(draft.current_pick)
+        else:
+            next_turn = (
+                DraftPick.objects
+                .filter(draft_id=draft_id, pick_number=draft.current_pick)
+                .values_list('draft_user_id', 'draft_user__user__username')
+                .first()
+            )
+
+        events = [(DraftEventType.PLAYER_TAKEN, {'draft_player_id': pick_id, 'team_id': team_id})]
+        if next_turn is not None:
+            draft.current_draft_user_id = next_turn[0]
+            events.append((DraftEventType.TURN_CHANGED, _turn_data(*next_turn, draft.current_pick)))
+        else:
+            # Se acabó el calendario: el draft termina solo
+            draft.current_draft_user = None
+            draft.status = DraftStatus.FINISHED
+            events.append((DraftEventType.DRAFT_FINISHED, {}))
+
+        emit_locked(draft, events)
+        draft.save(update_fields=['current_draft_user', 'current_pick', 'status', 'event_seq'])
     
     return JsonResponse({'message': 'Jugador adquirido correctamente'})
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from draft.models import Draft
+from games.schedule import generate_fixtures
+
+
+class Command(BaseCommand):
+    help = "Genera el calendario a doble vuelta (todos contra todos) con los equipos del draft."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--draft-id", type=int, required=True, help="Draft del que generar el calendario.")
+        parser.add_argument("--single", action="store_true", help="Solo ida, sin vuelta.")
+        parser.add_argument("--replace", action="store_true", help="Sustituye el calendario si aún no se ha jugado nada.")
+        parser.add_argument("--seed", type=int, default=None, help="Semilla del sorteo de equipos.")
+
+    def handle(self, *args, **options):
+        try:
+            draft = Draft.objects.get(id=options["draft_id"])
+        except Draft.DoesNotExist:
+            raise CommandError(f"No existe el draft {options['draft_id']}.")
+
+        try:
+            games = generate_fixtures(
+                draft, double=not options["single"], replace=options["replace"], seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        weeks = max(game.week for game in games)
+        self.stdout.write(self.style.SUCCESS(f"✅ Calendario creado: {len(games)} partidos en {weeks} jornadas."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0007_alter_draftevent_type'),
+        ('games', '0001_initial'),
+        ('team', '0004_lineup_team_current_lineup_lineupslot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['draft', 'week'], name='games_game_draft_i_ba11ec_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_draft_from_game(apps, schema_editor):
+    GameResultRequest = apps.get_model('games', 'GameResultRequest')
+    Game = apps.get_model('games', 'Game')
+    GameResultRequest.objects.filter(draft__isnull=True).update(
+        draft=Subquery(Game.objects.filter(id=OuterRef('game_id')).values('draft_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0008_draft_results_version'),
+        ('games', '0002_game_games_game_draft_i_ba11ec_idx'),
+        ('players', '0003_remove_draftplayer_value'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameresultrequest',
+            name='draft',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='result_requests', to='draft.draft'),
+        ),
+        migrations.RunPython(copy_draft_from_game, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='gameresultrequest',
+            index=models.Index(fields=['status', 'draft', 'id'], name='games_gamer_status_94bf3b_idx'),
+        ),
+    ]
@@ -19,12 +19,20 @@ class Game(models.Model):
     
     draft = models.ForeignKey(Draft, on_delete=models.CASCADE)
     
+    class Meta:
+        # Calendario por jornada y paginación por (week, id)
+        indexes = [
+            models.Index(fields=['draft', 'week']),
+        ]
+    
     def __str__(self):
         return f'{self.local_team} VS {self.away_team}'
 
 class GameResultRequest(models.Model):
     # Partido
     game = models.ForeignKey(Game, on_delete=models.CASCADE)
+    # Draft del partido, copiado al guardar para filtrar la cola de moderación sin join
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, null=True, editable=False, related_name='result_requests')
     
     # Goles locales y visitantes
     local_goals = models.IntegerField(null=True, blank=True)
@@ -40,6 +48,17 @@ class GameResultRequest(models.Model):
     # Estado de la solicitud
     status = models.CharField(choices=GameResultRequestStatus, default=GameResultRequestStatus.PENDING, max_length=100)
     
+    class Meta:
+        # Cola de moderación: pendientes de un draft paginadas por id
+        indexes = [
+            models.Index(fields=['status', 'draft', 'id']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if self.draft_id is None:
+            self.draft_id = self.game.draft_id
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f'Resultado propuesto para {self.game}'
 
@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+from django.db.models import Case, F, IntegerField, Value, When
+
+from draft.events import emit_locked
+from draft.types import DraftEventType
+from games.models import Game, GameResultRequest, Stats
+from games.types import GameResultRequestStatus, GameStatus
+from players.models import DraftPlayer
+from ranking.leaders import apply_player_stats, player_deltas
+from ranking.standings import DRAW_POINTS, WIN_POINTS, apply_standings, record_completed_weeks
+from team.ledger import record
+from team.models import BudgetMovement, Team
+from team.types import BudgetMovementType
+
+# Premios por resultado
+WIN_BUDGET = 8000000
+LOSS_BUDGET = 2000000
+DRAW_BUDGET = 5000000
+
+
+def parse_goals(game_result_request):
+    """Goles por jugador de la solicitud con ids enteros, o None si el JSON no es válido."""
+    try:
+        return {int(player_id): player_goals for player_id, player_goals in (game_result_request.goals or {}).items()}
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def player_teams(draft_player_ids):
+    """Equipo de cada jugador que existe, {id: team_id}, con una sola consulta."""
+    if not draft_player_ids:
+        return {}
+    return dict(DraftPlayer.objects.filter(id__in=draft_player_ids).values_list('id', 'team_id'))
+
+
+def scorer_goals(game_result_requests):
+    """
+    Valida los goleadores de varias solicitudes (con su partido cargado) con
+    una sola consulta. Devuelve {id de solicitud: goles}, con None en las que
+    referencian jugadores que no existen o que no son de ninguno de los dos
+    equipos del partido.
+    """
+    parsed = {result_request.id: parse_goals(result_request) for result_request in game_result_requests}
+    teams = player_teams({player_id for goals in parsed.values() if goals for player_id in goals})
+    valid = {}
+    for result_request in game_result_requests:
+        goals = parsed[result_request.id]
+        sides = {result_request.game.local_team_id, result_request.game.away_team_id}
+        if goals is not None and all(teams.get(player_id) in sides for player_id in goals):
+            valid[result_request.id] = goals
+        else:
+            valid[result_request.id] = None
+    return valid
+
+
+def _delta_case(deltas, output_field):
+    return Case(
+        *[When(id=team_id, then=Value(delta)) for team_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def apply_results(draft, approved):
+    """
+    Aprueba las solicitudes y aplica sus resultados: partidos, presupuesto y
+    puntos de los equipos, clasificación y estadísticas de los jugadores
+    (por partido y acumuladas).
+    `approved` es una lista de (solicitud con su partido, goles validados).
+
+    Debe llamarse dentro de transaction.atomic con el draft bloqueado
+    (select_for_update). El número de consultas es fijo sea cual sea el número
+    de partidos o goleadores. Los premios se apuntan en el libro de presupuesto
+    y saldo y puntos se suman en la BD con F(), así que ninguna otra escritura
+    sobre el equipo se pierde.
+    """
+    if not approved:
+        return
+
+    points = defaultdict(int)
+    games, stats, goalkeepers, events, movements = [], [], [], [], []
+
+    for game_result_request, goals in approved:
+        game = game_result_request.game
+        game.local_goals = game_result_request.local_goals
+        game.away_goals = game_result_request.away_goals
+        game.status = GameStatus.FINISHED
+
+        # Calculamos el ganador
+        if game.local_goals != game.away_goals:
+            local_wins = game.local_goals > game.away_goals
+            game.winner_id = game.local_team_id if local_wins else game.away_team_id
+            loser_id = game.away_team_id if local_wins else game.local_team_id
+            points[game.winner_id] += WIN_POINTS
+            rewards = [(game.winner_id, WIN_BUDGET), (loser_id, LOSS_BUDGET)]
+        else:
+            game.winner_id = None
+            for team_id in (game.local_team_id, game.away_team_id):
+                points[team_id] += DRAW_POINTS
+            rewards = [(game.local_team_id, DRAW_BUDGET), (game.away_team_id, DRAW_BUDGET)]
+        movements.extend(
+            BudgetMovement(team_id=team_id, type=BudgetMovementType.MATCH_REWARD, amount=amount, game=game)
+            for team_id, amount in rewards if team_id is not None
+        )
+        games.append(game)
+
+        # Estadísticas de goleadores y porteros
+        stats.extend(
+            Stats(game=game, draft_player_id=draft_player_id, goals=player_goals)
+            for draft_player_id, player_goals in goals.items()
+        )
+        if game_result_request.local_goalkeeper_id:
+            stats.append(Stats(
+                game=game, draft_player_id=game_result_request.local_goalkeeper_id, goals_against=game.away_goals,
+            ))
+            goalkeepers.append((game_result_request.local_goalkeeper_id, game.away_goals))
+        if game_result_request.away_goalkeeper_id:
+            stats.append(Stats(
+                game=game, draft_player_id=game_result_request.away_goalkeeper_id, goals_against=game.local_goals,
+            ))
+            goalkeepers.append((game_result_request.away_goalkeeper_id, game.local_goals))
+
+        events.append((DraftEventType.RESULT_APPROVED, {
+            'game_id': game.id,
+            'week': game.week,
+            'local_team_id': game.local_team_id,
+            'away_team_id': game.away_team_id,
+            'local_goals': game.local_goals,
+            'away_goals': game.away_goals,
+            'winner_id': game.winner_id,
+        }))
+
+    points.pop(None, None)
+    # Premios al libro de presupuesto (y al saldo cacheado) y puntos, sumados en la BD
+    record(movements)
+    Team.objects.filter(id__in=points).update(points=F('points') + _delta_case(points, IntegerField()))
+    Stats.objects.bulk_create(stats)
+    apply_player_stats(draft.id, player_deltas(stats, goalkeepers))
+    GameResultRequest.objects.filter(
+        id__in=[game_result_request.id for game_result_request, _ in approved],
+    ).update(status=GameResultRequestStatus.APPROVED)
+    Game.objects.bulk_update(games, ['winner', 'local_goals', 'away_goals', 'status'])
+    apply_standings(draft.id, [
+        (game.local_team_id, game.away_team_id, game.local_goals, game.away_goals) for game in games
+    ])
+    # Foto de la clasificación de las jornadas que queden cerradas
+    record_completed_weeks(draft.id, {game.week for game in games})
+
+    # Avisamos a los clientes conectados (en cualquier worker) de los nuevos resultados
+    emit_locked(draft, events)
+    draft.results_version += 1
+    draft.save(update_fields=['event_seq', 'results_version'])
+
+
+def reject_results(game_result_requests):
+    """Rechaza las solicitudes y devuelve sus partidos a pendiente (dos consultas)."""
+    if not game_result_requests:
+        return
+    GameResultRequest.objects.filter(
+        id__in=[game_result_request.id for game_result_request in game_result_requests],
+    ).update(status=GameResultRequestStatus.REJECTED)
+    Game.objects.filter(
+        id__in=[game_result_request.game_id for game_result_request in game_result_requests],
+    ).update(status=GameStatus.PENDING)
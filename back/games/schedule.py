@@ -0,0 +1,71 @@
+import random
+
+from django.db import transaction
+from django.db.models import F
+
+from draft.models import Draft
+from games.models import Game
+from games.types import GameStatus
+from team.models import Team
+
+
+def round_robin(team_ids, double=True):
+    """
+    Calendario de liga por el método del círculo: lista de (jornada, local,
+    visitante). Con un número impar de equipos cada jornada descansa uno.
+    Los locales se alternan jornada a jornada (en cada vuelta nadie juega
+    en casa más de una vez de diferencia con el resto) y la segunda vuelta
+    repite la primera cambiando el campo.
+    """
+    teams = list(team_ids)
+    if len(teams) < 2:
+        return []
+    if len(teams) % 2:
+        # Hueco de descanso fijo: quien se cruza con None no juega esa jornada
+        teams.insert(0, None)
+
+    size = len(teams)
+    rounds = size - 1
+    fixtures = []
+    for round_number in range(rounds):
+        for i in range(size // 2):
+            home, away = teams[i], teams[size - 1 - i]
+            # El fijo alterna campo cada jornada; el resto, según el cruce
+            if (i == 0 and round_number % 2) or (i > 0 and i % 2):
+                home, away = away, home
+            if home is not None and away is not None:
+                fixtures.append((round_number + 1, home, away))
+        # Rotamos todos menos el primero
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+
+    if double:
+        fixtures += [(week + rounds, away, home) for week, home, away in fixtures]
+    return fixtures
+
+
+def generate_fixtures(draft, double=True, replace=False, seed=None):
+    """
+    Crea el calendario del draft con sus equipos en una transacción y un
+    único INSERT. Lanza ValueError si ya hay calendario (salvo `replace`) o
+    si alguno de sus partidos ya tiene resultado.
+    """
+    with transaction.atomic():
+        team_ids = list(Team.objects.filter(draft=draft).order_by('id').values_list('id', flat=True))
+        if len(team_ids) < 2:
+            raise ValueError('Hacen falta al menos dos equipos')
+
+        existing = Game.objects.filter(draft=draft)
+        if existing.exclude(status=GameStatus.PENDING).exists():
+            raise ValueError('Ya hay partidos jugados o con resultado propuesto')
+        if existing.exists():
+            if not replace:
+                raise ValueError('El draft ya tiene calendario')
+            existing.delete()
+
+        # Orden de los equipos al azar para que el calendario no dependa de los ids
+        random.Random(seed).shuffle(team_ids)
+        Draft.objects.filter(id=draft.id).update(results_version=F('results_version') + 1)
+        return Game.objects.bulk_create([
+            Game(draft=draft, week=week, local_team_id=home, away_team_id=away)
+            for week, home, away in round_robin(team_ids, double=double)
+        ])
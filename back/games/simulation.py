@@ -0,0 +1,198 @@
+import numpy as np
+
+from players.types import PlayerElement, PlayerPosition, normalize_element, normalize_position
+from team.models import LineupSlot
+from techniques.models import DraftPlayerTechnique
+
+# Elementos de las SuperTécnicas; los de los jugadores (ya normalizados) se traducen a estos
+ELEMENTS = ['Fire', 'Wind', 'Earth', 'Wood', 'Neutro']
+ELEMENT_INDEX = {element: i for i, element in enumerate(ELEMENTS)}
+PLAYER_ELEMENTS = {
+    PlayerElement.FIRE: 'Fire',
+    PlayerElement.AIR: 'Wind',
+    PlayerElement.EARTH: 'Earth',
+    PlayerElement.WOOD: 'Wood',
+}
+NEUTRAL = ELEMENT_INDEX['Neutro']
+
+# Fuego > Bosque > Aire > Montaña > Fuego: multiplicador del tiro según el elemento del portero
+ADVANTAGE = 1.2
+DISADVANTAGE = 0.8
+MATCHUP = np.ones((len(ELEMENTS), len(ELEMENTS)))
+for strong, weak in (('Fire', 'Wood'), ('Wood', 'Wind'), ('Wind', 'Earth'), ('Earth', 'Fire')):
+    MATCHUP[ELEMENT_INDEX[strong], ELEMENT_INDEX[weak]] = ADVANTAGE
+    MATCHUP[ELEMENT_INDEX[weak], ELEMENT_INDEX[strong]] = DISADVANTAGE
+
+# Potencia de un jugador sin SuperTécnica y peso de su posición en ataque, defensa y portería
+BASE_POWER = 20
+ROLE_WEIGHTS = {
+    PlayerPosition.FORWARD: (1.0, 0.2, 0.0),
+    PlayerPosition.MIDFIELDER: (0.6, 0.6, 0.0),
+    PlayerPosition.DEFENDER: (0.2, 1.0, 0.0),
+    PlayerPosition.GOALKEEPER: (0.0, 0.2, 1.0),
+}
+# Qué cuenta cada tipo de SuperTécnica: (ataque, defensa, portería)
+TECHNIQUE_WEIGHTS = {
+    'Tiro': (1.0, 0.0, 0.0),
+    'Regate': (0.5, 0.0, 0.0),
+    'Bloqueo': (0.0, 1.0, 0.0),
+    'Atajo': (0.0, 0.0, 1.0),
+}
+# Una SuperTécnica del mismo elemento que el jugador rinde más
+SAME_ELEMENT_BONUS = 1.1
+
+# Alineación que se supone a un equipo sin alineación activa (4-4-2 sin técnicas)
+DEFAULT_STARTERS = (
+    [PlayerPosition.GOALKEEPER]
+    + [PlayerPosition.DEFENDER] * 4
+    + [PlayerPosition.MIDFIELDER] * 4
+    + [PlayerPosition.FORWARD] * 2
+)
+
+# Goles esperados de un equipo contra un rival igual, ventaja de jugar en casa,
+# cuánto pesa la diferencia de nivel y variación de forma de un partido a otro
+BASE_GOALS = 1.35
+HOME_ADVANTAGE = 1.1
+STRENGTH_EXPONENT = 1.0
+FORM_SIGMA = 0.15
+
+DEFAULT_RUNS = 10000
+MAX_RUNS = 100000
+
+
+class TeamStrengths:
+    """
+    Fuerza de varios equipos como arrays: ataque por elemento (equipos x
+    elementos), defensa más portería y elemento del portero.
+    """
+
+    def __init__(self, team_ids, attack, resist, keeper_element):
+        self.index = {team_id: i for i, team_id in enumerate(team_ids)}
+        self.attack = attack
+        self.resist = resist
+        self.keeper_element = keeper_element
+
+    @classmethod
+    def load(cls, team_ids):
+        """Titulares de las alineaciones activas y sus técnicas, en dos consultas."""
+        team_ids = list(dict.fromkeys(team_ids))
+        starters = {team_id: [] for team_id in team_ids}
+        for team_id, draft_player_id, position, element in (
+            LineupSlot.objects
+            .filter(lineup__current_for_team__in=team_ids, slot='starter')
+            .order_by('lineup_id', 'order')
+            .values_list('lineup__current_for_team', 'draft_player_id', 'draft_player__player__position', 'draft_player__player__element')
+        ):
+            # Las filas guardan 'GK', 'Earth', 'Wind'...: se pasan a las claves del modelo
+            element = PLAYER_ELEMENTS.get(normalize_element(element), 'Neutro')
+            starters[team_id].append((draft_player_id, normalize_position(position), ELEMENT_INDEX[element]))
+
+        techniques = {}
+        for draft_player_id, st_type, element, power in DraftPlayerTechnique.objects.filter(
+            draft_player_id__in=[player[0] for players in starters.values() for player in players],
+        ).values_list('draft_player_id', 'technique__st_type', 'technique__element', 'technique__power'):
+            techniques.setdefault(draft_player_id, []).append((st_type, ELEMENT_INDEX.get(element, NEUTRAL), power))
+
+        size = len(team_ids)
+        attack = np.zeros((size, len(ELEMENTS)))
+        defense = np.zeros(size)
+        keeper = np.zeros(size)
+        keeper_element = np.full(size, NEUTRAL)
+        for t, team_id in enumerate(team_ids):
+            players = starters[team_id] or [(None, position, NEUTRAL) for position in DEFAULT_STARTERS]
+            for draft_player_id, position, element in players:
+                weights = ROLE_WEIGHTS.get(position, ROLE_WEIGHTS[PlayerPosition.MIDFIELDER])
+                attack[t, element] += weights[0] * BASE_POWER
+                defense[t] += weights[1] * BASE_POWER
+                keeper[t] += weights[2] * BASE_POWER
+                if position == PlayerPosition.GOALKEEPER:
+                    keeper_element[t] = element
+
+                # De cada tipo cuenta la técnica más fuerte del jugador
+                best = {}
+                for st_type, technique_element, power in techniques.get(draft_player_id, ()):
+                    if technique_element == element:
+                        power *= SAME_ELEMENT_BONUS
+                    if power > best.get(st_type, (0, None))[0]:
+                        best[st_type] = (power, technique_element)
+                for st_type, (power, technique_element) in best.items():
+                    weights = TECHNIQUE_WEIGHTS.get(st_type, (0.0, 0.0, 0.0))
+                    attack[t, technique_element] += weights[0] * power
+                    defense[t] += weights[1] * power
+                    keeper[t] += weights[2] * power
+
+        return cls(team_ids, attack, defense + keeper, keeper_element)
+
+
+def expected_goals(strengths, home, away):
+    """
+    Goles esperados (local, visitante) de cada partido, con `home` y `away`
+    como arrays de índices de equipo. El ataque se pondera por elemento
+    contra el portero rival y se compara con la media de los equipos.
+    """
+    attack_home = (strengths.attack[home] * MATCHUP[:, strengths.keeper_element[away]].T).sum(axis=1)
+    attack_away = (strengths.attack[away] * MATCHUP[:, strengths.keeper_element[home]].T).sum(axis=1)
+    mean_attack = strengths.attack.sum(axis=1).mean()
+    mean_resist = strengths.resist.mean()
+
+    def ratio(attack, resist):
+        return ((attack / mean_attack) / (resist / mean_resist)) ** STRENGTH_EXPONENT
+
+    return (
+        BASE_GOALS * HOME_ADVANTAGE * ratio(attack_home, strengths.resist[away]),
+        BASE_GOALS * ratio(attack_away, strengths.resist[home]),
+    )
+
+
+def simulate(strengths, fixtures, runs=DEFAULT_RUNS, seed=None):
+    """
+    Juega `runs` veces cada partido de `fixtures` (lista de (local, visitante)
+    por id de equipo) en arrays partidos x simulaciones, sin bucles por
+    partido. Devuelve los goles simulados como dos arrays de esa forma.
+    """
+    rng = np.random.default_rng(seed)
+    home = np.array([strengths.index[local] for local, _ in fixtures], dtype=np.intp)
+    away = np.array([strengths.index[visitor] for _, visitor in fixtures], dtype=np.intp)
+    lambda_home, lambda_away = expected_goals(strengths, home, away)
+
+    # Forma del día de cada equipo en cada simulación
+    shape = (len(fixtures), runs)
+    form_home = rng.lognormal(0.0, FORM_SIGMA, shape)
+    form_away = rng.lognormal(0.0, FORM_SIGMA, shape)
+    return (
+        rng.poisson(lambda_home[:, None] * form_home),
+        rng.poisson(lambda_away[:, None] * form_away),
+    )
+
+
+def predict(games, runs=DEFAULT_RUNS, seed=None):
+    """
+    Probabilidades de victoria local, empate y victoria visitante y goles
+    esperados de cada partido (objetos Game con equipos).
+    """
+    games = [game for game in games if game.local_team_id and game.away_team_id]
+    if not games:
+        return []
+    strengths = TeamStrengths.load(
+        [team_id for game in games for team_id in (game.local_team_id, game.away_team_id)]
+    )
+    local_goals, away_goals = simulate(
+        strengths, [(game.local_team_id, game.away_team_id) for game in games], runs=runs, seed=seed,
+    )
+    home_win = (local_goals > away_goals).mean(axis=1)
+    draw = (local_goals == away_goals).mean(axis=1)
+    expected_local, expected_away = local_goals.mean(axis=1), away_goals.mean(axis=1)
+    return [
+        {
+            'game_id': game.id,
+            'week': game.week,
+            'local_team_id': game.local_team_id,
+            'away_team_id': game.away_team_id,
+            'home_win': round(float(home_win[i]), 4),
+            'draw': round(float(draw[i]), 4),
+            'away_win': round(float(1 - home_win[i] - draw[i]), 4),
+            'expected_local_goals': round(float(expected_local[i]), 2),
+            'expected_away_goals': round(float(expected_away[i]), 2),
+        }
+        for i, game in enumerate(games)
+    ]
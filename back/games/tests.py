@@ -1,3 +1,394 @@
+from collections import Counter
+import csv
+import io
+import time
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from draft.models import Draft
+from games.models import Game, GameResultRequest, Stats
+from games.results import DRAW_BUDGET, LOSS_BUDGET, WIN_BUDGET
+from games.schedule import round_robin
+from games.simulation import BASE_POWER, ELEMENT_INDEX, TeamStrengths
+from games.types import GameResultRequestStatus, GameStatus
+from league.models import League
+from players.models import DraftPlayer, Player
+from ranking.leaders import rebuild_player_stats
+from ranking.models import PlayerStanding
+from team.models import Lineup, LineupSlot, Team
+from techniques.models import DraftPlayerTechnique, SpecialTechnique
+from users.models import DraftUser, User
+
+
+class FixturesTests(TestCase):
+    WEEKS = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = League.objects.create(name='Liga')
+        cls.draft = Draft.objects.create(league=cls.league, name='Draft')
+        teams = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=cls.draft)
+            teams.append(Team.objects.create(name=f'Equipo {i}', draft=cls.draft, draft_user=draft_user, budget=Decimal('0')))
+
+        for week in range(1, cls.WEEKS + 1):
+            Game.objects.create(draft=cls.draft, week=week, local_team=teams[0], away_team=teams[1], winner=teams[0])
+            game = Game.objects.create(
+                draft=cls.draft, week=week, local_team=teams[2], away_team=teams[3], status=GameStatus.PENDING_RESULT,
+            )
+            GameResultRequest.objects.create(game=game, local_goals=1, away_goals=0)
+        cls.url = f'/api/games/league/{cls.league.id}'
+
+    def test_query_count_does_not_grow_with_games(self):
+        # Draft, partidos con equipos y solicitudes pendientes
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        games = response.json()
+        self.assertEqual(len(games), self.WEEKS * 2)
+        pending = [game for game in games if game['status'] == GameStatus.PENDING_RESULT]
+        self.assertTrue(all(game['result_request']['local_goals'] == 1 for game in pending))
+
+    def test_week_filter_and_cursor_pagination(self):
+        self.assertEqual({game['week'] for game in self.client.get(self.url, {'week': 3}).json()}, {3})
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 7, **({'cursor': cursor} if cursor else {})}
+            page = self.client.get(self.url, params).json()
+            seen += [game['id'] for game in page['results']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(Game.objects.filter(draft=self.draft).order_by('week', 'id').values_list('id', flat=True)))
+
+
+class FixtureGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='x')
+        cls.league = League.objects.create(name='Liga', owner=cls.owner)
+        cls.draft = Draft.objects.create(league=cls.league, name='Draft')
+        for i in range(20):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=cls.draft)
+            Team.objects.create(name=f'Equipo {i}', draft=cls.draft, draft_user=draft_user, budget=Decimal('0'))
+        cls.url = f'/api/games/league/{cls.league.id}/fixtures'
+
+    def test_double_round_robin_in_one_insert(self):
+        self.client.force_login(self.owner)
+        # Sesión y usuario, draft, equipos, partidos existentes (x2), savepoint, versión e INSERT
+        with self.assertNumQueries(10):
+            response = self.client.post(self.url, {}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'games': 380, 'weeks': 38})
+
+        games = list(Game.objects.filter(draft=self.draft).values_list('week', 'local_team_id', 'away_team_id'))
+        self.assertEqual(len({(local, away) for _, local, away in games}), 380)
+        for week in range(1, 39):
+            teams = [team for w, local, away in games if w == week for team in (local, away)]
+            self.assertEqual(len(set(teams)), 20)
+        home = Counter(local for week, local, _ in games if week <= 19)
+        self.assertTrue(set(home.values()) <= {9, 10})
+
+        self.assertEqual(self.client.post(self.url, {}, content_type='application/json').status_code, 400)
+
+    def test_odd_team_count_rests_one_team_per_week(self):
+        fixtures = round_robin(range(5))
+        self.assertEqual(len(fixtures), 20)
+        self.assertEqual({week for week, _, _ in fixtures}, set(range(1, 11)))
+        self.assertEqual(set(Counter(home for _, home, _ in fixtures).values()), {4})
+
+
+    def test_predictions_simulate_the_week_in_batch(self):
+        self.client.force_login(self.owner)
+        self.client.post(self.url, {}, content_type='application/json')
+        # El equipo local del primer partido sale con un delantero con SuperTécnica de tiro
+        game = Game.objects.filter(draft=self.draft, week=1).order_by('id').first()
+        lineup = Lineup.objects.create(team=game.local_team)
+        striker = DraftPlayer.objects.create(
+            player=Player.objects.create(name='Delantero', gender='M', position='FW', element='fire'),
+            name='Delantero', draft=self.draft, team=game.local_team,
+        )
+        LineupSlot.objects.create(lineup=lineup, draft_player=striker, slot='starter')
+        for order, position in enumerate(['GL'] + ['DF'] * 4 + ['MF'] * 4 + ['FW'], start=1):
+            player = DraftPlayer.objects.create(
+                player=Player.objects.create(name=f'Titular {order}', gender='M', position=position, element='wood'),
+                name=f'Titular {order}', draft=self.draft, team=game.local_team,
+            )
+            LineupSlot.objects.create(lineup=lineup, draft_player=player, slot='starter', order=order)
+        technique = SpecialTechnique.objects.create(name='Tornado de Fuego', st_type='Tiro', element='Fire', power=200)
+        DraftPlayerTechnique.objects.create(draft_player=striker, technique=technique)
+        game.local_team.set_active_lineup(lineup)
+
+        # Draft, próxima jornada, partidos, titulares y técnicas
+        with self.assertNumQueries(5):
+            started = time.perf_counter()
+            response = self.client.get(f'/api/games/league/{self.league.id}/predictions', {'runs': 10000})
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 1)
+        data = response.json()
+        self.assertEqual(data['week'], 1)
+        self.assertEqual(len(data['predictions']), 10)
+        for prediction in data['predictions']:
+            self.assertAlmostEqual(prediction['home_win'] + prediction['draw'] + prediction['away_win'], 1, places=3)
+        strong, *even = data['predictions']
+        self.assertGreater(strong['home_win'], 0.7)
+        self.assertGreater(strong['expected_local_goals'], 3 * strong['expected_away_goals'])
+        # Sin alineaciones los equipos son iguales y solo pesa jugar en casa
+        for prediction in even:
+            self.assertGreater(prediction['home_win'], prediction['away_win'])
+
+
+    def test_strengths_read_players_as_stored_by_the_csv_loaders(self):
+        # Mismas alineaciones con las grafías de data.csv ('GK', 'Earth', 'Wind') y con las del modelo
+        rows = csv.DictReader(io.StringIO(
+            'name,element,position,sprite,gender,value\n'
+            'Mark,Earth,GK,./imgs/mark.png,M,70\n'
+            + 'Defensa,Wind,DF,,M,10\n' * 4
+            + 'Medio,Wood,MF,,M,10\n' * 4
+            + 'Delantero,Fire,FW,,M,10\n' * 2
+        ))
+        stored = [(row['position'], row['element']) for row in rows]
+        model = [('GL', 'earth')] + [('DF', 'air')] * 4 + [('MF', 'wood')] * 4 + [('FW', 'fire')] * 2
+        teams = list(Team.objects.filter(draft=self.draft).order_by('id')[:2])
+        for team, players in zip(teams, (stored, model)):
+            lineup = Lineup.objects.create(team=team)
+            for order, (position, element) in enumerate(players, start=1):
+                player = DraftPlayer.objects.create(
+                    player=Player.objects.create(name=f'{team.id}-{order}', gender='M', position=position, element=element),
+                    name=f'{team.id}-{order}', draft=self.draft, team=team,
+                )
+                LineupSlot.objects.create(lineup=lineup, draft_player=player, slot='starter', order=order)
+            team.set_active_lineup(lineup)
+
+        strengths = TeamStrengths.load([team.id for team in teams])
+        self.assertEqual(strengths.attack[0].tolist(), strengths.attack[1].tolist())
+        self.assertEqual(strengths.resist[0], strengths.resist[1])
+        self.assertEqual(strengths.keeper_element.tolist(), [ELEMENT_INDEX['Earth']] * 2)
+        # El portero cuenta como portero, no como centrocampista
+        self.assertAlmostEqual(strengths.resist[0], BASE_POWER * (1.2 + 4 * 1.0 + 4 * 0.6 + 2 * 0.2))
+
+
+class ApproveResultTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='x')
+        league = League.objects.create(name='Liga', owner=cls.owner)
+        cls.draft = Draft.objects.create(league=league, name='Draft')
+        cls.teams, cls.squads = [], []
+        for i in range(2):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=cls.draft)
+            team = Team.objects.create(name=f'Equipo {i}', draft=cls.draft, draft_user=draft_user, budget=Decimal('0'))
+            cls.teams.append(team)
+            cls.squads.append([
+                DraftPlayer.objects.create(
+                    player=Player.objects.create(name=f'Jugador {i}-{j}', gender='M', position='FW', element='fire'),
+                    name=f'Jugador {i}-{j}', draft=cls.draft, team=team,
+                )
+                for j in range(8)
+            ])
+
+    def setUp(self):
+        self.client.force_login(self.owner)
+
+    def _request(self, local_goals, away_goals, goals, week=1):
+        game = Game.objects.create(
+            draft=self.draft, week=week, local_team=self.teams[0], away_team=self.teams[1],
+            status=GameStatus.PENDING_RESULT,
+        )
+        return GameResultRequest.objects.create(
+            game=game, local_goals=local_goals, away_goals=away_goals, goals=goals,
+            local_goalkeeper=self.squads[0][0], away_goalkeeper=self.squads[1][0],
+        )
+
+    def _approve(self, result_request):
+        return self.client.put(f'/api/games/{result_request.id}/approve')
+
+    def test_approval_updates_teams_and_stats(self):
+        win = self._request(2, 1, {str(self.squads[0][1].id): 2, str(self.squads[1][1].id): 1})
+        draw = self._request(0, 0, {})
+        self.assertEqual(self._approve(win).status_code, 200)
+        self.assertEqual(self._approve(draw).status_code, 200)
+
+        local, away = (Team.objects.get(id=team.id) for team in self.teams)
+        self.assertEqual((local.budget, local.points), (WIN_BUDGET + DRAW_BUDGET, 4))
+        self.assertEqual((away.budget, away.points), (LOSS_BUDGET + DRAW_BUDGET, 1))
+        self.assertEqual(Stats.objects.filter(game=win.game).count(), 4)
+        self.assertEqual(self._approve(win).status_code, 404)
+
+        # Tablas de jugadores acumuladas, iguales a las recalculadas desde los Stats
+        league_id = self.draft.league_id
+        with self.assertNumQueries(1):
+            scorers = self.client.get(f'/api/ranking/{league_id}/scorers').json()
+        self.assertEqual([(row['id'], row['goals']) for row in scorers], [(self.squads[0][1].id, 2), (self.squads[1][1].id, 1)])
+        goalkeepers = self.client.get(f'/api/ranking/{league_id}/goalkeepers').json()
+        self.assertEqual(
+            [(row['id'], row['clean_sheets'], row['goals_against'], row['appearances']) for row in goalkeepers],
+            [(self.squads[0][0].id, 1, 1, 2), (self.squads[1][0].id, 1, 2, 2)],
+        )
+        incremental = list(PlayerStanding.objects.order_by('draft_player_id').values())
+        rebuild_player_stats(self.draft.id)
+        rebuilt = list(PlayerStanding.objects.order_by('draft_player_id').values())
+        strip = lambda rows: [{k: v for k, v in row.items() if k != 'id'} for row in rows]
+        self.assertEqual(strip(incremental), strip(rebuilt))
+
+    def test_query_count_does_not_depend_on_scorers(self):
+        one = self._request(1, 1, {str(self.squads[0][1].id): 1, str(self.squads[1][1].id): 1})
+        # Cada uno cierra su jornada: ambos guardan la foto de la clasificación
+        many = self._request(7, 7, {str(player.id): 1 for squad in self.squads for player in squad[1:]}, week=2)
+
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as one_queries:
+            self._approve(one)
+        with self.captureOnCommitCallbacks(), self.assertNumQueries(len(one_queries)):
+            self._approve(many)
+        self.assertEqual(Stats.objects.filter(game=many.game).count(), 16)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_unknown_scorer_changes_nothing(self):
+        result_request = self._request(1, 0, {'999999': 1})
+        self.assertEqual(self._approve(result_request).status_code, 404)
+
+        result_request.refresh_from_db()
+        self.assertEqual(result_request.status, GameResultRequestStatus.PENDING)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).budget, 0)
+        self.assertFalse(Stats.objects.exists())
+
+    def test_scorer_outside_the_game_is_invalid(self):
+        # Jugador del draft sin equipo y jugador de un equipo que no juega el partido
+        free = DraftPlayer.objects.create(
+            player=Player.objects.create(name='Libre', gender='M', position='FW', element='fire'),
+            name='Libre', draft=self.draft,
+        )
+        user = User.objects.create_user(username='other', password='x')
+        other_team = Team.objects.create(
+            name='Otro', draft=self.draft, draft_user=DraftUser.objects.create(user=user, draft=self.draft),
+            budget=Decimal('0'),
+        )
+        outsider = DraftPlayer.objects.create(
+            player=Player.objects.create(name='Fuera', gender='M', position='FW', element='fire'),
+            name='Fuera', draft=self.draft, team=other_team,
+        )
+        single = self._request(1, 0, {str(free.id): 1})
+        self.assertEqual(self._approve(single).status_code, 404)
+
+        batch = self._request(1, 0, {str(outsider.id): 1})
+        results = self._batch({'action': 'approve', 'ids': [batch.id]}).json()['results']
+        self.assertEqual([item['status'] for item in results], ['invalid_scorers'])
+        self.assertFalse(Stats.objects.exists())
+        self.assertFalse(PlayerStanding.objects.exists())
+
+    def test_moderation_queue_pages_in_fixed_queries(self):
+        requests = [
+            self._request(1, 1, {str(self.squads[0][1].id): 1, str(self.squads[1][2].id): 1}, week=week)
+            for week in range(1, 6)
+        ]
+        self._approve(requests[0])
+        url = f'/api/games/league/{self.draft.league_id}/requests'
+
+        # Sesión y usuario, draft con liga, solicitudes con partidos y porteros, goleadores
+        with self.assertNumQueries(5):
+            first = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual([item['id'] for item in first['results']], [r.id for r in requests[1:3]])
+        item = first['results'][0]
+        self.assertEqual(item['game']['local_team']['name'], 'Equipo 0')
+        self.assertEqual(item['local_goalkeeper']['name'], 'Jugador 0-0')
+        self.assertEqual([(s['name'], s['goals']) for s in item['scorers']], [('Jugador 0-1', 1), ('Jugador 1-2', 1)])
+
+        with self.assertNumQueries(5):
+            rest = self.client.get(url, {'limit': 10, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([item['id'] for item in rest['results']], [r.id for r in requests[3:]])
+        self.assertIsNone(rest['next_cursor'])
+
+    def _batch(self, payload):
+        return self.client.put(
+            f'/api/games/league/{self.draft.league_id}/requests/batch', payload, content_type='application/json',
+        )
+
+    def test_batch_approval_runs_in_fixed_queries(self):
+        small = [self._request(1, 0, {str(self.squads[0][1].id): 1}) for _ in range(2)]
+        with self.captureOnCommitCallbacks(), CaptureQueriesContext(connection) as small_queries:
+            self._batch({'action': 'approve', 'ids': [r.id for r in small]})
+
+        scorers = {str(player.id): 1 for squad in self.squads for player in squad[1:3]}
+        week = [self._request(2, 2, scorers) for _ in range(10)]
+        Game.objects.filter(gameresultrequest__in=week).update(week=2)
+        with self.captureOnCommitCallbacks(), self.assertNumQueries(len(small_queries)):
+            response = self._batch({'action': 'approve', 'week': 2})
+
+        self.assertEqual([item['status'] for item in response.json()['results']], ['approved'] * 10)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).points, 2 * 3 + 10)
+
+        again = self._batch({'action': 'reject', 'ids': [week[0].id, 999999]}).json()['results']
+        self.assertEqual([item['status'] for item in again], ['already_resolved', 'not_found'])
+
+    def test_batch_works_for_a_league_with_several_drafts(self):
+        Draft.objects.create(league=self.draft.league, name='Otro draft')
+        result_request = self._request(1, 0, {})
+        response = self._batch({'action': 'reject', 'ids': [result_request.id]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['status'] for item in response.json()['results']], ['rejected'])
+
+
+class AddResultRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        league = League.objects.create(name='Liga')
+        draft = Draft.objects.create(league=league, name='Draft')
+        cls.users, teams, cls.squads = [], [], []
+        for i in range(3):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=draft)
+            team = Team.objects.create(name=f'Equipo {i}', draft=draft, draft_user=draft_user, budget=Decimal('0'))
+            cls.users.append(user)
+            cls.squads.append([
+                DraftPlayer.objects.create(
+                    player=Player.objects.create(name=f'Jugador {i}-{j}', gender='M', position='FW', element='fire'),
+                    name=f'Jugador {i}-{j}', draft=draft, team=team,
+                )
+                for j in range(6)
+            ])
+            teams.append(team)
+        cls.game = Game.objects.create(draft=draft, week=1, local_team=teams[0], away_team=teams[1])
+        cls.url = f'/api/games/{cls.game.id}/requests'
+
+    def _post(self, goals, local_goalkeeper=None, away_goalkeeper=None):
+        return self.client.post(self.url, {
+            'local_goalkeeper_id': (local_goalkeeper or self.squads[0][0]).id,
+            'away_goalkeeper_id': (away_goalkeeper or self.squads[1][0]).id,
+            'goals': goals,
+        }, content_type='application/json')
+
+    def test_submission_resolves_players_in_one_query(self):
+        self.client.force_login(self.users[0])
+        goals = {str(player.id): 1 for squad in self.squads[:2] for player in squad[1:]}
+        # Sesión y usuario, partido con equipos, solicitudes existentes, jugadores e INSERT
+        with self.assertNumQueries(6):
+            response = self._post(goals)
+        self.assertEqual(response.status_code, 200)
+        result_request = GameResultRequest.objects.get(game=self.game)
+        self.assertEqual((result_request.local_goals, result_request.away_goals), (5, 5))
+
+    def test_rejects_players_outside_the_game(self):
+        self.client.force_login(self.users[0])
+        self.assertEqual(self._post({str(self.squads[2][1].id): 1}).status_code, 400)
+        self.assertEqual(self._post({}, local_goalkeeper=DraftPlayer(id=999999)).status_code, 404)
+        self.assertEqual(self._post({'x': 1}).status_code, 404)
+
+        self.client.force_login(self.users[2])
+        self.assertEqual(self._post({}).status_code, 405)
+        self.assertFalse(GameResultRequest.objects.exists())
 
-# Create your tests here.
+    def test_rejects_goalkeepers_from_the_wrong_side_and_boolean_goals(self):
+        self.client.force_login(self.users[0])
+        # Portero local como visitante, y portero de un equipo que no juega
+        self.assertEqual(self._post({}, away_goalkeeper=self.squads[0][1]).status_code, 400)
+        self.assertEqual(self._post({}, local_goalkeeper=self.squads[2][0]).status_code, 400)
+        # True no es un número de goles
+        self.assertEqual(self._post({str(self.squads[0][1].id): True}).status_code, 400)
+        self.assertFalse(GameResultRequest.objects.exists())
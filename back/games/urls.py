@@ -2,7 +2,9 @@ from django.urls import path
 from .views import (
     view_match, view_matchs,
     match_result_requests,                 
-    approve_match_result_request, reject_match_result_request
+    approve_match_result_request, reject_match_result_request,
+    batch_match_result_requests, generate_league_fixtures, view_predictions,
+    pending_result_requests,
 )
 
 urlpatterns = [
@@ -11,4 +13,8 @@ urlpatterns = [
     path('<int:game_id>/requests', match_result_requests, name='match_result_requests'),  # <— una sola
     path('<int:game_result_request_id>/approve', approve_match_result_request, name='approve_match_result_request'),
     path('<int:game_result_request_id>/reject', reject_match_result_request, name='reject_match_result_request'),
+    path('league/<int:league_id>/requests', pending_result_requests, name='pending_result_requests'),
+    path('league/<int:league_id>/requests/batch', batch_match_result_requests, name='batch_match_result_requests'),
+    path('league/<int:league_id>/fixtures', generate_league_fixtures, name='generate_league_fixtures'),
+    path('league/<int:league_id>/predictions', view_predictions, name='view_predictions'),
 ]
\ No newline at end of file
@@ -1,12 +1,25 @@
 from django.shortcuts import render
 from django.http import JsonResponse, HttpRequest
 from draft.models import Draft
-from games.models import Game, GameResultRequest, Stats
+from games.models import Game, GameResultRequest
+from games.results import apply_results, parse_goals, reject_results, scorer_goals
+from games.schedule import generate_fixtures
+from games.simulation import DEFAULT_RUNS, MAX_RUNS, predict
 from games.types import GameStatus, GameResultRequestStatus
 import json
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from players.models import DraftPlayer
 from users.models import User
 
+# Máximo de partidos por página cuando se pagina con ?limit=
+MAX_GAMES_PAGE = 200
+# Máximo de solicitudes por aprobación/rechazo en lote
+MAX_BATCH_REQUESTS = 200
+# Tamaño por defecto y máximo de página de la cola de moderación
+DEFAULT_QUEUE_PAGE = 50
+MAX_QUEUE_PAGE = 200
+
 def view_matchs(request: HttpRequest, league_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
@@ -17,28 +30,109 @@ def view_matchs(request: HttpRequest, league_id):
     except Draft.DoesNotExist:
         return JsonResponse({'error': 'Draft no encontrado'}, status=404)
     
-    # Para cada partidp deñ draft sacamos su información
-    response = []
-    for game in Game.objects.filter(draft=draft):
-        result_request = None
-        if game.status == GameStatus.PENDING_RESULT:
-            result_request = Game.objects.get(match=game)
-        
-        response.append(
-            {
-                'id': game.id,
-                'week': game.week,
-                'local_team': game.local_team.name,
-                'away_team': game.away_team.name,
-                'local_goals': game.local_goals,
-                'away_goals': game.away_goals,
-                'winner': game.winner.name if game.winner else None,
-                'status': game.status,
-                'result_request': result_request
-            }
-        )
+    # Equipos en la misma consulta y la última solicitud pendiente de cada
+    # partido en una segunda: el número de consultas no crece con los partidos
+    games = (
+        Game.objects
+        .filter(draft=draft)
+        .select_related('local_team', 'away_team', 'winner')
+        .prefetch_related(Prefetch(
+            'gameresultrequest_set',
+            queryset=GameResultRequest.objects.filter(status=GameResultRequestStatus.PENDING).order_by('-id'),
+            to_attr='pending_requests',
+        ))
+        .order_by('week', 'id')
+    )
+    
+    week = request.GET.get('week')
+    if week is not None:
+        try:
+            games = games.filter(week=int(week))
+        except ValueError:
+            return JsonResponse({'error': 'Semana no válida'}, status=400)
+    
+    # Paginación por cursor (semana, id) solo si se pide un límite
+    limit = request.GET.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return JsonResponse({'error': 'Límite no válido'}, status=400)
+        if not 1 <= limit <= MAX_GAMES_PAGE:
+            return JsonResponse({'error': f'El límite debe estar entre 1 y {MAX_GAMES_PAGE}'}, status=400)
+    
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                cursor_week, cursor_id = (int(value) for value in cursor.split(':'))
+            except ValueError:
+                return JsonResponse({'error': 'Cursor no válido'}, status=400)
+            games = games.filter(Q(week__gt=cursor_week) | Q(week=cursor_week, id__gt=cursor_id))
+    
+        page = list(games[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = f'{page[-1].week}:{page[-1].id}'
+        return JsonResponse({'results': [_game_row(game) for game in page], 'next_cursor': next_cursor})
+    
+    return JsonResponse([_game_row(game) for game in games], safe=False)
 
-    return JsonResponse(response, safe=False)
+def view_predictions(request: HttpRequest, league_id):
+    """
+    Probabilidades de cada partido pendiente de una jornada (?week=, por
+    defecto la próxima sin jugar) según las alineaciones activas, con
+    ?runs= simulaciones por partido.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    try:
+        draft = Draft.objects.get(league_id=league_id)
+    except Draft.DoesNotExist:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    
+    try:
+        runs = int(request.GET.get('runs', DEFAULT_RUNS))
+    except ValueError:
+        return JsonResponse({'error': 'Número de simulaciones no válido'}, status=400)
+    if not 1 <= runs <= MAX_RUNS:
+        return JsonResponse({'error': f'Las simulaciones deben estar entre 1 y {MAX_RUNS}'}, status=400)
+    
+    games = Game.objects.filter(draft=draft).exclude(status=GameStatus.FINISHED).order_by('week', 'id')
+    week = request.GET.get('week')
+    if week is not None:
+        try:
+            week = int(week)
+        except ValueError:
+            return JsonResponse({'error': 'Semana no válida'}, status=400)
+    else:
+        week = games.values_list('week', flat=True).first()
+    
+    return JsonResponse({'week': week, 'predictions': predict(games.filter(week=week), runs=runs)})
+
+def _game_row(game):
+    result_request = None
+    if game.pending_requests:
+        pending = game.pending_requests[0]
+        result_request = {
+            'id': pending.id,
+            'local_goals': pending.local_goals,
+            'away_goals': pending.away_goals,
+            'status': pending.status,
+        }
+    
+    return {
+        'id': game.id,
+        'week': game.week,
+        'local_team': game.local_team.name if game.local_team else None,
+        'away_team': game.away_team.name if game.away_team else None,
+        'local_goals': game.local_goals,
+        'away_goals': game.away_goals,
+        'winner': game.winner.name if game.winner else None,
+        'status': game.status,
+        'result_request': result_request
+    }
 
 def view_match(request: HttpRequest, game_id):
     if request.method != 'GET':
@@ -76,22 +170,45 @@ def add_match_result_request(request: HttpRequest, game_id):
     if request.method != 'POST':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    try:
-        user = User.objects.get(id=request.user.id)
-    except User.DoesNotExist:
+    if not request.user.is_authenticated:
         return JsonResponse({'error': 'Usuario no encontrado'}, status=404)
     
+    # Validamos el formato completo antes de tocar la BD
+    try:
+        data = json.loads((request.body or b"{}").decode("utf-8")) or {}
+    except Exception:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
     
-    # Recuperamos el partido
+    if not data.get('local_goalkeeper_id') or not data.get('away_goalkeeper_id'):
+        return JsonResponse({'error': 'Faltan parámetros'}, status=400)
+    
+    # Obtenemos los goles por jugador
+    goals = data.get('goals', {})
+    if not isinstance(goals, dict):
+        return JsonResponse({'error': 'Goles no válidos'}, status=400)
     try:
-        game = Game.objects.get(id=game_id)
+        local_goalkeeper_id = int(data['local_goalkeeper_id'])
+        away_goalkeeper_id = int(data['away_goalkeeper_id'])
+        scorers = {int(player_id): player_goals for player_id, player_goals in goals.items()}
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
+    # bool es subclase de int: True no cuenta como un gol
+    if not all(
+        isinstance(player_goals, int) and not isinstance(player_goals, bool) and player_goals >= 0
+        for player_goals in scorers.values()
+    ):
+        return JsonResponse({'error': 'Goles no válidos'}, status=400)
+    
+    # Recuperamos el partido con sus equipos y usuarios en una consulta
+    try:
+        game = Game.objects.select_related('local_team__draft_user', 'away_team__draft_user').get(id=game_id)
     except Game.DoesNotExist:
         return JsonResponse({'error': 'Partido no encontrado'}, status=404)
     
     # Si el equipo del usuario que hace la petición no ha jugado el partido devolvemos el error 
-    if user not in [
-        game.local_team.draft_user.user,
-        game.away_team.draft_user.user
+    if request.user.id not in [
+        game.local_team.draft_user.user_id,
+        game.away_team.draft_user.user_id
     ]:
         return JsonResponse({'error': 'Tu equipo no ha jugado este partido'}, status=405)
     
@@ -103,50 +220,43 @@ def add_match_result_request(request: HttpRequest, game_id):
     if GameResultRequest.objects.filter(game_id=game_id, status__in=[GameResultRequestStatus.APPROVED, GameResultRequestStatus.PENDING]).exists():
         return JsonResponse({'error': 'Hay una solictud pendiente o aprobada para este partido'}, status=405)
     
-    try:
-        data = json.loads((request.body or b"{}").decode("utf-8")) or {}
-    except Exception:
-        return JsonResponse({'error': 'JSON inválido'}, status=400)
-    
-    if not data.get('local_goalkeeper_id') or not data.get('away_goalkeeper_id'):
-        return JsonResponse({'error': 'Faltan parámetros'}, status=400)
-    
-    try:
-        local_goalkeeper = DraftPlayer.objects.get(id=data.get('local_goalkeeper_id'))
-    except DraftPlayer.DoesNotExist:
-        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
-    
-    try:
-        away_goalkeeper = DraftPlayer.objects.get(id=data.get('away_goalkeeper_id'))
-    except DraftPlayer.DoesNotExist:
-        return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
-    
-    # Obtenemos los goles por jugador
-    goals = data.get('goals', {})
+    # Porteros y goleadores con su equipo en una sola consulta
+    teams = dict(
+        DraftPlayer.objects
+        .filter(id__in={local_goalkeeper_id, away_goalkeeper_id, *scorers})
+        .values_list('id', 'team_id')
+    )
+    # Cada portero tiene que ser de su propio equipo
+    for player_id, team_id in ((local_goalkeeper_id, game.local_team_id), (away_goalkeeper_id, game.away_team_id)):
+        if player_id not in teams:
+            return JsonResponse({'error': 'Jugador no encontrado'}, status=404)
+        if teams[player_id] != team_id:
+            return JsonResponse({'error': f'El portero con ID {player_id} no juega en ese equipo'}, status=400)
     
     # Calculamos los goles totales de cada equipo
     local_goals = 0
     away_goals = 0
     
-    for player_id, player_goals in goals.items():
-        try:
-            draft_player = DraftPlayer.objects.get(id=player_id)
-            # Verificamos a qué equipo pertenece el jugador
-            if draft_player.team == game.local_team:
-                local_goals += player_goals
-            elif draft_player.team == game.away_team:
-                away_goals += player_goals
-        except DraftPlayer.DoesNotExist:
+    for player_id, player_goals in scorers.items():
+        if player_id not in teams:
             return JsonResponse({'error': f'Jugador con ID {player_id} no encontrado'}, status=404)
+        # Verificamos a qué equipo pertenece el jugador
+        if teams[player_id] == game.local_team_id:
+            local_goals += player_goals
+        elif teams[player_id] == game.away_team_id:
+            away_goals += player_goals
+        else:
+            return JsonResponse({'error': f'El jugador con ID {player_id} no juega este partido'}, status=400)
     
     # Creamos el request
     GameResultRequest.objects.create(
         game=game,
+        draft_id=game.draft_id,
         local_goals=local_goals,
         away_goals=away_goals,
         goals=goals,
-        local_goalkeeper=local_goalkeeper,
-        away_goalkeeper=away_goalkeeper,
+        local_goalkeeper_id=local_goalkeeper_id,
+        away_goalkeeper_id=away_goalkeeper_id,
     )
     
     return JsonResponse({'message': 'Solicitud enviada correctamente'})
@@ -159,110 +269,234 @@ def get_match_result_requests(request: HttpRequest, game_id):
     
     return JsonResponse(list(requests.values()), safe=False)
 
+def _player(draft_player):
+    return {'id': draft_player.id, 'name': draft_player.name} if draft_player else None
+
+def _team(team):
+    return {'id': team.id, 'name': team.name} if team else None
+
+def pending_result_requests(request: HttpRequest, league_id):
+    """
+    Cola de moderación del dueño: solicitudes pendientes de toda la liga, las
+    más antiguas primero, con partido, equipos, porteros y goleadores.
+    Paginada con ?limit= y ?cursor= (id de la última recibida). Siempre
+    hace las mismas consultas.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    draft = Draft.objects.select_related('league').filter(league_id=league_id).first()
+    if draft is None:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    
+    # Verificamos si el usuario es el dueño de la liga
+    if request.user.id != draft.league.owner_id:
+        return JsonResponse({'error': 'No tienes permisos para hacer esto'}, status=403)
+    
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_QUEUE_PAGE))
+        cursor = int(request.GET.get('cursor', 0))
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros de paginación no válidos'}, status=400)
+    if not 1 <= limit <= MAX_QUEUE_PAGE:
+        return JsonResponse({'error': f'El límite debe estar entre 1 y {MAX_QUEUE_PAGE}'}, status=400)
+    
+    # Índice (status, draft, id): sin join con los partidos para filtrar
+    page = list(
+        GameResultRequest.objects
+        .filter(status=GameResultRequestStatus.PENDING, draft=draft, id__gt=cursor)
+        .select_related('game__local_team', 'game__away_team', 'local_goalkeeper', 'away_goalkeeper')
+        .order_by('id')[:limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = page[-1].id
+    
+    # Nombres de todos los goleadores de la página en una consulta
+    goals = {game_result_request.id: parse_goals(game_result_request) or {} for game_result_request in page}
+    scorers = DraftPlayer.objects.only('id', 'name', 'team_id').in_bulk(
+        list({player_id for request_goals in goals.values() for player_id in request_goals})
+    )
+    
+    results = []
+    for game_result_request in page:
+        game = game_result_request.game
+        results.append({
+            'id': game_result_request.id,
+            'game': {
+                'id': game.id,
+                'week': game.week,
+                'local_team': _team(game.local_team),
+                'away_team': _team(game.away_team),
+            },
+            'local_goals': game_result_request.local_goals,
+            'away_goals': game_result_request.away_goals,
+            'local_goalkeeper': _player(game_result_request.local_goalkeeper),
+            'away_goalkeeper': _player(game_result_request.away_goalkeeper),
+            'scorers': [
+                {
+                    'id': player_id,
+                    'name': scorers[player_id].name if player_id in scorers else None,
+                    'team_id': scorers[player_id].team_id if player_id in scorers else None,
+                    'goals': player_goals,
+                }
+                for player_id, player_goals in goals[game_result_request.id].items()
+            ],
+        })
+    
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
 def approve_match_result_request(request: HttpRequest, game_result_request_id):
     if request.method != 'PUT':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
     
     try:
-        game_result_request = GameResultRequest.objects.get(id=game_result_request_id)
+        game_result_request = GameResultRequest.objects.select_related('game__draft__league').get(id=game_result_request_id)
     except GameResultRequest.DoesNotExist:
         return JsonResponse({'error': 'Solicitud no encontrada'}, status=404)
     
-    # Obtenemos el partido y la liga
-    try:
-        game = Game.objects.get(id=game_result_request.game.id)
-        league = game.draft.league
-    except Game.DoesNotExist:
-        return JsonResponse({'error': 'Partido no encontrado'}, status=404)
-    
     # Verificamos si el usuario es el dueño de la liga
-    if request.user.id != league.owner.id:
+    if request.user.id != game_result_request.game.draft.league.owner_id:
         return JsonResponse({'error': 'No tienes permisos para hacer esto'}, status=403)
-    # Recuperamos la solicitud
-    try:
-        game_result_request = GameResultRequest.objects.get(id=game_result_request_id)
-    except GameResultRequest.DoesNotExist:
-        return JsonResponse({'error': 'Solicitud no encontrada'}, status=404)
-    
-    # Si ya está resuelta damos error
-    if game_result_request.status != GameResultRequestStatus.PENDING:
-        return JsonResponse({'error': 'la solicitud ya ha sido resuelta'}, status=404)
     
-    try:
-        game = Game.objects.get(id=game_result_request.game.id)
-    except Game.DoesNotExist:
-        return JsonResponse({'error': 'Solicitud no encontrada'}, status=404)
+    # Toda la aprobación es una única transacción. Bloqueamos primero el draft
+    # (como la aprobación en lote) y después la solicitud, para que no se
+    # pueda aprobar dos veces a la vez
+    with transaction.atomic():
+        draft = Draft.objects.select_for_update().get(id=game_result_request.game.draft_id)
+        game_result_request = (
+            GameResultRequest.objects
+            .select_for_update(of=('self', 'game'))
+            .select_related('game')
+            .get(id=game_result_request_id)
+        )
     
-    # Calculamos el ganador
-    if game_result_request.local_goals > game_result_request.away_goals:
-        game.winner = game.local_team
-    elif game_result_request.local_goals < game_result_request.away_goals:
-        game.winner = game.away_team
+        # Si ya está resuelta damos error
+        if game_result_request.status != GameResultRequestStatus.PENDING:
+            return JsonResponse({'error': 'la solicitud ya ha sido resuelta'}, status=404)
     
-    # Cambiamos el estado de la solicitud a aprobada
-    game_result_request.status = GameResultRequestStatus.APPROVED
+        # Validamos todos los goleadores antes de escribir nada
+        goals = scorer_goals([game_result_request])[game_result_request.id]
+        if goals is None:
+            return JsonResponse({'error': 'Solicitud no encontrada'}, status=404)
     
-    game_result_request.save(update_fields=['status'])
+        apply_results(draft, [(game_result_request, goals)])
     
-    # Actualizamos los datos del partido
-    game.local_goals = game_result_request.local_goals
-    game.away_goals = game_result_request.away_goals
-    game.status = GameStatus.FINISHED
+    return JsonResponse({'message': 'Solicitud aceptada correctamente'})
+
+def batch_match_result_requests(request: HttpRequest, league_id):
+    """
+    Aprueba o rechaza varias solicitudes en una transacción: {"action": "approve"|"reject"}
+    con {"ids": [...]} o {"week": N} (todas las pendientes de la jornada).
+    Devuelve el resultado de cada solicitud.
+    """
+    if request.method != 'PUT':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    # Si hay ganador
-    if game.winner:
-        # Le damos 8M al ganador y 2 al perdedor
-        game.winner.budget += 8000000
-        game.winner.points += 3
-        
-        loser_team = game.away_team if game.winner == game.local_team else game.local_team
-        loser_team.budget += 2000000
-        
-        game.winner.save(update_fields=['budget', 'points'])
-        loser_team.save(update_fields=['budget'])
-    # Si no hay ganador (empate)
-    else:
-        # 5M para cada uno
-        game.local_team.budget += 5000000
-        game.away_team.budget += 5000000
-        
-        game.local_team.points += 1
-        game.away_team.points += 1
-        
-        
-        game.local_team.save(update_fields=['budget', 'points'])
-        game.away_team.save(update_fields=['budget', 'points'])
+    try:
+        data = json.loads((request.body or b"{}").decode("utf-8")) or {}
+    except Exception:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
     
-    # Para cada jugador que ha marcado goles le creamos las estadísticas del partido
-    for key, value in game_result_request.goals.items():
-        try:
-            draft_player = DraftPlayer.objects.get(id=key)
-        except DraftPlayer.DoesNotExist:
-            return JsonResponse({'error': 'Solicitud no encontrada'}, status=404)
-        
-        Stats.objects.create(
-            game=game,
-            draft_player=draft_player,
-            goals=value
+    action = data.get('action')
+    if action not in ('approve', 'reject'):
+        return JsonResponse({'error': 'Acción no válida'}, status=400)
+    
+    ids, week = data.get('ids'), data.get('week')
+    if (ids is None) == (week is None):
+        return JsonResponse({'error': 'Indica las solicitudes o la jornada'}, status=400)
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return JsonResponse({'error': 'Solicitudes no válidas'}, status=400)
+        if len(ids) > MAX_BATCH_REQUESTS:
+            return JsonResponse({'error': f'Máximo {MAX_BATCH_REQUESTS} solicitudes por lote'}, status=400)
+        ids = list(dict.fromkeys(ids))
+    elif not isinstance(week, int):
+        return JsonResponse({'error': 'Semana no válida'}, status=400)
+    
+    with transaction.atomic():
+        # Mismo draft que el resto de vistas de la liga, aunque tenga varios
+        draft = Draft.objects.select_for_update(of=('self',)).select_related('league').filter(league_id=league_id).first()
+        if draft is None:
+            return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+    
+        # Verificamos si el usuario es el dueño de la liga
+        if request.user.id != draft.league.owner_id:
+            return JsonResponse({'error': 'No tienes permisos para hacer esto'}, status=403)
+    
+        # Todas las solicitudes con sus partidos en una consulta
+        game_result_requests = (
+            GameResultRequest.objects
+            .select_for_update(of=('self', 'game'))
+            .select_related('game')
+            .filter(game__draft=draft)
+            .order_by('id')
         )
+        if ids is not None:
+            game_result_requests = game_result_requests.filter(id__in=ids)
+        else:
+            game_result_requests = game_result_requests.filter(game__week=week, status=GameResultRequestStatus.PENDING)
+        found = {game_result_request.id: game_result_request for game_result_request in game_result_requests}
+    
+        outcomes = {}
+        pending = []
+        for request_id in (ids if ids is not None else found):
+            game_result_request = found.get(request_id)
+            if game_result_request is None:
+                outcomes[request_id] = 'not_found'
+            elif game_result_request.status != GameResultRequestStatus.PENDING:
+                outcomes[request_id] = 'already_resolved'
+            else:
+                pending.append(game_result_request)
+    
+        if action == 'approve':
+            goals = scorer_goals(pending)
+            approved = []
+            for game_result_request in pending:
+                if goals[game_result_request.id] is None:
+                    outcomes[game_result_request.id] = 'invalid_scorers'
+                else:
+                    outcomes[game_result_request.id] = 'approved'
+                    approved.append((game_result_request, goals[game_result_request.id]))
+            apply_results(draft, approved)
+        else:
+            reject_results(pending)
+            outcomes.update({game_result_request.id: 'rejected' for game_result_request in pending})
+    
+    return JsonResponse({'results': [{'id': request_id, 'status': outcome} for request_id, outcome in outcomes.items()]})
+
+def generate_league_fixtures(request: HttpRequest, league_id):
+    """
+    Genera el calendario de la liga (todos contra todos): {"double": true,
+    "replace": false}. Solo el dueño de la liga.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    # Para cada portero creamos sus estadísticas
-    Stats.objects.create(
-        game=game,
-        draft_player=game_result_request.local_goalkeeper,
-        goals_against=game_result_request.away_goals
-    )
+    try:
+        data = json.loads((request.body or b"{}").decode("utf-8")) or {}
+    except Exception:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
     
-    Stats.objects.create(
-        game=game,
-        draft_player=game_result_request.away_goalkeeper,
-        goals_against=game_result_request.local_goals
-    )
-        
+    double, replace = data.get('double', True), data.get('replace', False)
+    if not isinstance(double, bool) or not isinstance(replace, bool):
+        return JsonResponse({'error': 'Opciones no válidas'}, status=400)
     
-    game.save(update_fields=['winner', 'local_goals', 'away_goals', 'status'])
+    draft = Draft.objects.select_related('league').filter(league_id=league_id).first()
+    if draft is None:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
     
-    return JsonResponse({'message': 'Solicitud aceptada correctamente'})
+    # Verificamos si el usuario es el dueño de la liga
+    if request.user.id != draft.league.owner_id:
+        return JsonResponse({'error': 'No tienes permisos para hacer esto'}, status=403)
+    
+    try:
+        games = generate_fixtures(draft, double=double, replace=replace)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse({'games': len(games), 'weeks': max(game.week for game in games)}, status=201)
 
 def reject_match_result_request(request: HttpRequest, game_result_request_id):
     if request.method != 'PUT':
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('draft', '0008_draft_results_version'),
+        ('players', '0003_remove_draftplayer_value'),
+        ('team', '0005_budgetmovement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Listing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('position', models.CharField(choices=[('GL', 'Portero'), ('DF', 'Defensa'), ('MF', 'Centrocampista'), ('FW', 'Delantero')], max_length=2)),
+                ('status', models.CharField(choices=[('open', 'En venta'), ('sold', 'Vendido'), ('cancelled', 'Retirado')], default='open', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listings', to='draft.draft')),
+                ('draft_player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listings', to='players.draftplayer')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listings', to='team.team')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Bid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('accepted', 'Aceptada'), ('rejected', 'Rechazada')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bidder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='team.team')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='market.listing')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Transfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('type', models.CharField(choices=[('listing', 'Compra directa'), ('bid', 'Oferta aceptada'), ('release_clause', 'Cláusula de rescisión')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('buyer', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='team.team')),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='draft.draft')),
+                ('draft_player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='players.draftplayer')),
+                ('seller', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales', to='team.team')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['draft', 'status', 'price', 'id'], name='market_list_draft_i_f1f5aa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['draft', 'status', 'position', 'price', 'id'], name='market_list_draft_i_9f3542_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='listing',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'open')), fields=('draft_player',), name='unique_open_listing'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['listing', 'status', '-amount'], name='market_bid_listing_b2e1e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transfer',
+            index=models.Index(fields=['draft', '-id'], name='market_tran_draft_i_9364af_idx'),
+        ),
+    ]
@@ -1,3 +1,70 @@
 from django.db import models
 
-# Create your models here.
+from draft.models import Draft
+from market.types import BidStatus, ListingStatus, TransferType
+from players.models import DraftPlayer
+from players.types import PlayerPosition
+from team.models import Team
+
+
+class Listing(models.Model):
+    """Jugador puesto a la venta por su equipo a un precio fijo."""
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='listings')
+    draft_player = models.ForeignKey(DraftPlayer, on_delete=models.CASCADE, related_name='listings')
+    seller = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='listings')
+    price = models.DecimalField(decimal_places=2, max_digits=100)
+    # Copia de la posición del jugador para filtrar el mercado por índice sin join
+    position = models.CharField(max_length=2, choices=PlayerPosition)
+    status = models.CharField(max_length=20, choices=ListingStatus, default=ListingStatus.OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Mercado ordenado por precio, con o sin filtro de posición
+        indexes = [
+            models.Index(fields=['draft', 'status', 'price', 'id']),
+            models.Index(fields=['draft', 'status', 'position', 'price', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['draft_player'], condition=models.Q(status=ListingStatus.OPEN), name='unique_open_listing',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.draft_player} por {self.price}'
+
+
+class Bid(models.Model):
+    """Oferta de un equipo por un jugador en venta; el vendedor la acepta o no."""
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='bids')
+    bidder = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='bids')
+    amount = models.DecimalField(decimal_places=2, max_digits=100)
+    status = models.CharField(max_length=20, choices=BidStatus, default=BidStatus.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['listing', 'status', '-amount']),
+        ]
+
+    def __str__(self):
+        return f'{self.bidder} ofrece {self.amount} por {self.listing.draft_player}'
+
+
+class Transfer(models.Model):
+    """Traspaso realizado: el jugador y el dinero cambian de equipo en la misma transacción."""
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='transfers')
+    draft_player = models.ForeignKey(DraftPlayer, on_delete=models.CASCADE, related_name='transfers')
+    seller = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, related_name='sales')
+    buyer = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, related_name='purchases')
+    amount = models.DecimalField(decimal_places=2, max_digits=100)
+    type = models.CharField(max_length=20, choices=TransferType)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['draft', '-id']),
+        ]
+
+    def __str__(self):
+        return f'{self.draft_player}: {self.seller} -> {self.buyer} ({self.amount})'
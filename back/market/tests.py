@@ -1,3 +1,163 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from draft.models import Draft
+from draft.types import DraftStatus
+from league.models import League
+from market.models import Listing
+from market.transfers import MarketError, execute_transfer
+from market.types import ListingStatus, TransferType
+from players.models import DraftPlayer, Player
+from team.ledger import open_budget, unbalanced_teams
+from team.models import BudgetMovement, Team
+from users.models import DraftUser, User
+
+BUDGET = Decimal('1000')
+
+
+def create_market(managers):
+    """Draft terminado con `managers` equipos con presupuesto; el primero vende."""
+    league = League.objects.create(name='Liga')
+    draft = Draft.objects.create(league=league, name='Draft', status=DraftStatus.FINISHED)
+    users, teams = [], []
+    for i in range(managers):
+        user = User.objects.create_user(username=f'manager{i}', password='x')
+        draft_user = DraftUser.objects.create(user=user, draft=draft)
+        team = Team.objects.create(name=f'Equipo {i}', draft=draft, draft_user=draft_user, budget=Decimal('0'))
+        open_budget(team, BUDGET)
+        users.append(user)
+        teams.append(team)
+    return draft, users, teams
+
+
+def create_player(draft, team, position='FW', release_clause=Decimal('0')):
+    player = Player.objects.create(name=f'Jugador {position}', gender='M', position=position, element='fire')
+    return DraftPlayer.objects.create(player=player, name=player.name, draft=draft, team=team, release_clause=release_clause)
+
+
+class ListingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.draft, cls.users, cls.teams = create_market(2)
+        cls.url = f'/api/market/{cls.draft.id}/listings'
+
+    def test_listings_by_price_and_position_and_direct_purchase(self):
+        seller, buyer = self.teams
+        self.client.force_login(self.users[0])
+        for position, price in (('FW', 300), ('DF', 100), ('FW', 200)):
+            player = create_player(self.draft, seller, position)
+            self.assertEqual(self.client.post(self.url, {'draft_player_id': player.id, 'price': price}, content_type='application/json').status_code, 201)
+        self.assertEqual(self.client.post(self.url, {'draft_player_id': player.id, 'price': 1}, content_type='application/json').status_code, 409)
+
+        # Una consulta sobre el índice, sea cual sea el filtro
+        with self.assertNumQueries(1):
+            forwards = self.client.get(self.url, {'position': 'FW', 'limit': 1}).json()
+        self.assertEqual([row['price'] for row in forwards['results']], ['200.00'])
+        rest = self.client.get(self.url, {'position': 'FW', 'cursor': forwards['next_cursor']}).json()
+        self.assertEqual([row['price'] for row in rest['results']], ['300.00'])
+
+        self.client.force_login(self.users[1])
+        listing = Listing.objects.get(draft_player=player)
+        self.assertEqual(self.client.post(f'/api/market/listings/{listing.id}/buy').status_code, 200)
+        player.refresh_from_db()
+        self.assertEqual(player.team_id, buyer.id)
+        self.assertEqual(Listing.objects.get(id=listing.id).status, ListingStatus.SOLD)
+        self.assertEqual(
+            dict(Team.objects.values_list('id', 'budget')),
+            {seller.id: BUDGET + 200, buyer.id: BUDGET - 200},
+        )
+        self.assertEqual(unbalanced_teams(self.draft.id), [])
+
+    def test_goalkeepers_filter_with_the_stored_position_code(self):
+        self.client.force_login(self.users[0])
+        # Los porteros llegan de data.csv como 'GK'
+        keeper = create_player(self.draft, self.teams[0], 'GK')
+        self.client.post(self.url, {'draft_player_id': keeper.id, 'price': 50}, content_type='application/json')
+        for code in ('GK', 'GL'):
+            rows = self.client.get(self.url, {'position': code}).json()['results']
+            self.assertEqual([row['draft_player_id'] for row in rows], [keeper.id])
+        self.assertEqual(self.client.get(self.url, {'position': 'XX'}).status_code, 400)
+
+    def test_release_clause_of_another_draft_is_not_found(self):
+        other_league = League.objects.create(name='Otra liga')
+        other_draft = Draft.objects.create(league=other_league, name='Otro draft', status=DraftStatus.FINISHED)
+        user = User.objects.create_user(username='other', password='x')
+        other_team = Team.objects.create(
+            name='Otro equipo', draft=other_draft, draft_user=DraftUser.objects.create(user=user, draft=other_draft),
+            budget=Decimal('0'),
+        )
+        open_budget(other_team, BUDGET)
+        player = create_player(other_draft, other_team, release_clause=Decimal('100'))
+
+        self.client.force_login(self.users[1])
+        url = f'/api/market/{self.draft.id}/players/{player.id}/release-clause'
+        self.assertEqual(self.client.post(url, {}, content_type='application/json').status_code, 404)
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertEqual(
+            self.client.post(url, {'team_id': other_team.id}, content_type='application/json').status_code, 404,
+        )
+        # Y el traspaso en sí tampoco mezcla equipos de drafts distintos
+        with self.assertRaises(MarketError) as raised:
+            execute_transfer(player, self.teams[1].id, TransferType.RELEASE_CLAUSE)
+        self.assertEqual(raised.exception.status, 404)
+        player.refresh_from_db()
+        self.assertEqual(player.team_id, other_team.id)
+        self.assertFalse(BudgetMovement.objects.filter(transfer__isnull=False).exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ReleaseClauseConcurrencyTests(TransactionTestCase):
+    MANAGERS = 12
+    CLAUSE = Decimal('500')
+
+    def setUp(self):
+        self.draft, users, self.teams = create_market(self.MANAGERS)
+        self.sessions = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            self.sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+        self.player = create_player(self.draft, self.teams[0], release_clause=self.CLAUSE)
+        # También está a la venta: unos pagan la cláusula y otros compran la venta a la vez
+        self.listing = Listing.objects.create(
+            draft=self.draft, draft_player=self.player, seller=self.teams[0], price=Decimal('400'), position='FW',
+        )
+
+    def _buy(self, manager):
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = self.sessions[manager]
+        try:
+            if manager % 2:
+                url = f'/api/market/{self.draft.id}/players/{self.player.id}/release-clause'
+                # La cláusula se paga al equipo que el comprador ve ahora
+                response = client.post(url, {'team_id': self.teams[0].id}, content_type='application/json')
+            else:
+                response = client.post(f'/api/market/listings/{self.listing.id}/buy')
+            return manager, response.status_code
+        finally:
+            connections.close_all()
+
+    def test_only_one_manager_gets_the_player(self):
+        buyers = [manager for manager in range(1, self.MANAGERS) for _ in range(3)]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(self._buy, buyers))
+
+        winners = [manager for manager, status in results if status == 200]
+        self.assertEqual(len(winners), 1)
+        self.assertTrue(all(status == 409 for _, status in results if status != 200))
+
+        # El jugador, el dinero y el libro cuentan lo mismo
+        winner = self.teams[winners[0]]
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.team_id, winner.id)
+        price = self.CLAUSE if winners[0] % 2 else self.listing.price
+        budgets = dict(Team.objects.filter(draft=self.draft).values_list('id', 'budget'))
+        self.assertEqual(budgets[self.teams[0].id], BUDGET + price)
+        self.assertEqual(budgets[winner.id], BUDGET - price)
+        self.assertEqual(sum(budgets.values()), BUDGET * self.MANAGERS)
+        self.assertEqual(BudgetMovement.objects.filter(transfer__isnull=False).count(), 2)
+        self.assertEqual(unbalanced_teams(self.draft.id), [])
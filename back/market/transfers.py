@@ -0,0 +1,207 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+
+from draft.models import Draft
+from draft.types import DraftStatus
+from market.models import Bid, Listing, Transfer
+from market.types import BidStatus, ListingStatus, TransferType
+from players.models import DraftPlayer
+from players.types import normalize_position
+from team.ledger import transfer as ledger_transfer
+from team.models import LineupSlot, Team
+from team.types import BudgetMovementType
+
+# Tipos de apunte del comprador y del vendedor según el tipo de traspaso
+MOVEMENT_TYPES = {
+    TransferType.LISTING: (BudgetMovementType.PURCHASE, BudgetMovementType.SALE),
+    TransferType.BID: (BudgetMovementType.PURCHASE, BudgetMovementType.SALE),
+    TransferType.RELEASE_CLAUSE: (BudgetMovementType.CLAUSE_PAYMENT, BudgetMovementType.CLAUSE_INCOME),
+}
+
+
+class MarketError(Exception):
+    """Operación de mercado rechazada, con el código HTTP que le corresponde."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_amount(value):
+    """Importe positivo como Decimal; lanza MarketError si no lo es."""
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        raise MarketError('Importe no válido')
+    if not amount.is_finite() or amount <= 0:
+        raise MarketError('Importe no válido')
+    return amount
+
+
+def check_market_open(draft_id):
+    """El mercado solo abre cuando ha terminado el draft."""
+    status = Draft.objects.filter(id=draft_id).values_list('status', flat=True).first()
+    if status is None:
+        raise MarketError('Draft no encontrado', 404)
+    if status != DraftStatus.FINISHED:
+        raise MarketError('El mercado abre al terminar el draft', 409)
+
+
+def _lock(draft_player_id, buyer_id, seller_id):
+    """
+    Bloquea los dos equipos y después el jugador, siempre en ese orden y los
+    equipos por id ascendente: dos traspasos que compartan equipo esperan el
+    uno al otro en vez de bloquearse mutuamente. Devuelve (comprador, jugador).
+    Lanza MarketError 404 si comprador, vendedor y jugador no son del mismo
+    draft y 409 si el jugador ya no es del vendedor.
+    """
+    teams = {team.id: team for team in Team.objects.select_for_update().filter(id__in={buyer_id, seller_id}).order_by('id')}
+    draft_player = DraftPlayer.objects.select_for_update().get(id=draft_player_id)
+    if {team.draft_id for team in teams.values()} != {draft_player.draft_id}:
+        raise MarketError('Jugador no encontrado', 404)
+    if draft_player.team_id != seller_id:
+        raise MarketError('El jugador ya ha cambiado de equipo', 409)
+    return teams[buyer_id], draft_player
+
+
+def execute_transfer(draft_player, buyer_id, transfer_type, listing=None, bid=None):
+    """
+    Mueve el jugador y el dinero en una sola transacción bajo los bloqueos de
+    _lock. `draft_player` es la lectura previa (sin bloquear) que dice quién
+    es el vendedor. Con las filas ya bloqueadas se vuelve a comprobar todo y
+    se fija el importe: la cláusula del jugador, el precio de la venta o el
+    de la oferta.
+    """
+    seller_id = draft_player.team_id
+    if seller_id is None:
+        raise MarketError('El jugador no tiene equipo', 409)
+    if seller_id == buyer_id:
+        raise MarketError('El jugador ya es de tu equipo', 409)
+
+    with transaction.atomic():
+        buyer, draft_player = _lock(draft_player.id, buyer_id, seller_id)
+        if listing is not None:
+            listing = Listing.objects.select_for_update().get(id=listing.id)
+            if listing.status != ListingStatus.OPEN:
+                raise MarketError('La venta ya está cerrada', 409)
+
+        if transfer_type == TransferType.RELEASE_CLAUSE:
+            amount = draft_player.release_clause
+            if amount <= 0:
+                raise MarketError('El jugador no tiene cláusula de rescisión', 409)
+        elif bid is not None:
+            amount = bid.amount
+        else:
+            amount = listing.price
+        if buyer.budget < amount:
+            raise MarketError('Presupuesto insuficiente', 409)
+
+        DraftPlayer.objects.filter(id=draft_player.id).update(team_id=buyer_id)
+        # Sale de las alineaciones del vendedor
+        LineupSlot.objects.filter(draft_player_id=draft_player.id).delete()
+
+        # Cualquier venta abierta del jugador se cierra y sus ofertas pendientes se rechazan
+        open_listings = Listing.objects.filter(draft_player_id=draft_player.id, status=ListingStatus.OPEN)
+        pending_bids = Bid.objects.filter(listing__in=open_listings, status=BidStatus.PENDING)
+        if bid is not None:
+            if not pending_bids.filter(id=bid.id).update(status=BidStatus.ACCEPTED):
+                raise MarketError('La oferta ya no está pendiente', 409)
+        pending_bids.exclude(id=getattr(bid, 'id', None)).update(status=BidStatus.REJECTED)
+        open_listings.update(status=ListingStatus.SOLD if listing is not None else ListingStatus.CANCELLED)
+
+        transfer = Transfer.objects.create(
+            draft_id=draft_player.draft_id, draft_player_id=draft_player.id, seller_id=seller_id, buyer_id=buyer_id,
+            amount=amount, type=transfer_type,
+        )
+        buyer_type, seller_type = MOVEMENT_TYPES[transfer_type]
+        ledger_transfer(buyer_id, seller_id, amount, buyer_type, seller_type, transfer=transfer)
+    return transfer
+
+
+def buy_release_clause(draft_id, draft_player_id, buyer_id, seller_id=None):
+    """
+    Compra instantánea pagando la cláusula de rescisión al equipo del jugador.
+    Con `seller_id` solo se paga si el jugador sigue en ese equipo (el que
+    vio el comprador), no si mientras tanto lo ha fichado otro.
+    """
+    draft_player = DraftPlayer.objects.filter(id=draft_player_id, draft_id=draft_id).first()
+    if draft_player is None:
+        raise MarketError('Jugador no encontrado', 404)
+    check_market_open(draft_id)
+    if seller_id is not None and draft_player.team_id != seller_id:
+        raise MarketError('El jugador ya ha cambiado de equipo', 409)
+    return execute_transfer(draft_player, buyer_id, TransferType.RELEASE_CLAUSE)
+
+
+def create_listing(draft_player_id, seller_id, price):
+    draft_player = DraftPlayer.objects.select_related('player').filter(id=draft_player_id).first()
+    if draft_player is None:
+        raise MarketError('Jugador no encontrado', 404)
+    check_market_open(draft_player.draft_id)
+    if draft_player.team_id != seller_id:
+        raise MarketError('El jugador no es de tu equipo', 403)
+    # Se guarda con la clave del modelo ('GL'), no como viene del CSV ('GK'), para filtrar por índice
+    position = normalize_position(draft_player.player.position)
+    if position is None:
+        raise MarketError('Posición del jugador no válida', 409)
+    try:
+        with transaction.atomic():
+            return Listing.objects.create(
+                draft_id=draft_player.draft_id, draft_player=draft_player, seller_id=seller_id, price=price,
+                position=position,
+            )
+    except IntegrityError:
+        # unique_open_listing: ya hay una venta abierta del jugador
+        raise MarketError('El jugador ya está en venta', 409)
+
+
+def cancel_listing(listing_id, seller_id):
+    with transaction.atomic():
+        listing = Listing.objects.select_for_update().filter(id=listing_id).first()
+        if listing is None:
+            raise MarketError('Venta no encontrada', 404)
+        if listing.seller_id != seller_id:
+            raise MarketError('No tienes permisos para hacer esto', 403)
+        if listing.status != ListingStatus.OPEN:
+            raise MarketError('La venta ya está cerrada', 409)
+        listing.bids.filter(status=BidStatus.PENDING).update(status=BidStatus.REJECTED)
+        listing.status = ListingStatus.CANCELLED
+        listing.save(update_fields=['status'])
+
+
+def _open_listing(listing_id):
+    listing = Listing.objects.select_related('draft_player').filter(id=listing_id).first()
+    if listing is None:
+        raise MarketError('Venta no encontrada', 404)
+    if listing.status != ListingStatus.OPEN:
+        raise MarketError('La venta ya está cerrada', 409)
+    return listing
+
+
+def buy_listing(listing_id, buyer_id):
+    """Compra directa al precio de la venta."""
+    listing = _open_listing(listing_id)
+    return execute_transfer(listing.draft_player, buyer_id, TransferType.LISTING, listing=listing)
+
+
+def place_bid(listing_id, bidder_id, amount):
+    listing = _open_listing(listing_id)
+    if listing.seller_id == bidder_id:
+        raise MarketError('No puedes pujar por tu propio jugador', 409)
+    budget = Team.objects.values_list('budget', flat=True).get(id=bidder_id)
+    if budget < amount:
+        raise MarketError('Presupuesto insuficiente', 409)
+    return Bid.objects.create(listing=listing, bidder_id=bidder_id, amount=amount)
+
+
+def accept_bid(bid_id, seller_id):
+    """El vendedor acepta una oferta: traspaso al importe ofrecido."""
+    bid = Bid.objects.select_related('listing__draft_player').filter(id=bid_id).first()
+    if bid is None:
+        raise MarketError('Oferta no encontrada', 404)
+    if bid.listing.seller_id != seller_id:
+        raise MarketError('No tienes permisos para hacer esto', 403)
+    if bid.status != BidStatus.PENDING:
+        raise MarketError('La oferta ya no está pendiente', 409)
+    return execute_transfer(bid.listing.draft_player, bid.bidder_id, TransferType.BID, listing=bid.listing, bid=bid)
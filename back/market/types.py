@@ -0,0 +1,16 @@
+from django.db import models
+
+class ListingStatus(models.TextChoices):
+    OPEN = 'open', 'En venta'
+    SOLD = 'sold', 'Vendido'
+    CANCELLED = 'cancelled', 'Retirado'
+
+class BidStatus(models.TextChoices):
+    PENDING = 'pending', 'Pendiente'
+    ACCEPTED = 'accepted', 'Aceptada'
+    REJECTED = 'rejected', 'Rechazada'
+
+class TransferType(models.TextChoices):
+    LISTING = 'listing', 'Compra directa'
+    BID = 'bid', 'Oferta aceptada'
+    RELEASE_CLAUSE = 'release_clause', 'Cláusula de rescisión'
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import (
+    listings, cancel_market_listing, buy_market_listing, bid_market_listing,
+    accept_market_bid, pay_release_clause,
+)
+
+urlpatterns = [
+    path('<int:draft_id>/listings', listings, name='listings'),
+    path('listings/<int:listing_id>', cancel_market_listing, name='cancel_market_listing'),
+    path('listings/<int:listing_id>/buy', buy_market_listing, name='buy_market_listing'),
+    path('listings/<int:listing_id>/bids', bid_market_listing, name='bid_market_listing'),
+    path('<int:draft_id>/bids/<int:bid_id>/accept', accept_market_bid, name='accept_market_bid'),
+    path('<int:draft_id>/players/<int:draft_player_id>/release-clause', pay_release_clause, name='pay_release_clause'),
+]
@@ -1,3 +1,185 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.db.models import Q
+from django.http import HttpRequest, JsonResponse
+
+from market.models import Listing
+from market.transfers import (
+    MarketError, accept_bid, buy_listing, buy_release_clause, cancel_listing, create_listing, parse_amount, place_bid,
+)
+from market.types import ListingStatus
+from players.types import normalize_position
+from team.models import Team
+
+# Tamaño por defecto y máximo de página del mercado
+DEFAULT_LISTINGS_PAGE = 50
+MAX_LISTINGS_PAGE = 200
+
+
+def _my_team_id(request, draft_id):
+    return (
+        Team.objects
+        .filter(draft_id=draft_id, draft_user__user_id=request.user.id)
+        .values_list('id', flat=True)
+        .first()
+    )
+
+
+def _body(request):
+    try:
+        return json.loads((request.body or b"{}").decode("utf-8")) or {}
+    except Exception:
+        raise MarketError('JSON inválido')
+
+
+def _transfer_row(transfer):
+    return {
+        'id': transfer.id,
+        'draft_player_id': transfer.draft_player_id,
+        'seller_id': transfer.seller_id,
+        'buyer_id': transfer.buyer_id,
+        'amount': transfer.amount,
+        'type': transfer.type,
+    }
+
+
+def _listing_row(listing):
+    return {
+        'id': listing.id,
+        'draft_player_id': listing.draft_player_id,
+        'name': listing.draft_player.name,
+        'position': listing.position,
+        'seller_id': listing.seller_id,
+        'seller': listing.seller.name,
+        'price': listing.price,
+        'release_clause': listing.draft_player.release_clause,
+    }
+
+
+def listings(request: HttpRequest, draft_id):
+    """
+    GET: jugadores en venta del draft, del más barato al más caro, con
+    ?position=, ?max_price= y paginación por ?limit= y ?cursor=precio:id
+    (índices (draft, status[, position], price, id)).
+    POST: pone a la venta un jugador del equipo del usuario {draft_player_id, price}.
+    """
+    if request.method == 'POST':
+        team_id = _my_team_id(request, draft_id)
+        if team_id is None:
+            return JsonResponse({'error': 'Equipo no encontrado'}, status=404)
+        try:
+            data = _body(request)
+            draft_player_id = data.get('draft_player_id')
+            if not isinstance(draft_player_id, int):
+                raise MarketError('Faltan parámetros')
+            listing = create_listing(draft_player_id, team_id, parse_amount(data.get('price')))
+        except MarketError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+        return JsonResponse({'id': listing.id, 'price': listing.price}, status=201)
+
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    queryset = (
+        Listing.objects
+        .filter(draft_id=draft_id, status=ListingStatus.OPEN)
+        .select_related('draft_player', 'seller')
+        .order_by('price', 'id')
+    )
+    if request.GET.get('position') is not None:
+        # Acepta tanto 'GL' como el 'GK' de los datos y del front
+        position = normalize_position(request.GET['position'])
+        if position is None:
+            return JsonResponse({'error': 'Posición no válida'}, status=400)
+        queryset = queryset.filter(position=position)
+    try:
+        if request.GET.get('max_price') is not None:
+            queryset = queryset.filter(price__lte=parse_amount(request.GET['max_price']))
+        limit = int(request.GET.get('limit', DEFAULT_LISTINGS_PAGE))
+        cursor = request.GET.get('cursor')
+        if cursor:
+            price, listing_id = cursor.split(':')
+            price, listing_id = parse_amount(price), int(listing_id)
+            queryset = queryset.filter(Q(price__gt=price) | Q(price=price, id__gt=listing_id))
+    except (MarketError, ValueError):
+        return JsonResponse({'error': 'Parámetros no válidos'}, status=400)
+    if not 1 <= limit <= MAX_LISTINGS_PAGE:
+        return JsonResponse({'error': f'El límite debe estar entre 1 y {MAX_LISTINGS_PAGE}'}, status=400)
+
+    page = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = f'{page[-1].price}:{page[-1].id}'
+    return JsonResponse({'results': [_listing_row(listing) for listing in page], 'next_cursor': next_cursor})
+
+
+def _listing_action(request, listing_id, method, action):
+    if request.method != method:
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    draft_id = Listing.objects.filter(id=listing_id).values_list('draft_id', flat=True).first()
+    if draft_id is None:
+        return JsonResponse({'error': 'Venta no encontrada'}, status=404)
+    team_id = _my_team_id(request, draft_id)
+    if team_id is None:
+        return JsonResponse({'error': 'Equipo no encontrado'}, status=404)
+
+    try:
+        return action(team_id)
+    except MarketError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+
+
+def cancel_market_listing(request: HttpRequest, listing_id):
+    def action(team_id):
+        cancel_listing(listing_id, team_id)
+        return JsonResponse({'message': 'Jugador retirado del mercado'})
+    return _listing_action(request, listing_id, 'DELETE', action)
+
+
+def buy_market_listing(request: HttpRequest, listing_id):
+    def action(team_id):
+        return JsonResponse(_transfer_row(buy_listing(listing_id, team_id)))
+    return _listing_action(request, listing_id, 'POST', action)
+
+
+def bid_market_listing(request: HttpRequest, listing_id):
+    def action(team_id):
+        bid = place_bid(listing_id, team_id, parse_amount(_body(request).get('amount')))
+        return JsonResponse({'id': bid.id, 'amount': bid.amount}, status=201)
+    return _listing_action(request, listing_id, 'POST', action)
+
+
+def accept_market_bid(request: HttpRequest, draft_id, bid_id):
+    if request.method != 'PUT':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    team_id = _my_team_id(request, draft_id)
+    if team_id is None:
+        return JsonResponse({'error': 'Equipo no encontrado'}, status=404)
+    try:
+        return JsonResponse(_transfer_row(accept_bid(bid_id, team_id)))
+    except MarketError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+
+
+def pay_release_clause(request: HttpRequest, draft_id, draft_player_id):
+    """
+    Ficha al instante a un jugador de otro equipo pagando su cláusula de
+    rescisión. Opcional {"team_id": N}: solo si el jugador sigue en ese equipo.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    team_id = _my_team_id(request, draft_id)
+    if team_id is None:
+        return JsonResponse({'error': 'Equipo no encontrado'}, status=404)
+    try:
+        # El cuerpo es opcional: sin JSON se paga a quien sea ahora el dueño
+        seller_id = (_body(request) if request.content_type == 'application/json' else {}).get('team_id')
+        if seller_id is not None and not isinstance(seller_id, int):
+            raise MarketError('Equipo no válido')
+        return JsonResponse(_transfer_row(buy_release_clause(draft_id, draft_player_id, team_id, seller_id)))
+    except MarketError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
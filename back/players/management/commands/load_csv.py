@@ -1,4 +1,5 @@
 from players.models import Player, DraftPlayer
+from players.types import normalize_element, normalize_position
 from django.core.management.base import BaseCommand
 from draft.models import Draft
 from league.models import League
@@ -21,6 +22,10 @@ class Command(BaseCommand):
             )
 
             for row in reader:
+                if normalize_position(row['position']) is None or (row['element'] != 'None' and normalize_element(row['element']) is None):
+                    self.stdout.write(self.style.WARNING(
+                        f"{row['name']}: posición '{row['position']}' o elemento '{row['element']}' no reconocidos."
+                    ))
                 player = Player.objects.create(
                     name=row['name'],
                     gender=row['gender'].strip(),
@@ -14,4 +14,37 @@ class PlayerElement(models.TextChoices):
     AIR = 'air', 'Aire'
     FIRE = 'fire', 'Fuego'
     EARTH = 'earth', 'Montaña'
-    WOOD = 'wood', 'Bosque'
\ No newline at end of file
+    WOOD = 'wood', 'Bosque'
+
+
+# Grafías con las que llegan posiciones y elementos de los CSV y del front
+POSITION_ALIASES = {
+    'GK': PlayerPosition.GOALKEEPER,
+    'POR': PlayerPosition.GOALKEEPER,
+    'PORTERO': PlayerPosition.GOALKEEPER,
+}
+ELEMENT_ALIASES = {
+    'wind': PlayerElement.AIR,
+    'viento': PlayerElement.AIR,
+    'aire': PlayerElement.AIR,
+    'fuego': PlayerElement.FIRE,
+    'mountain': PlayerElement.EARTH,
+    'montaña': PlayerElement.EARTH,
+    'bosque': PlayerElement.WOOD,
+}
+
+
+def normalize_position(value):
+    """Posición guardada ('GK', 'gl', ...) como PlayerPosition, o None si no se reconoce."""
+    value = (value or '').strip().upper()
+    if value in PlayerPosition.values:
+        return PlayerPosition(value)
+    return POSITION_ALIASES.get(value)
+
+
+def normalize_element(value):
+    """Elemento guardado ('Earth', 'Wind', ...) como PlayerElement, o None si no se reconoce."""
+    value = (value or '').strip().lower()
+    if value in PlayerElement.values:
+        return PlayerElement(value)
+    return ELEMENT_ALIASES.get(value)
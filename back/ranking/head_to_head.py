@@ -0,0 +1,63 @@
+from django.core.cache import cache
+
+from draft.models import Draft
+from games.models import Game
+from games.types import GameStatus
+from ranking.standings import DRAW_POINTS, WIN_POINTS
+from team.models import Team
+
+# Como las proyecciones: vale hasta que cambia la versión de resultados del draft
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def head_to_head(draft_id):
+    """
+    Enfrentamientos directos de todos los equipos en una pasada sobre los
+    partidos finalizados. Matrices indexadas por la posición del equipo en
+    `teams`: `results[i][j]` es [goles de i, goles de j] del partido con i de
+    local (o None si no se ha jugado), y `points` / `goal_difference` suman
+    todos los partidos entre i y j desde el punto de vista de i.
+    """
+    teams = list(Team.objects.filter(draft_id=draft_id).order_by('name', 'id').values('id', 'name'))
+    index = {team['id']: i for i, team in enumerate(teams)}
+    size = len(teams)
+    results = [[None] * size for _ in range(size)]
+    points = [[0] * size for _ in range(size)]
+    goal_difference = [[0] * size for _ in range(size)]
+
+    games = (
+        Game.objects
+        .filter(draft_id=draft_id, status=GameStatus.FINISHED)
+        .order_by('week', 'id')
+        .values_list('local_team_id', 'away_team_id', 'local_goals', 'away_goals')
+    )
+    for local_id, away_id, local_goals, away_goals in games:
+        local, away = index.get(local_id), index.get(away_id)
+        if local is None or away is None:
+            continue
+        results[local][away] = [local_goals, away_goals]
+        goal_difference[local][away] += local_goals - away_goals
+        goal_difference[away][local] += away_goals - local_goals
+        if local_goals > away_goals:
+            points[local][away] += WIN_POINTS
+        elif local_goals < away_goals:
+            points[away][local] += WIN_POINTS
+        else:
+            points[local][away] += DRAW_POINTS
+            points[away][local] += DRAW_POINTS
+
+    return {'teams': teams, 'results': results, 'points': points, 'goal_difference': goal_difference}
+
+
+def get_head_to_head(league_id):
+    """
+    Matriz de enfrentamientos de la liga, cacheada por versión de resultados.
+    Lanza Draft.DoesNotExist si la liga no tiene draft.
+    """
+    draft_id, version = Draft.objects.values_list('id', 'results_version').get(league_id=league_id)
+    key = f'ranking:head_to_head:{draft_id}:{version}'
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = {'version': version, **head_to_head(draft_id)}
+        cache.set(key, matrix, CACHE_TIMEOUT)
+    return matrix
@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Subquery, Value, When
+
+from draft.models import Draft
+from games.models import Game, GameResultRequest, Stats
+from games.types import GameResultRequestStatus
+from ranking.models import PlayerStanding
+
+COLUMNS = ['goals', 'goals_against', 'appearances', 'clean_sheets']
+
+# Tamaño por defecto y máximo de las tablas de jugadores
+DEFAULT_LEADERS = 20
+MAX_LEADERS = 100
+
+# Solo salen en la tabla de porteros los que han jugado algún partido en portería
+GOALKEEPERS = Q(clean_sheets__gt=0) | Q(goals_against__gt=0)
+
+
+def _row(standing):
+    draft_player = standing.draft_player
+    return {
+        'id': standing.draft_player_id,
+        'name': draft_player.name,
+        'team_id': draft_player.team_id,
+        'team': draft_player.team.name if draft_player.team else None,
+        'goals': standing.goals,
+        'goals_against': standing.goals_against,
+        'appearances': standing.appearances,
+        'clean_sheets': standing.clean_sheets,
+    }
+
+
+def _leaders(league_id, ordering, limit, extra=Q()):
+    # El draft de la liga se resuelve antes (subconsulta escalar) y se filtra
+    # por draft_id, para que el top-N salga directamente del índice por draft
+    draft_id = Subquery(Draft.objects.filter(league_id=league_id).order_by('id').values('id')[:1])
+    standings = (
+        PlayerStanding.objects
+        .filter(extra, draft_id=draft_id)
+        .select_related('draft_player__team')
+        .order_by(*ordering)[:limit]
+    )
+    return [_row(standing) for standing in standings]
+
+
+def get_scorers(league_id, limit=DEFAULT_LEADERS):
+    """Máximos goleadores de la liga, en una consulta sobre el índice (draft, -goals)."""
+    return _leaders(league_id, ['-goals', 'appearances', 'draft_player_id'], limit, Q(goals__gt=0))
+
+
+def get_goalkeepers(league_id, limit=DEFAULT_LEADERS):
+    """Porteros con más porterías a cero y, a igualdad, menos goles encajados."""
+    return _leaders(league_id, ['-clean_sheets', 'goals_against', 'draft_player_id'], limit, GOALKEEPERS)
+
+
+def player_deltas(stats, goalkeepers):
+    """
+    Suma por jugador de los Stats nuevos. `goalkeepers` es una lista de
+    (draft_player_id, goles encajados) de los porteros de cada partido.
+    Un jugador cuenta un partido jugado aunque tenga varias filas en él.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COLUMNS, 0))
+    played = set()
+    for stat in stats:
+        delta = deltas[stat.draft_player_id]
+        delta['goals'] += stat.goals
+        delta['goals_against'] += stat.goals_against
+        if (stat.draft_player_id, stat.game_id) not in played:
+            played.add((stat.draft_player_id, stat.game_id))
+            delta['appearances'] += 1
+    for draft_player_id, conceded in goalkeepers:
+        if conceded == 0:
+            deltas[draft_player_id]['clean_sheets'] += 1
+    return deltas
+
+
+def apply_player_stats(draft_id, deltas):
+    """
+    Suma las estadísticas de una aprobación a la tabla de jugadores. Va en la
+    transacción de la aprobación y hace siempre dos consultas.
+    """
+    if not deltas:
+        return
+    PlayerStanding.objects.bulk_create(
+        [PlayerStanding(draft_id=draft_id, draft_player_id=draft_player_id) for draft_player_id in deltas],
+        ignore_conflicts=True,
+    )
+    PlayerStanding.objects.filter(draft_player_id__in=deltas).update(**{
+        column: F(column) + Case(
+            *[When(draft_player_id=draft_player_id, then=Value(delta[column])) for draft_player_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for column in COLUMNS
+    })
+
+
+def rebuild_player_stats(draft_id):
+    """
+    Recalcula la tabla de jugadores del draft desde los Stats y los porteros
+    de las solicitudes aprobadas, con una única consulta agregada.
+    """
+    stats = Stats._meta.db_table
+    games = Game._meta.db_table
+    requests = GameResultRequest._meta.db_table
+    approved = GameResultRequestStatus.APPROVED
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            SELECT x.draft_player_id, SUM(x.goals), SUM(x.goals_against),
+                   COUNT(DISTINCT x.game_id) FILTER (WHERE x.appearance), SUM(x.clean_sheet)
+            FROM (
+                SELECT s.draft_player_id, s.goals, s.goals_against, s.game_id, TRUE AS appearance, 0 AS clean_sheet
+                FROM {stats} s JOIN {games} g ON g.id = s.game_id
+                WHERE g.draft_id = %s
+                UNION ALL
+                SELECT r.local_goalkeeper_id, 0, 0, r.game_id, FALSE, CASE WHEN g.away_goals = 0 THEN 1 ELSE 0 END
+                FROM {requests} r JOIN {games} g ON g.id = r.game_id
+                WHERE g.draft_id = %s AND r.status = %s AND r.local_goalkeeper_id IS NOT NULL
+                UNION ALL
+                SELECT r.away_goalkeeper_id, 0, 0, r.game_id, FALSE, CASE WHEN g.local_goals = 0 THEN 1 ELSE 0 END
+                FROM {requests} r JOIN {games} g ON g.id = r.game_id
+                WHERE g.draft_id = %s AND r.status = %s AND r.away_goalkeeper_id IS NOT NULL
+            ) x
+            GROUP BY x.draft_player_id
+            ''',
+            [draft_id, draft_id, approved, draft_id, approved],
+        )
+        rows = cursor.fetchall()
+
+    standings = [
+        PlayerStanding(
+            draft_id=draft_id, draft_player_id=draft_player_id, goals=goals, goals_against=goals_against,
+            appearances=appearances, clean_sheets=clean_sheets,
+        )
+        for draft_player_id, goals, goals_against, appearances, clean_sheets in rows
+    ]
+    with transaction.atomic():
+        PlayerStanding.objects.filter(draft_id=draft_id).delete()
+        PlayerStanding.objects.bulk_create(standings)
+    return standings
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from draft.models import Draft
+from ranking.standings import completed_weeks, snapshot_weeks
+
+
+class Command(BaseCommand):
+    help = "Genera las fotos semanales de la clasificación de las jornadas ya cerradas (todos los drafts o uno)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--draft-id", type=int, default=None, help="Solo este draft.")
+
+    def handle(self, *args, **options):
+        drafts = Draft.objects.order_by("id")
+        if options["draft_id"] is not None:
+            drafts = drafts.filter(id=options["draft_id"])
+            if not drafts.exists():
+                raise CommandError(f"No existe el draft {options['draft_id']}.")
+
+        for draft in drafts:
+            weeks = completed_weeks(draft.id)
+            snapshot_weeks(draft.id, weeks)
+            self.stdout.write(f"Draft {draft.id}: {len(weeks)} jornadas")
+
+        self.stdout.write(self.style.SUCCESS("Histórico de la clasificación generado."))
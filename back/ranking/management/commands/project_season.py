@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from draft.models import Draft
+from games.simulation import DEFAULT_RUNS, MAX_RUNS
+from ranking.projections import project_season
+
+
+class Command(BaseCommand):
+    help = "Simula lo que queda de temporada y muestra la probabilidad de cada equipo de acabar en cada puesto."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--draft-id", type=int, required=True, help="Draft a proyectar.")
+        parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Temporadas simuladas.")
+        parser.add_argument("--seed", type=int, default=None, help="Semilla de la simulación.")
+
+    def handle(self, *args, **options):
+        if not 1 <= options["runs"] <= MAX_RUNS:
+            raise CommandError(f"Las simulaciones deben estar entre 1 y {MAX_RUNS}.")
+        if not Draft.objects.filter(id=options["draft_id"]).exists():
+            raise CommandError(f"No existe el draft {options['draft_id']}.")
+
+        teams = project_season(options["draft_id"], runs=options["runs"], seed=options["seed"])
+        for team in teams:
+            top = " ".join(f"{p * 100:5.1f}" for p in team["positions"][:4])
+            self.stdout.write(
+                f"{team['name']:<24} {team['points']:>3} pts  campeón {team['title'] * 100:5.1f}%  "
+                f"puesto medio {team['expected_position']:5.2f}  [1-4: {top}]"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Temporada simulada {options['runs']} veces."))
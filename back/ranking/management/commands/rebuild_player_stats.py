@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from draft.models import Draft
+from ranking.leaders import rebuild_player_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcula las estadísticas acumuladas de los jugadores desde los Stats (todos los drafts o uno)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--draft-id", type=int, default=None, help="Solo este draft.")
+
+    def handle(self, *args, **options):
+        drafts = Draft.objects.order_by("id")
+        if options["draft_id"] is not None:
+            drafts = drafts.filter(id=options["draft_id"])
+            if not drafts.exists():
+                raise CommandError(f"No existe el draft {options['draft_id']}.")
+
+        for draft in drafts:
+            standings = rebuild_player_stats(draft.id)
+            self.stdout.write(f"Draft {draft.id}: {len(standings)} jugadores")
+
+        self.stdout.write(self.style.SUCCESS("Estadísticas de jugadores recalculadas."))
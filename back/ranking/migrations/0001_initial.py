@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('draft', '0007_alter_draftevent_type'),
+        ('team', '0004_lineup_team_current_lineup_lineupslot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('won', models.IntegerField(default=0)),
+                ('drawn', models.IntegerField(default=0)),
+                ('lost', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='draft.draft')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='team.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['draft', '-points', '-goal_difference', '-goals_for'], name='ranking_sta_draft_i_3524e8_idx')],
+            },
+        ),
+    ]
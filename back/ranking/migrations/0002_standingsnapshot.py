@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0007_alter_draftevent_type'),
+        ('ranking', '0001_initial'),
+        ('team', '0004_lineup_team_current_lineup_lineupslot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.IntegerField()),
+                ('position', models.IntegerField()),
+                ('points', models.IntegerField()),
+                ('goal_difference', models.IntegerField()),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_snapshots', to='draft.draft')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_snapshots', to='team.team')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('draft', 'week', 'team'), name='unique_standing_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('draft', '0007_alter_draftevent_type'),
+        ('players', '0003_remove_draftplayer_value'),
+        ('ranking', '0002_standingsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goals', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('appearances', models.IntegerField(default=0)),
+                ('clean_sheets', models.IntegerField(default=0)),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_standings', to='draft.draft')),
+                ('draft_player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='players.draftplayer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['draft', '-goals'], name='ranking_pla_draft_i_b88f4f_idx'), models.Index(fields=['draft', '-clean_sheets', 'goals_against'], name='ranking_pla_draft_i_9b50f3_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,78 @@
 from django.db import models
+from draft.models import Draft
+from team.models import Team
 
-# Create your models here.
+
+class Standing(models.Model):
+    """
+    Fila de la clasificación de un equipo. Se actualiza de forma incremental
+    al aprobar cada resultado (y se puede reconstruir con rebuild_standings),
+    así que leer la clasificación no recorre los partidos.
+    """
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='standings')
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='standing')
+
+    played = models.IntegerField(default=0)
+    won = models.IntegerField(default=0)
+    drawn = models.IntegerField(default=0)
+    lost = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        # Mismo orden que la clasificación: puntos, diferencia y goles a favor
+        indexes = [
+            models.Index(fields=['draft', '-points', '-goal_difference', '-goals_for']),
+        ]
+
+    def __str__(self):
+        return f'{self.team}: {self.points} pts'
+
+
+class StandingSnapshot(models.Model):
+    """
+    Posición y puntos de cada equipo al cerrar una jornada (acumulado hasta
+    esa jornada), para pintar la evolución sin recalcular temporadas enteras.
+    """
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='standing_snapshots')
+    week = models.IntegerField()
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standing_snapshots')
+
+    position = models.IntegerField()
+    points = models.IntegerField()
+    goal_difference = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['draft', 'week', 'team'], name='unique_standing_snapshot'),
+        ]
+
+    def __str__(self):
+        return f'{self.team} en la jornada {self.week}: {self.position}º'
+
+
+class PlayerStanding(models.Model):
+    """
+    Estadísticas acumuladas de un jugador en la temporada (suma de sus Stats).
+    Se actualizan al aprobar cada resultado y se pueden reconstruir con
+    rebuild_player_stats, así las tablas de goleadores no agrupan los Stats.
+    """
+    draft = models.ForeignKey(Draft, on_delete=models.CASCADE, related_name='player_standings')
+    draft_player = models.OneToOneField('players.DraftPlayer', on_delete=models.CASCADE, related_name='standing')
+
+    goals = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    appearances = models.IntegerField(default=0)
+    clean_sheets = models.IntegerField(default=0)
+
+    class Meta:
+        # Pichichi y Zamora
+        indexes = [
+            models.Index(fields=['draft', '-goals']),
+            models.Index(fields=['draft', '-clean_sheets', 'goals_against']),
+        ]
+
+    def __str__(self):
+        return f'{self.draft_player}: {self.goals} goles'
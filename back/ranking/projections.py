@@ -0,0 +1,91 @@
+import numpy as np
+from django.core.cache import cache
+
+from draft.models import Draft
+from games.models import Game
+from games.simulation import DEFAULT_RUNS, TeamStrengths, simulate
+from games.types import GameStatus
+from ranking.standings import DRAW_POINTS, WIN_POINTS, get_standings
+
+# Las proyecciones viven hasta que cambia la versión de resultados del draft
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _cache_key(draft_id, version, runs):
+    return f'ranking:projections:{draft_id}:{version}:{runs}'
+
+
+def project_season(draft_id, runs=DEFAULT_RUNS, seed=None):
+    """
+    Simula `runs` veces los partidos que quedan y devuelve, por equipo en el
+    orden de la clasificación actual, la probabilidad de acabar en cada
+    puesto. Las temporadas se juegan todas a la vez como arrays de
+    equipos x simulaciones.
+    """
+    standings = get_standings(draft_id)
+    team_ids = [row['id'] for row in standings]
+    if not team_ids:
+        return []
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    size = len(team_ids)
+
+    points = np.array([row['points'] for row in standings], dtype=np.int64)[:, None]
+    goal_difference = np.array([row['goal_difference'] for row in standings], dtype=np.int64)[:, None]
+    goals_for = np.array([row['goals_for'] for row in standings], dtype=np.int64)[:, None]
+    points, goal_difference, goals_for = (np.repeat(column, runs, axis=1) for column in (points, goal_difference, goals_for))
+
+    fixtures = [
+        (local, away)
+        for local, away in Game.objects.filter(draft_id=draft_id).exclude(status=GameStatus.FINISHED)
+        .values_list('local_team_id', 'away_team_id')
+        if local in index and away in index
+    ]
+    if fixtures:
+        local_goals, away_goals = simulate(TeamStrengths.load(team_ids), fixtures, runs=runs, seed=seed)
+        local_points = np.where(local_goals > away_goals, WIN_POINTS, np.where(local_goals == away_goals, DRAW_POINTS, 0))
+        away_points = np.where(away_goals > local_goals, WIN_POINTS, np.where(local_goals == away_goals, DRAW_POINTS, 0))
+
+        # Matrices partido -> equipo: sumar cada columna por equipo es un producto de matrices
+        home = np.zeros((size, len(fixtures)), dtype=np.int64)
+        away = np.zeros((size, len(fixtures)), dtype=np.int64)
+        rows = np.arange(len(fixtures))
+        home[[index[local] for local, _ in fixtures], rows] = 1
+        away[[index[visitor] for _, visitor in fixtures], rows] = 1
+        points = points + home @ local_points + away @ away_points
+        goal_difference = goal_difference + home @ (local_goals - away_goals) + away @ (away_goals - local_goals)
+        goals_for = goals_for + home @ local_goals + away @ away_goals
+
+    # Mismos desempates que la clasificación; el último, el orden actual (nombre)
+    current = np.repeat(np.arange(size)[:, None], runs, axis=1)
+    order = np.lexsort((current, -goals_for, -goal_difference, -points), axis=0)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(size)[:, None], axis=0)
+    probabilities = (positions[:, None, :] == np.arange(size)[None, :, None]).mean(axis=2)
+    expected = (positions + 1).mean(axis=1)
+
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'points': row['points'],
+            'positions': [round(float(p), 4) for p in probabilities[i]],
+            'title': round(float(probabilities[i, 0]), 4),
+            'expected_position': round(float(expected[i]), 2),
+        }
+        for i, row in enumerate(standings)
+    ]
+
+
+def get_projections(league_id, runs=DEFAULT_RUNS):
+    """
+    Proyección de la temporada de la liga, cacheada por versión de resultados:
+    solo se vuelve a simular cuando se aprueba un resultado. Lanza
+    Draft.DoesNotExist si la liga no tiene draft.
+    """
+    draft_id, version = Draft.objects.values_list('id', 'results_version').get(league_id=league_id)
+    key = _cache_key(draft_id, version, runs)
+    projections = cache.get(key)
+    if projections is None:
+        projections = {'version': version, 'runs': runs, 'teams': project_season(draft_id, runs=runs)}
+        cache.set(key, projections, CACHE_TIMEOUT)
+    return projections
@@ -0,0 +1,226 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+from games.models import Game
+from games.types import GameStatus
+from ranking.models import Standing, StandingSnapshot
+from team.models import Team
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+# Desempates: puntos, diferencia de goles, goles a favor y nombre
+ORDERING = ['-points', '-goal_difference', '-goals_for', 'team__name', 'team_id']
+
+COLUMNS = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'goal_difference', 'points']
+
+
+def _row(standing):
+    return {
+        'id': standing.team_id,
+        'name': standing.team.name,
+        'played': standing.played,
+        'wins': standing.won,
+        'draws': standing.drawn,
+        'losses': standing.lost,
+        'goals_for': standing.goals_for,
+        'goals_against': standing.goals_against,
+        'goal_difference': standing.goal_difference,
+        'points': standing.points,
+    }
+
+
+def get_standings(draft_id=None, league_id=None):
+    """Clasificación ordenada con desempates, en una sola consulta indexada."""
+    standings = Standing.objects.select_related('team').order_by(*ORDERING)
+    if draft_id is not None:
+        standings = standings.filter(draft_id=draft_id)
+    else:
+        standings = standings.filter(draft__league_id=league_id)
+    rows = [_row(standing) for standing in standings]
+    if rows:
+        return rows
+
+    # Aún no se ha aprobado ningún resultado: todos los equipos a cero
+    teams = Team.objects.order_by('name', 'id')
+    teams = teams.filter(draft_id=draft_id) if draft_id is not None else teams.filter(draft__league_id=league_id)
+    return [_row(Standing(team=team)) for team in teams]
+
+
+def _team_delta(results):
+    """Suma por equipo de las columnas de la clasificación para una lista de resultados."""
+    deltas = defaultdict(lambda: dict.fromkeys(COLUMNS, 0))
+    for local_team_id, away_team_id, local_goals, away_goals in results:
+        for team_id, scored, conceded in (
+            (local_team_id, local_goals, away_goals),
+            (away_team_id, away_goals, local_goals),
+        ):
+            if team_id is None:
+                continue
+            delta = deltas[team_id]
+            delta['played'] += 1
+            delta['goals_for'] += scored
+            delta['goals_against'] += conceded
+            delta['goal_difference'] += scored - conceded
+            if scored > conceded:
+                delta['won'] += 1
+                delta['points'] += WIN_POINTS
+            elif scored == conceded:
+                delta['drawn'] += 1
+                delta['points'] += DRAW_POINTS
+            else:
+                delta['lost'] += 1
+    return deltas
+
+
+def apply_standings(draft_id, results):
+    """
+    Suma a la clasificación los resultados aprobados, como lista de
+    (local_team_id, away_team_id, local_goals, away_goals). Va en la
+    transacción de la aprobación y hace siempre las mismas consultas.
+    """
+    deltas = _team_delta(results)
+    if not deltas:
+        return
+
+    # La primera vez creamos las filas de todos los equipos del draft
+    Standing.objects.bulk_create(
+        [Standing(draft_id=draft_id, team_id=team_id) for team_id in Team.objects.filter(draft_id=draft_id).values_list('id', flat=True)],
+        ignore_conflicts=True,
+    )
+    Standing.objects.filter(team_id__in=deltas).update(**{
+        column: F(column) + Case(
+            *[When(team_id=team_id, then=Value(delta[column])) for team_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for column in COLUMNS
+    })
+
+
+def _aggregate(draft_id, up_to_week=None):
+    """
+    Clasificación calculada desde los partidos finalizados con una única
+    consulta agregada (cada partido cuenta una vez como local y otra como
+    visitante). Con `up_to_week` solo cuentan las jornadas hasta esa.
+    Devuelve filas Standing sin guardar, ya ordenadas con los desempates.
+    """
+    games = Game._meta.db_table
+    teams = Team._meta.db_table
+    week_filter = 'AND week <= %s' if up_to_week is not None else ''
+    side_params = [draft_id, GameStatus.FINISHED] + ([up_to_week] if up_to_week is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            SELECT t.id, t.name,
+                   COUNT(g.team_id),
+                   COALESCE(SUM(CASE WHEN g.scored > g.conceded THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN g.scored = g.conceded THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN g.scored < g.conceded THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(g.scored), 0),
+                   COALESCE(SUM(g.conceded), 0)
+            FROM {teams} t
+            LEFT JOIN (
+                SELECT local_team_id AS team_id, local_goals AS scored, away_goals AS conceded
+                FROM {games} WHERE draft_id = %s AND status = %s {week_filter}
+                UNION ALL
+                SELECT away_team_id, away_goals, local_goals
+                FROM {games} WHERE draft_id = %s AND status = %s {week_filter}
+            ) g ON g.team_id = t.id
+            WHERE t.draft_id = %s
+            GROUP BY t.id, t.name
+            ''',
+            side_params + side_params + [draft_id],
+        )
+        rows = cursor.fetchall()
+
+    standings = []
+    for team_id, name, played, won, drawn, lost, goals_for, goals_against in rows:
+        standing = Standing(
+            draft_id=draft_id, team_id=team_id, played=played, won=won, drawn=drawn, lost=lost,
+            goals_for=goals_for, goals_against=goals_against, goal_difference=goals_for - goals_against,
+            points=won * WIN_POINTS + drawn * DRAW_POINTS,
+        )
+        standing.team_name = name
+        standings.append(standing)
+    # Mismo orden que ORDERING
+    standings.sort(key=lambda st: (-st.points, -st.goal_difference, -st.goals_for, st.team_name, st.team_id))
+    return standings
+
+
+def rebuild_standings(draft_id):
+    """Recalcula la clasificación del draft desde los partidos finalizados."""
+    standings = _aggregate(draft_id)
+    with transaction.atomic():
+        Standing.objects.filter(draft_id=draft_id).delete()
+        Standing.objects.bulk_create(standings)
+    return standings
+
+
+def completed_weeks(draft_id, weeks=None):
+    """Jornadas (de `weeks`, o todas) en las que ya están finalizados todos los partidos."""
+    games = Game.objects.filter(draft_id=draft_id)
+    if weeks is not None:
+        games = games.filter(week__in=weeks)
+    return sorted(
+        games.values('week')
+        .annotate(pending=Count('id', filter=~Q(status=GameStatus.FINISHED)))
+        .filter(pending=0)
+        .values_list('week', flat=True)
+    )
+
+
+def snapshot_weeks(draft_id, weeks):
+    """Guarda la clasificación acumulada al cierre de cada jornada indicada."""
+    for week in weeks:
+        snapshots = [
+            StandingSnapshot(
+                draft_id=draft_id, week=week, team_id=standing.team_id, position=position,
+                points=standing.points, goal_difference=standing.goal_difference,
+            )
+            for position, standing in enumerate(_aggregate(draft_id, up_to_week=week), start=1)
+        ]
+        with transaction.atomic():
+            StandingSnapshot.objects.filter(draft_id=draft_id, week=week).delete()
+            StandingSnapshot.objects.bulk_create(snapshots)
+
+
+def record_completed_weeks(draft_id, weeks):
+    """
+    Tras aprobar resultados de `weeks`: si alguna jornada queda cerrada, guarda
+    su foto. Si se cierra una jornada después de otras posteriores (resultados
+    aprobados fuera de orden), se rehacen también las fotos posteriores.
+    """
+    closed = completed_weeks(draft_id, weeks)
+    if not closed:
+        return []
+    later = StandingSnapshot.objects.filter(draft_id=draft_id, week__gt=closed[0]).values_list('week', flat=True).distinct()
+    weeks = sorted(set(closed) | set(later))
+    snapshot_weeks(draft_id, weeks)
+    return weeks
+
+
+def get_history(league_id):
+    """
+    Evolución de la temporada en una sola consulta:
+    {'weeks': [...], 'teams': [{'id', 'name', 'positions', 'points'}]}.
+    """
+    snapshots = (
+        StandingSnapshot.objects
+        .filter(draft__league_id=league_id)
+        .order_by('week', 'position')
+        .values_list('week', 'team_id', 'team__name', 'position', 'points')
+    )
+    weeks = []
+    teams = {}
+    for week, team_id, name, position, points in snapshots:
+        if not weeks or weeks[-1] != week:
+            weeks.append(week)
+        team = teams.setdefault(team_id, {'id': team_id, 'name': name, 'positions': [], 'points': []})
+        # Un equipo que no estuviera en alguna jornada anterior queda a None
+        missing = len(weeks) - 1 - len(team['positions'])
+        team['positions'] += [None] * missing + [position]
+        team['points'] += [None] * missing + [points]
+    return {'weeks': weeks, 'teams': list(teams.values())}
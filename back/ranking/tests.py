@@ -1,3 +1,127 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from draft.models import Draft
+from games.models import Game, GameResultRequest
+from games.types import GameStatus
+from league.models import League
+from ranking.models import Standing
+from ranking.standings import rebuild_standings
+from team.models import Team
+from users.models import DraftUser, User
+
+
+class StandingsTests(TestCase):
+    RESULTS = [(0, 1, 2, 0), (2, 3, 1, 1), (1, 2, 3, 1), (3, 0, 0, 1), (0, 2, 0, 2), (1, 3, 2, 0)]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='x')
+        cls.league = League.objects.create(name='Liga', owner=cls.owner)
+        cls.draft = Draft.objects.create(league=cls.league, name='Draft')
+        cls.teams = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=cls.draft)
+            cls.teams.append(Team.objects.create(name=f'Equipo {i}', draft=cls.draft, draft_user=draft_user, budget=Decimal('0')))
+        cls.url = f'/api/ranking/{cls.league.id}/'
+
+    def setUp(self):
+        cache.clear()
+
+    def _approve_all(self):
+        self.client.force_login(self.owner)
+        for week, (local, away, local_goals, away_goals) in enumerate(self.RESULTS, start=1):
+            game = Game.objects.create(
+                draft=self.draft, week=week, local_team=self.teams[local], away_team=self.teams[away],
+                status=GameStatus.PENDING_RESULT,
+            )
+            GameResultRequest.objects.create(game=game, local_goals=local_goals, away_goals=away_goals)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                f'/api/games/league/{self.league.id}/requests/batch',
+                {'action': 'approve', 'ids': list(GameResultRequest.objects.values_list('id', flat=True))},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_incremental_standings_match_rebuild_and_tie_breaks(self):
+        self._approve_all()
+
+        with self.assertNumQueries(1):
+            standings = self.client.get(self.url).json()
+        # Equipos 0 y 1 empatan a 6 puntos; desempata la diferencia de goles
+        self.assertEqual([row['name'] for row in standings], ['Equipo 1', 'Equipo 0', 'Equipo 2', 'Equipo 3'])
+        self.assertEqual(
+            [(row['points'], row['played'], row['wins'], row['draws'], row['losses'], row['goal_difference']) for row in standings],
+            [(6, 3, 2, 0, 1, 2), (6, 3, 2, 0, 1, 1), (4, 3, 1, 1, 1, 0), (1, 3, 0, 1, 2, -3)],
+        )
+
+        incremental = list(Standing.objects.order_by('team_id').values())
+        rebuild_standings(self.draft.id)
+        rebuilt = list(Standing.objects.order_by('team_id').values())
+        strip = lambda rows: [{k: v for k, v in row.items() if k != 'id'} for row in rows]
+        self.assertEqual(strip(incremental), strip(rebuilt))
+
+    def test_history_snapshots_each_closed_week(self):
+        self._approve_all()
+
+        with self.assertNumQueries(1):
+            history = self.client.get(f'/api/ranking/{self.league.id}/history').json()
+        self.assertEqual(history['weeks'], [1, 2, 3, 4, 5, 6])
+        by_name = {team['name']: team for team in history['teams']}
+        # Tras la jornada 1 el Equipo 0 va primero; al final, segundo
+        self.assertEqual(by_name['Equipo 0']['positions'][0], 1)
+        self.assertEqual(by_name['Equipo 0']['positions'][-1], 2)
+        self.assertEqual(by_name['Equipo 1']['points'], [0, 0, 3, 3, 3, 6])
+
+    def test_projections_cached_until_next_approval(self):
+        self._approve_all()
+        url = f'/api/ranking/{self.league.id}/projections'
+
+        # Temporada terminada: las posiciones ya son seguras
+        finished = self.client.get(url).json()
+        self.assertEqual([team['name'] for team in finished['teams']], ['Equipo 1', 'Equipo 0', 'Equipo 2', 'Equipo 3'])
+        self.assertEqual([team['positions'] for team in finished['teams']], [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+
+        # Se añade la segunda vuelta y se aprueba su primer partido: versión nueva, se vuelve a simular
+        second_leg = Game.objects.bulk_create([
+            Game(draft=self.draft, week=week + 6, local_team=self.teams[away], away_team=self.teams[local], status=GameStatus.PENDING_RESULT)
+            for week, (local, away, _, _) in enumerate(self.RESULTS, start=1)
+        ])
+        result_request = GameResultRequest.objects.create(game=second_leg[0], local_goals=0, away_goals=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                f'/api/games/league/{self.league.id}/requests/batch', {'action': 'approve', 'ids': [result_request.id]},
+                content_type='application/json',
+            )
+        projected = self.client.get(url).json()
+        self.assertEqual(projected['version'], finished['version'] + 1)
+        for team in projected['teams']:
+            self.assertAlmostEqual(sum(team['positions']), 1)
+        for position in range(4):
+            self.assertAlmostEqual(sum(team['positions'][position] for team in projected['teams']), 1)
+        self.assertLess(projected['teams'][0]['title'], 1)
+
+        # Sin aprobaciones nuevas no se simula: solo se lee la versión
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json(), projected)
+
+    def test_head_to_head_matrix(self):
+        self._approve_all()
+        url = f'/api/ranking/{self.league.id}/head-to-head'
+
+        # Versión, equipos y partidos
+        with self.assertNumQueries(3):
+            matrix = self.client.get(url).json()
+        self.assertEqual([team['name'] for team in matrix['teams']], [f'Equipo {i}' for i in range(4)])
+        self.assertEqual(matrix['results'][0][1], [2, 0])
+        self.assertIsNone(matrix['results'][1][0])
+        self.assertEqual((matrix['points'][0][1], matrix['points'][1][0]), (3, 0))
+        self.assertEqual((matrix['points'][2][3], matrix['points'][3][2]), (1, 1))
+        self.assertEqual(matrix['goal_difference'][3][0], -1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json(), matrix)
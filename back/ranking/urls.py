@@ -1,6 +1,11 @@
 from django.urls import path
-from .views import view_clasification 
+from .views import view_clasification, view_clasification_history, view_goalkeepers, view_head_to_head, view_projections, view_scorers
 
 urlpatterns = [
     path('<int:league_id>/', view_clasification, name='view_clasification'),
+    path('<int:league_id>/history', view_clasification_history, name='view_clasification_history'),
+    path('<int:league_id>/scorers', view_scorers, name='view_scorers'),
+    path('<int:league_id>/goalkeepers', view_goalkeepers, name='view_goalkeepers'),
+    path('<int:league_id>/projections', view_projections, name='view_projections'),
+    path('<int:league_id>/head-to-head', view_head_to_head, name='view_head_to_head'),
 ]
@@ -1,23 +1,60 @@
 from django.shortcuts import render
 from django.http import JsonResponse, HttpRequest
-from team.models import Team
 from draft.models import Draft
+from ranking.head_to_head import get_head_to_head
+from ranking.leaders import DEFAULT_LEADERS, MAX_LEADERS, get_goalkeepers, get_scorers
+from ranking.projections import get_projections
+from ranking.standings import get_history, get_standings
 
 
 def view_clasification(request: HttpRequest, league_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    draft = Draft.objects.get(league=league_id)
-    
-    teams = list(Team.objects.filter(draft=draft).values().order_by('-points'))
-    
-    response = [
-        {
-            'id': team['id'],
-            'points': team['points'],
-            'name': team['name']
-        } for team in teams
-    ]
+    return JsonResponse(get_standings(league_id=league_id), safe=False)
+
+def view_clasification_history(request: HttpRequest, league_id):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
     
-    return JsonResponse(response, safe=False)
\ No newline at end of file
+    return JsonResponse(get_history(league_id))
+
+
+def _leaders_view(request, league_id, get_leaders):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LEADERS))
+    except ValueError:
+        return JsonResponse({'error': 'El límite debe ser un número'}, status=400)
+    if not 1 <= limit <= MAX_LEADERS:
+        return JsonResponse({'error': f'El límite debe estar entre 1 y {MAX_LEADERS}'}, status=400)
+
+    return JsonResponse(get_leaders(league_id, limit), safe=False)
+
+def view_scorers(request: HttpRequest, league_id):
+    return _leaders_view(request, league_id, get_scorers)
+
+def view_goalkeepers(request: HttpRequest, league_id):
+    return _leaders_view(request, league_id, get_goalkeepers)
+
+def view_projections(request: HttpRequest, league_id):
+    """Probabilidad de cada equipo de acabar en cada puesto, simulando lo que queda de liga."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    try:
+        return JsonResponse(get_projections(league_id))
+    except Draft.DoesNotExist:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
+
+def view_head_to_head(request: HttpRequest, league_id):
+    """Matriz equipo x equipo de los enfrentamientos directos."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+    try:
+        return JsonResponse(get_head_to_head(league_id))
+    except Draft.DoesNotExist:
+        return JsonResponse({'error': 'Draft no encontrado'}, status=404)
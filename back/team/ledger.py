@@ -0,0 +1,68 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from team.models import BudgetMovement, Team
+from team.types import BudgetMovementType
+
+MONEY = DecimalField(decimal_places=2, max_digits=100)
+
+
+def record(movements):
+    """
+    Apunta los movimientos y suma su importe al saldo cacheado de cada equipo
+    con un único UPDATE con F(): nunca se lee el saldo para escribirlo, así
+    que dos escrituras concurrentes no se pisan. Dos consultas sea cual sea
+    el número de movimientos. Usar dentro de la transacción del hecho que
+    los origina (partido, traspaso...).
+    """
+    if not movements:
+        return []
+    deltas = defaultdict(Decimal)
+    for movement in movements:
+        deltas[movement.team_id] += Decimal(movement.amount)
+
+    with transaction.atomic():
+        movements = BudgetMovement.objects.bulk_create(movements)
+        Team.objects.filter(id__in=deltas).update(budget=F('budget') + Case(
+            *[When(id=team_id, then=Value(delta)) for team_id, delta in deltas.items()],
+            default=Value(Decimal('0')),
+            output_field=MONEY,
+        ))
+    return movements
+
+
+def transfer(payer, payee, amount, payer_type, payee_type, **extra):
+    """Movimiento entre dos equipos por partida doble: lo que sale de uno entra en el otro."""
+    return record([
+        BudgetMovement(team_id=payer, counterparty_id=payee, type=payer_type, amount=-amount, **extra),
+        BudgetMovement(team_id=payee, counterparty_id=payer, type=payee_type, amount=amount, **extra),
+    ])
+
+
+def open_budget(team, amount):
+    """Apunte inicial de un equipo recién creado (con saldo 0)."""
+    return record([BudgetMovement(team=team, type=BudgetMovementType.INITIAL, amount=amount)])
+
+
+def adjust_budget(team, amount):
+    """Deja el saldo del equipo en `amount` apuntando la diferencia como ajuste."""
+    difference = Decimal(amount) - Team.objects.values_list('budget', flat=True).get(id=team.id)
+    if difference:
+        record([BudgetMovement(team=team, type=BudgetMovementType.ADJUSTMENT, amount=difference)])
+
+
+def unbalanced_teams(draft_id=None):
+    """
+    Equipos cuyo saldo cacheado no coincide con la suma de su libro, con una
+    única consulta agregada: [(team_id, name, saldo, suma del libro)].
+    """
+    teams = Team.objects.annotate(
+        ledger=Coalesce(Sum('budget_movements__amount'), Value(Decimal('0')), output_field=MONEY),
+    ).exclude(budget=F('ledger'))
+    if draft_id is not None:
+        teams = teams.filter(draft_id=draft_id)
+    return list(teams.order_by('id').values_list('id', 'name', 'budget', 'ledger'))
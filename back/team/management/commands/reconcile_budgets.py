@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from team.ledger import unbalanced_teams
+
+
+class Command(BaseCommand):
+    help = "Comprueba que el saldo cacheado de cada equipo coincide con la suma de su libro de presupuesto."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--draft-id", type=int, default=None, help="Solo los equipos de este draft.")
+
+    def handle(self, *args, **options):
+        # Una sola consulta agregada sobre todos los equipos
+        unbalanced = unbalanced_teams(options["draft_id"])
+        for team_id, name, budget, ledger in unbalanced:
+            self.stdout.write(self.style.ERROR(
+                f"[team {team_id}] {name}: saldo {budget} != libro {ledger} (diferencia {budget - ledger})"
+            ))
+
+        if unbalanced:
+            raise CommandError(f"{len(unbalanced)} equipos descuadrados.")
+        self.stdout.write(self.style.SUCCESS("✅ Todos los saldos cuadran con el libro."))
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0003_remove_draftplayer_value'),
+        ('team', '0003_team_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lineup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('formation', models.CharField(choices=[('4-4-2', '4-4-2'), ('4-3-3', '4-3-3'), ('3-5-2', '3-5-2')], default='4-4-2', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineups', to='team.team')),
+            ],
+            options={
+                'ordering': ['-updated_at', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='current_lineup',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_for_team', to='team.lineup'),
+        ),
+        migrations.CreateModel(
+            name='LineupSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.CharField(choices=[('starter', 'Starter'), ('bench', 'Bench'), ('reserve', 'Reserve')], db_index=True, max_length=10)),
+                ('order', models.SmallIntegerField(default=0)),
+                ('x_pct', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('y_pct', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('draft_player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineup_slots', to='players.draftplayer')),
+                ('lineup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='team.lineup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lineup', 'slot', 'order'], name='team_lineup_lineup__24a486_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('order__gte', 0)), name='lineupslot_order_nonnegative'), models.CheckConstraint(condition=models.Q(('x_pct__isnull', True), models.Q(('x_pct__gte', 0), ('x_pct__lte', 100)), _connector='OR'), name='lineupslot_x_pct_0_100'), models.CheckConstraint(condition=models.Q(('y_pct__isnull', True), models.Q(('y_pct__gte', 0), ('y_pct__lte', 100)), _connector='OR'), name='lineupslot_y_pct_0_100')],
+                'unique_together': {('lineup', 'draft_player')},
+            },
+        ),
+    ]
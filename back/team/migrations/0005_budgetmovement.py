@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    # El saldo actual de cada equipo pasa a ser su apunte inicial
+    Team = apps.get_model('team', 'Team')
+    BudgetMovement = apps.get_model('team', 'BudgetMovement')
+    BudgetMovement.objects.bulk_create([
+        BudgetMovement(team_id=team_id, type='initial', amount=budget)
+        for team_id, budget in Team.objects.values_list('id', 'budget')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_gameresultrequest_draft'),
+        ('team', '0004_lineup_team_current_lineup_lineupslot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('initial', 'Presupuesto inicial'), ('match_reward', 'Premio por partido'), ('purchase', 'Compra'), ('sale', 'Venta'), ('clause_payment', 'Pago de cláusula'), ('clause_income', 'Cobro de cláusula'), ('adjustment', 'Ajuste')], max_length=30)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('counterparty', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='budget_counterparts', to='team.team')),
+                ('game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='budget_movements', to='games.game')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_movements', to='team.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['team', '-id'], name='team_budget_team_id_a51849_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0001_initial'),
+        ('team', '0005_budgetmovement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budgetmovement',
+            name='transfer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='budget_movements', to='market.transfer'),
+        ),
+    ]
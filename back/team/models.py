@@ -3,6 +3,7 @@ from django.db import models
 from django.utils import timezone
 
 from draft.models import Draft
+from team.types import BudgetMovementType
 from users.models import DraftUser
 # ⚠️ NO importamos DraftPlayer para evitar ciclo.
 # Usaremos 'players.DraftPlayer' como referencia por cadena.
@@ -11,6 +12,8 @@ class Team(models.Model):
     name = models.CharField(max_length=100)
     draft = models.ForeignKey(Draft, on_delete=models.CASCADE)
     draft_user = models.ForeignKey(DraftUser, on_delete=models.CASCADE)
+    # Saldo cacheado: suma de los BudgetMovement del equipo, actualizada con F()
+    # en la misma transacción que cada movimiento (ver team.ledger)
     budget = models.DecimalField(decimal_places=2, max_digits=100)
     points = models.IntegerField(default=0)
 
@@ -130,4 +133,32 @@ class LineupSlot(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.lineup_id} · DP#{self.draft_player_id} · {self.slot}#{self.order}"
\ No newline at end of file
+        return f"{self.lineup_id} · DP#{self.draft_player_id} · {self.slot}#{self.order}"
+
+
+class BudgetMovement(models.Model):
+    """
+    Apunte del libro de presupuesto de un equipo (solo se añaden, nunca se
+    modifican). Los movimientos entre equipos se apuntan por partida doble:
+    uno en cada equipo, con el otro como contrapartida.
+    """
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="budget_movements")
+    type = models.CharField(max_length=30, choices=BudgetMovementType)
+    # Positivo si entra dinero, negativo si sale
+    amount = models.DecimalField(decimal_places=2, max_digits=100)
+    counterparty = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name="budget_counterparts"
+    )
+    game = models.ForeignKey("games.Game", on_delete=models.SET_NULL, null=True, blank=True, related_name="budget_movements")
+    transfer = models.ForeignKey(
+        "market.Transfer", on_delete=models.SET_NULL, null=True, blank=True, related_name="budget_movements"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["team", "-id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.team} · {self.get_type_display()} · {self.amount}"
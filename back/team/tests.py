@@ -1,3 +1,49 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
-# Create your tests here.
+from draft.models import Draft
+from league.models import League
+from team.ledger import open_budget, record, transfer, unbalanced_teams
+from team.models import BudgetMovement, Team
+from team.types import BudgetMovementType
+from users.models import DraftUser, User
+
+
+class BudgetLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        league = League.objects.create(name='Liga')
+        cls.draft = Draft.objects.create(league=league, name='Draft')
+        cls.users, cls.teams = [], []
+        for i in range(2):
+            user = User.objects.create_user(username=f'manager{i}', password='x')
+            draft_user = DraftUser.objects.create(user=user, draft=cls.draft)
+            team = Team.objects.create(name=f'Equipo {i}', draft=cls.draft, draft_user=draft_user, budget=Decimal('0'))
+            open_budget(team, Decimal('1000'))
+            cls.users.append(user)
+            cls.teams.append(team)
+
+    def test_movements_keep_cached_balance_in_sync(self):
+        buyer, seller = self.teams
+        # Apuntes y saldo en dos consultas (más el savepoint)
+        with self.assertNumQueries(4):
+            transfer(buyer.id, seller.id, Decimal('300'), BudgetMovementType.PURCHASE, BudgetMovementType.SALE)
+        record([BudgetMovement(team=seller, type=BudgetMovementType.MATCH_REWARD, amount=Decimal('50'))])
+
+        balances = dict(Team.objects.filter(id__in=[buyer.id, seller.id]).values_list('id', 'budget'))
+        self.assertEqual(balances, {buyer.id: Decimal('700'), seller.id: Decimal('1350')})
+        self.assertEqual(unbalanced_teams(self.draft.id), [])
+        call_command('reconcile_budgets', stdout=StringIO())
+
+        self.client.force_login(self.users[0])
+        data = self.client.get(f'/api/team/{self.draft.id}/my/budget').json()
+        self.assertEqual(Decimal(data['budget']), Decimal('700'))
+        self.assertEqual([(m['type'], m['counterparty']) for m in data['movements']], [('purchase', 'Equipo 1'), ('initial', None)])
+
+        # Un cambio de saldo fuera del libro se detecta
+        Team.objects.filter(id=buyer.id).update(budget=Decimal('999'))
+        with self.assertRaises(CommandError):
+            call_command('reconcile_budgets', stdout=StringIO())
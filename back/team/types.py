@@ -0,0 +1,10 @@
+from django.db import models
+
+class BudgetMovementType(models.TextChoices):
+    INITIAL = 'initial', 'Presupuesto inicial'
+    MATCH_REWARD = 'match_reward', 'Premio por partido'
+    PURCHASE = 'purchase', 'Compra'
+    SALE = 'sale', 'Venta'
+    CLAUSE_PAYMENT = 'clause_payment', 'Pago de cláusula'
+    CLAUSE_INCOME = 'clause_income', 'Cobro de cláusula'
+    ADJUSTMENT = 'adjustment', 'Ajuste'
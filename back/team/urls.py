@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    my_team, view_team, get_lineup, save_lineup,
+    my_team, my_budget, view_team, get_lineup, save_lineup,
     list_player_techniques, catalog_techniques,
     add_player_technique, reorder_player_techniques, delete_player_technique,
 )
@@ -8,6 +8,7 @@ from .views import (
 urlpatterns = [
      # --- Equipo ---
     path('<int:draft_id>/my', my_team, name='my_team'),
+    path('<int:draft_id>/my/budget', my_budget, name='my_budget'),
     path('<int:draft_id>/<int:team_id>', view_team, name='view_team'),
 
     # --- Alineación ---
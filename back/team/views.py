@@ -8,7 +8,7 @@ import json
 
 from draft.models import Draft
 from users.models import DraftUser
-from team.models import Team, Lineup, LineupSlot
+from team.models import BudgetMovement, Team, Lineup, LineupSlot
 from players.models import DraftPlayer
 from techniques.models import SpecialTechnique, DraftPlayerTechnique
 
@@ -110,6 +110,52 @@ def view_team(request: HttpRequest, draft_id: int, team_id: int):
     return JsonResponse(response)
 
 
+# ===========================================================
+# libro de presupuesto del equipo del usuario
+# ===========================================================
+BUDGET_MOVEMENTS_PAGE = 50
+
+
+@require_GET
+@login_required
+def my_budget(request: HttpRequest, draft_id: int):
+    """Saldo (cacheado, O(1)) y últimos movimientos del equipo del usuario; ?before=<id> para paginar."""
+    team = (
+        Team.objects
+        .filter(draft_id=draft_id, draft_user__user=request.user)
+        .values("id", "budget")
+        .first()
+    )
+    if team is None:
+        return _error("Equipo no encontrado para este usuario.", 404)
+
+    movements = BudgetMovement.objects.filter(team_id=team["id"]).select_related("counterparty", "game").order_by("-id")
+    before = request.GET.get("before")
+    if before is not None:
+        try:
+            movements = movements.filter(id__lt=int(before))
+        except ValueError:
+            return _error("Cursor no válido.")
+
+    page = list(movements[:BUDGET_MOVEMENTS_PAGE])
+    return JsonResponse({
+        "budget": team["budget"],
+        "movements": [
+            {
+                "id": m.id,
+                "type": m.type,
+                "amount": m.amount,
+                "counterparty": m.counterparty.name if m.counterparty else None,
+                "game_id": m.game_id,
+                "week": m.game.week if m.game else None,
+                "created_at": m.created_at,
+            }
+            for m in page
+        ],
+        "next_before": page[-1].id if len(page) == BUDGET_MOVEMENTS_PAGE else None,
+    })
+
+
 # ===========================================================
 # obtener alineación activa del usuario
 # ===========================================================
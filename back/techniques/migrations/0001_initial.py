@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('players', '0003_remove_draftplayer_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpecialTechnique',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=100)),
+                ('st_type', models.CharField(choices=[('Tiro', 'Tiro'), ('Regate', 'Regate'), ('Bloqueo', 'Bloqueo'), ('Atajo', 'Atajo')], max_length=20)),
+                ('element', models.CharField(choices=[('Fire', 'Fire'), ('Wind', 'Wind'), ('Earth', 'Earth'), ('Wood', 'Wood'), ('Neutro', 'Neutro')], max_length=20)),
+                ('users', models.SmallIntegerField(default=1)),
+                ('power', models.SmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+                'unique_together': {('name', 'st_type', 'element', 'users', 'power')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DraftPlayerTechnique',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveSmallIntegerField(default=0)),
+                ('draft_player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='techniques', to='players.draftplayer')),
+                ('technique', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assigned_to', to='techniques.specialtechnique')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['draft_player', 'order'], name='techniques__draft_p_985713_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('order__gte', 0), ('order__lte', 5)), name='dpt_order_between_0_5')],
+                'unique_together': {('draft_player', 'technique')},
+            },
+        ),
+    ]
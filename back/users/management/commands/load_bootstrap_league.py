@@ -10,7 +10,9 @@ from decimal import Decimal
 from league.models import League
 from draft.models import Draft
 from players.models import Player, DraftPlayer
+from players.types import normalize_element, normalize_position
 from users.models import DraftUser
+from team.ledger import adjust_budget, open_budget
 from team.models import Team
 
 
@@ -208,14 +210,15 @@ class Command(BaseCommand):
             team, created_team = Team.objects.get_or_create(
                 draft=draft,
                 draft_user=du,
-                defaults={"name": team_name, "budget": budget},
+                defaults={"name": team_name, "budget": 0},
             )
             if created_team:
+                open_budget(team, budget)
                 self.stdout.write(self.style.SUCCESS(f"[team] creado: {team_name}"))
             else:
                 team.name = team_name
-                team.budget = budget
-                team.save(update_fields=["name", "budget"])
+                team.save(update_fields=["name"])
+                adjust_budget(team, budget)
                 self.stdout.write(f"[team] actualizado: {team_name}")
 
         # 3) Si la liga no tenía owner y no se pasó --owner-id, asignamos el primero creado
@@ -248,12 +251,21 @@ class Command(BaseCommand):
                     except Exception:
                         value_millions = Decimal("0")
 
+                    # Se guardan como vienen ('GK', 'Earth'...), que es lo que pinta el front;
+                    # el simulador las lee con el mismo normalizador
+                    position = (row.get("position") or "").strip()
+                    element = (row.get("element") or "").strip()
+                    if normalize_position(position) is None or (element != "None" and normalize_element(element) is None):
+                        self.stdout.write(self.style.WARNING(
+                            f"[players] {name}: posición '{position}' o elemento '{element}' no reconocidos."
+                        ))
+
                     player, created_p = Player.objects.get_or_create(
                         name=name,
                         defaults={
                             "gender": (row.get("gender") or "").strip(),
-                            "position": (row.get("position") or "").strip(),
-                            "element": (row.get("element") or "").strip(),
+                            "position": position,
+                            "element": element,
                             "sprite": (row.get("sprite") or "").strip(),
                             "value": value_millions * Decimal(1_000_000),
                         },
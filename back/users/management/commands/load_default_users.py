@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from users.models import DraftUser, User
 from draft.models import Draft
+from team.ledger import open_budget
 from team.models import Team
 from uuid import uuid4
 from datetime import datetime, UTC
@@ -57,9 +58,10 @@ class Command(BaseCommand):
                 draft=draft
             )
 
-            Team.objects.create(
+            team = Team.objects.create(
                 name=user['team_name'],
                 draft=draft,
                 draft_user=draft_user,
-                budget=100000000,
-            )
\ No newline at end of file
+                budget=0,
+            )
+            open_budget(team, 100000000)
\ No newline at end of file
@@ -0,0 +1,29 @@
+// Una sola conexión SSE para todos los topics de la vista:
+//   draft:<id>:players, draft:<id>:turn, league:<id>:fixtures, league:<id>:standings
+// Cada mensaje trae { topic, seq, ... }. El navegador reconecta solo y manda
+// Last-Event-ID con el cursor de cada topic, así que solo llega lo perdido.
+export const subscribeEvents = (topics, handlers) => {
+  const url = `${import.meta.env.VITE_API_URL}/events?topics=${encodeURIComponent(topics.join(","))}`;
+  const evtSource = new EventSource(url, { withCredentials: true });
+  const lastSeq = {};
+
+  for (const [type, handler] of Object.entries(handlers)) {
+    evtSource.addEventListener(type, (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        // Tras reconectar puede repetirse algún mensaje: lo ignoramos por topic
+        if (type !== "snapshot" && data.seq <= (lastSeq[data.topic] ?? -1)) return;
+        lastSeq[data.topic] = data.seq;
+        handler(data);
+      } catch (err) {
+        console.error("Error parsing SSE data:", err);
+      }
+    });
+  }
+
+  evtSource.onerror = (err) => {
+    console.error("Error en conexión SSE:", err);
+  };
+
+  return () => evtSource.close();
+};
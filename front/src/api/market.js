@@ -0,0 +1,45 @@
+// src/api/market.js
+import { api, ensureCsrf } from "../api";
+
+// params opcionales: { position, max_price, limit, cursor }
+export const viewListings = async (draftId, params = {}) => {
+  const res = await api.get(`/market/${draftId}/listings`, { params });
+  return res.data;
+};
+
+export const createListing = async (draftId, draftPlayerId, price) => {
+  await ensureCsrf();
+  const res = await api.post(`/market/${draftId}/listings`, { draft_player_id: draftPlayerId, price });
+  return res.data;
+};
+
+export const cancelListing = async (listingId) => {
+  await ensureCsrf();
+  const res = await api.delete(`/market/listings/${listingId}`);
+  return res.data;
+};
+
+export const buyListing = async (listingId) => {
+  await ensureCsrf();
+  const res = await api.post(`/market/listings/${listingId}/buy`);
+  return res.data;
+};
+
+export const placeBid = async (listingId, amount) => {
+  await ensureCsrf();
+  const res = await api.post(`/market/listings/${listingId}/bids`, { amount });
+  return res.data;
+};
+
+export const acceptBid = async (draftId, bidId) => {
+  await ensureCsrf();
+  const res = await api.put(`/market/${draftId}/bids/${bidId}/accept`);
+  return res.data;
+};
+
+// teamId: equipo al que se cree que se paga la cláusula (409 si el jugador ya cambió de equipo)
+export const payReleaseClause = async (draftId, draftPlayerId, teamId) => {
+  await ensureCsrf();
+  const res = await api.post(`/market/${draftId}/players/${draftPlayerId}/release-clause`, { team_id: teamId });
+  return res.data;
+};
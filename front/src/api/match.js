@@ -1,8 +1,9 @@
 // src/api/match.js
 import { api, ensureCsrf  } from "../api";
 
-export const viewMatchs = async (leagueId) => {
-  const res = await api.get(`/games/league/${leagueId}`);
+// params opcionales: { week } para una jornada, { limit, cursor } para paginar
+export const viewMatchs = async (leagueId, params = {}) => {
+  const res = await api.get(`/games/league/${leagueId}`, { params });
   return res.data;
 };
 
@@ -33,4 +34,30 @@ export const rejectMatchResultRequest = async (requestId) => {
   await ensureCsrf();
   const res = await api.put(`/games/${requestId}/reject`);
   return res.data;
-};
\ No newline at end of file
+};
+
+// Aprobar/rechazar en lote: { action: "approve" | "reject", ids: [...] } o { action, week }
+export const batchMatchResultRequests = async (leagueId, payload) => {
+  await ensureCsrf();
+  const res = await api.put(`/games/league/${leagueId}/requests/batch`, payload);
+  return res.data;
+};
+
+// payload opcional: { double: true, replace: false }
+export const generateLeagueFixtures = async (leagueId, payload = {}) => {
+  await ensureCsrf();
+  const res = await api.post(`/games/league/${leagueId}/fixtures`, payload);
+  return res.data;
+};
+
+// params opcionales: { week, runs }
+export const viewPredictions = async (leagueId, params = {}) => {
+  const res = await api.get(`/games/league/${leagueId}/predictions`, { params });
+  return res.data;
+};
+
+// Cola de moderación del dueño; params opcionales: { limit, cursor }
+export const viewPendingResultRequests = async (leagueId, params = {}) => {
+  const res = await api.get(`/games/league/${leagueId}/requests`, { params });
+  return res.data;
+};
@@ -3,4 +3,33 @@ import { api } from "../api";
 export const viewRanking = async(leagueId) => {
     const res = await api.get(`/ranking/${leagueId}`);
     return res.data;
-}
\ No newline at end of file
+}
+
+export const viewRankingHistory = async(leagueId) => {
+    const res = await api.get(`/ranking/${leagueId}/history`);
+    return res.data;
+}
+
+
+export const viewScorers = async(leagueId) => {
+    const res = await api.get(`/ranking/${leagueId}/scorers`);
+    return res.data;
+}
+
+
+export const viewGoalkeepers = async(leagueId) => {
+    const res = await api.get(`/ranking/${leagueId}/goalkeepers`);
+    return res.data;
+}
+
+
+export const viewProjections = async(leagueId) => {
+    const res = await api.get(`/ranking/${leagueId}/projections`);
+    return res.data;
+}
+
+
+export const viewHeadToHead = async(leagueId) => {
+    const res = await api.get(`/ranking/${leagueId}/head-to-head`);
+    return res.data;
+}
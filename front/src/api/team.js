@@ -22,6 +22,18 @@ export const myTeam = async (draftId) => {
   return res.data;
 };
 
+/**
+ * Saldo y últimos movimientos del presupuesto del equipo del usuario.
+ * `before` (opcional) es el id del último movimiento recibido, para paginar.
+ */
+export const myBudget = async (draftId, before) => {
+  if (!draftId) {
+    throw new Error("myBudget: falta draftId");
+  }
+  const res = await api.get(`/team/${draftId}/my/budget`, { params: before ? { before } : {} });
+  return res.data;
+};
+
 /**
  * Devuelve la alineación activa del usuario (formación, titulares, banquillo, reservas).
  */
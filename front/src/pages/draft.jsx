@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import { getDraftPlayers, startDraft, finishDraft,selectPlayer,viewDraft } from "../api/draft";
+import { subscribeEvents } from "../api/events";
 
 const POS_LABEL = { GK: "Porteros", DF: "Defensas", MF: "Centrocampistas", FW: "Delanteros" };
 const eur = (n = 0) =>
@@ -137,16 +138,11 @@ export default function Draft() {
   }, [draftId]);
 
   useEffect(() => {
-  if (notStarted) return;
-
-  const sseUrl = `${import.meta.env.VITE_API_URL}/draft/${draftId}/players/stream`;
-
-  const evtSource = new EventSource(sseUrl);
-
-  evtSource.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data);
-      const list = data.map(r => ({
+  // Pool y turno por una única conexión SSE multiplexada
+  return subscribeEvents([`draft:${draftId}:players`, `draft:${draftId}:turn`], {
+    // Estado inicial completo del pool
+    snapshot: (data) => {
+      const list = data.players.map(r => ({
         id: r.id,
         player: {
           id: r.player_id,
@@ -158,51 +154,24 @@ export default function Draft() {
         },
       }));
       setPlayers(list);
-    } catch (err) {
-      console.error("Error parsing SSE data:", err);
-    }
-  };
-
-  evtSource.onerror = (err) => {
-    console.error("Error en conexión SSE:", err);
-    evtSource.close();
-  };
-
-  return () => evtSource.close();
-}, [draftId, notStarted]);
-
-// useEffect(() => {
-//   if (notStarted) return;
-
-//   const sseUrl = `${import.meta.env.VITE_API_URL}/draft/${draftId}/stream`;
-
-//   const evtSource = new EventSource(sseUrl);
-
-//   evtSource.onmessage = (event) => {
-
-//     try {
-//       const data = JSON.parse(event.data);
-
-//       const draftData = {
-//         id: data.id,
-//         name: data.name,
-//         current_user: data.current_user,
-//         status: data.status
-//       };
-//       setDraftPlayer(draftData);
-
-//     } catch (err) {
-//       console.error("Error parsing SSE data:", err);
-//     }
-//   };
-
-//   evtSource.onerror = (err) => {
-//     console.error("Error en conexión SSE:", err);
-//     evtSource.close();
-//   };
-
-//   return () => evtSource.close();
-// }, [draftId, notStarted]);
+    },
+    // Deltas: solo quitamos el jugador escogido
+    player_taken: (data) => {
+      setPlayers(prev => prev.filter(it => it.id !== data.draft_player_id));
+    },
+    // Estado de turno: se manda al conectar y en cada cambio
+    state: (data) => {
+      setDraftPlayer({
+        id: data.id,
+        name: data.name,
+        current_user: data.current_user,
+        current_pick: data.current_pick,
+        status: data.status
+      });
+      if (data.status === "in_progress") setNotStarted(false);
+    },
+  });
+}, [draftId]);
 
   const byPos = useMemo(() => {
     const map = { GK: [], DF: [], MF: [], FW: [] };
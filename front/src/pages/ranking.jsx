@@ -1,6 +1,45 @@
 import { useState, useEffect } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { viewRanking } from "../api/ranking";
+import { viewGoalkeepers, viewProjections, viewRanking, viewRankingHistory, viewScorers } from "../api/ranking";
+
+const CHART_COLORS = ["#facc15", "#38bdf8", "#f472b6", "#4ade80", "#fb923c", "#a78bfa", "#f87171", "#2dd4bf"];
+
+// Evolución de la posición de cada equipo jornada a jornada (1º arriba)
+function PositionChart({ history }) {
+  const { weeks, teams } = history;
+  if (weeks.length < 2) return <p className="text-center text-white/60">Aún no hay jornadas suficientes</p>;
+
+  const width = 600, height = 240, pad = 28;
+  const x = (i) => pad + (i * (width - 2 * pad)) / (weeks.length - 1);
+  const y = (position) => pad + ((position - 1) * (height - 2 * pad)) / Math.max(teams.length - 1, 1);
+
+  return (
+    <div>
+      <svg viewBox={`0 0 ${width} ${height}`} className="w-full">
+        {weeks.map((week, i) => (
+          <text key={week} x={x(i)} y={height - 6} textAnchor="middle" className="fill-white/40 text-[10px]">J{week}</text>
+        ))}
+        {teams.map((team, t) => (
+          <polyline
+            key={team.id}
+            fill="none"
+            stroke={CHART_COLORS[t % CHART_COLORS.length]}
+            strokeWidth="2"
+            points={team.positions
+              .map((position, i) => (position == null ? null : `${x(i)},${y(position)}`))
+              .filter(Boolean)
+              .join(" ")}
+          />
+        ))}
+      </svg>
+      <div className="flex flex-wrap gap-3 justify-center text-sm mt-2">
+        {teams.map((team, t) => (
+          <span key={team.id} style={{ color: CHART_COLORS[t % CHART_COLORS.length] }}>{team.name}</span>
+        ))}
+      </div>
+    </div>
+  );
+}
 
 export default function Ranking() {
   const nav = useNavigate();
@@ -10,6 +49,8 @@ export default function Ranking() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [teams, setTeams] = useState([]);
+  const [history, setHistory] = useState({ weeks: [], teams: [] });
+  const [titleOdds, setTitleOdds] = useState({});
   const [stats, setStats] = useState({ goles: [], asistencias: [], golesEncajados: [] });
 
   useEffect(() => {
@@ -17,8 +58,24 @@ export default function Ranking() {
       setLoading(true);
       setError("");
       try {
-        const data = await viewRanking(leagueId);
+        const [data, evolution, scorers, goalkeepers, projections] = await Promise.all([
+          viewRanking(leagueId),
+          viewRankingHistory(leagueId),
+          viewScorers(leagueId),
+          viewGoalkeepers(leagueId),
+          viewProjections(leagueId),
+        ]);
+        setTitleOdds(Object.fromEntries((projections?.teams ?? []).map((t) => [t.id, t.title])));
         setTeams(data ?? []);
+        setHistory(evolution ?? { weeks: [], teams: [] });
+        setStats({
+          goles: (scorers ?? []).map((p) => ({ player: p.name, value: p.goals })),
+          asistencias: [],
+          golesEncajados: (goalkeepers ?? []).map((p) => ({
+            player: p.name,
+            value: `${p.clean_sheets} a cero · ${p.goals_against} encajados`,
+          })),
+        });
       } catch (e) {
         setError("No se pudo cargar el ranking.");
       } finally {
@@ -68,12 +125,21 @@ export default function Ranking() {
                   <span>G: {team.wins}</span>
                   <span>E: {team.draws}</span>
                   <span>P: {team.losses}</span>
+                  {titleOdds[team.id] != null && (
+                    <span title="Probabilidad de ganar la liga">🏆 {(titleOdds[team.id] * 100).toFixed(1)}%</span>
+                  )}
                 </div>
               </li>
             ))}
           </ul>
         </div>
 
+        {/* Evolución de la clasificación */}
+        <div className="bg-white/5 rounded-xl p-4 shadow hover:bg-white/10 transition">
+          <h2 className="text-xl font-semibold mb-4 text-center">Evolución</h2>
+          <PositionChart history={history} />
+        </div>
+
         {/* Bloques de estadísticas */}
         <div className="bg-white/5 rounded-xl p-4 shadow hover:bg-white/10 transition">
           <h2 className="text-xl font-semibold mb-4 text-center">Clasificación de estadísticas</h2>